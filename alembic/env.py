@@ -13,7 +13,7 @@ from alembic import context
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.database import Base, DATABASE_URL
-from app.db_models import Transaction, User, AuditLog  # Import all models
+from app.db_models import Transaction, User, AuditLog, TransactionStatsDaily, BehaviorProfile  # Import all models
 
 # Alembic Config object
 config = context.config
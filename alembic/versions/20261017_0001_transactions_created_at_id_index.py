@@ -0,0 +1,26 @@
+"""Add (created_at, id) index on transactions for keyset pagination
+
+Revision ID: 20261017_0001_created_at_id
+Revises: 20260112_0001_fastapi_user
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0001_created_at_id'
+down_revision: Union[str, None] = '20260112_0001_fastapi_user'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_transactions_created_at_id'), 'transactions', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_transactions_created_at_id'), table_name='transactions')
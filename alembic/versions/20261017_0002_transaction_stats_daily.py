@@ -0,0 +1,47 @@
+"""Add transaction_stats_daily rollup table
+
+Revision ID: 20261017_0002_stats_daily
+Revises: 20261017_0001_created_at_id
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0002_stats_daily'
+down_revision: Union[str, None] = '20261017_0001_created_at_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('transaction_stats_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('risk_level', sa.String(length=10), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('amount_sum', sa.Float(), nullable=False),
+    sa.Column('risk_score_sum', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'risk_level', 'status')
+    )
+
+    # Backfill from existing transactions (same result as the rebuild command)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            """
+            INSERT INTO transaction_stats_daily
+                (day, risk_level, status, count, amount_sum, risk_score_sum)
+            SELECT (timezone('UTC', timestamp))::date, risk_level, COALESCE(status, 'pending'),
+                   count(*), sum(amount), sum(risk_score)
+            FROM transactions
+            GROUP BY 1, 2, 3
+            """
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('transaction_stats_daily')
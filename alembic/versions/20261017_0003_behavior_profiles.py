@@ -0,0 +1,39 @@
+"""Add behavior_profiles table
+
+Revision ID: 20261017_0003_behavior_profiles
+Revises: 20261017_0002_stats_daily
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0003_behavior_profiles'
+down_revision: Union[str, None] = '20261017_0002_stats_daily'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Populated on first startup (ProfileStore.load rebuilds an empty table)
+    op.create_table('behavior_profiles',
+    sa.Column('scope', sa.String(length=10), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('mean', sa.Float(), nullable=False),
+    sa.Column('m2', sa.Float(), nullable=False),
+    sa.Column('first_seen', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_seen', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('hour_histogram', sa.JSON(), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'key')
+    )
+    op.create_index(op.f('ix_behavior_profiles_last_seen'), 'behavior_profiles', ['last_seen'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_behavior_profiles_last_seen'), table_name='behavior_profiles')
+    op.drop_table('behavior_profiles')
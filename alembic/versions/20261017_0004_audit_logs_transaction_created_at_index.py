@@ -0,0 +1,29 @@
+"""Replace the audit_logs transaction_id index with (transaction_id, created_at)
+
+Revision ID: 20261017_0004_audit_trail_index
+Revises: 20261017_0003_behavior_profiles
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0004_audit_trail_index'
+down_revision: Union[str, None] = '20261017_0003_behavior_profiles'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The composite index also serves plain transaction_id lookups
+    op.create_index(op.f('ix_audit_logs_transaction_id_created_at'), 'audit_logs', ['transaction_id', 'created_at'], unique=False)
+    op.drop_index(op.f('ix_audit_logs_transaction_id'), table_name='audit_logs')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_audit_logs_transaction_id'), 'audit_logs', ['transaction_id'], unique=False)
+    op.drop_index(op.f('ix_audit_logs_transaction_id_created_at'), table_name='audit_logs')
@@ -0,0 +1,27 @@
+"""Add transactions.amount_baseline
+
+Revision ID: 20261017_0006_amount_baseline
+Revises: 20261017_0005_import_jobs
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '20261017_0006_amount_baseline'
+down_revision: Union[str, None] = '20261017_0005_import_jobs'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rows scored before this column existed render against AVG_TRANSACTION_AMOUNT
+    op.add_column('transactions', sa.Column('amount_baseline', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('transactions', 'amount_baseline')
@@ -24,7 +24,70 @@ SCORING_WEIGHTS = {
     "UNUSUAL_TIMING": 0.25,
     "AMOUNT_SPIKE": 0.30,
     "SUSPICIOUS_REFERENCE": 0.15,
+    "VELOCITY": 0.20,
 }
 
 # Amount spike multiplier (transaction > AVG * this = spike)
 AMOUNT_SPIKE_MULTIPLIER = 3  # >£1,560 triggers spike
+
+# Maximum number of transactions accepted by POST /transactions/batch
+MAX_BATCH_SIZE = 5000
+
+# Maximum number of transaction ids accepted by POST /transactions/audit/bulk
+MAX_AUDIT_BULK_IDS = 500
+
+# Behavioural profiles (per payee / per account)
+PROFILE_MIN_HISTORY = 5            # payments needed before a profile replaces AVG_TRANSACTION_AMOUNT
+PROFILE_SPIKE_STDDEVS = 3          # spike also requires amount > mean + this many std devs
+PROFILE_CACHE_SIZE = 100_000       # profiles kept in the in-process cache
+PROFILE_FLUSH_INTERVAL_SECONDS = 5 # write-behind interval for dirty profiles
+PROFILE_USUAL_HOUR_SHARE = 0.1     # off-hours payments are not UNUSUAL_TIMING if the payee's
+                                   # history has at least this share of payments in that hour
+
+# Velocity (burst) detection
+VELOCITY_WINDOWS = {"10m": 600, "1h": 3600, "24h": 86400}  # window name -> seconds
+VELOCITY_BUCKETS = 60             # ring buckets per window (10s / 1min / 24min resolution)
+VELOCITY_MAX_KEYS = 50_000        # payees/accounts tracked before idle ones are evicted
+# VELOCITY fires when earlier transfers in any window reach these counts
+# (account limits apply only to transfers that carry an account id)
+VELOCITY_LIMITS = {
+    "payee": {"10m": 3, "1h": 5, "24h": 10},
+    "account": {"10m": 20, "1h": 60, "24h": 500},
+}
+
+# Reference keywords that trigger SUSPICIOUS_REFERENCE (case-insensitive substrings)
+URGENCY_KEYWORDS = ("urgent",)
+
+# Seconds between fraud_patterns.json change checks (0 disables hot reload)
+PATTERN_RELOAD_INTERVAL_SECONDS = 5
+
+# Entries kept in the explanation generator's memoization cache
+EXPLANATION_CACHE_SIZE = 4096
+
+# Background explanation precomputation for new high/medium-risk transactions
+EXPLANATION_WORKERS = 4
+EXPLANATION_MAX_RETRIES = 3
+EXPLANATION_RETRY_BASE_SECONDS = 0.5 # doubled after each failed attempt
+EXPLANATION_QUEUE_SIZE = 10_000 # jobs beyond this are dropped (generated on read instead)
+
+# Write-behind audit log: buffered entries are inserted in one multi-row
+# statement every AUDIT_FLUSH_INTERVAL_MS, or sooner once AUDIT_BATCH_SIZE are queued
+AUDIT_FLUSH_INTERVAL_MS = 200
+AUDIT_BATCH_SIZE = 500
+# Past AUDIT_MAX_PENDING while the database is down, the oldest entries are kept
+# only in the spool (AUDIT_SPOOL_PATH), or dropped if there is none
+AUDIT_MAX_PENDING = 100_000
+
+# Streaming transaction import (POST /transactions/import)
+IMPORT_CHUNK_SIZE = 1000          # rows scored and written per bulk insert
+IMPORT_READ_BYTES = 64 * 1024     # bytes read from the upload at a time
+IMPORT_MAX_ERRORS = 100_000       # rejected rows written to the error file (later ones are only counted)
+
+# Background import jobs (POST /jobs/import)
+IMPORT_JOB_WORKERS = 2            # jobs run at once per API process
+IMPORT_JOB_POLL_SECONDS = 2.0     # idle workers check the job table this often
+IMPORT_JOB_STALE_SECONDS = 120    # running jobs without progress for this long are reclaimed
+
+# Approve/reject updates re-read the row and retry this many times when another
+# request changed its status or risk level in between
+TRANSACTION_UPDATE_ATTEMPTS = 3
@@ -2,10 +2,14 @@
 FraudShield Database Configuration
 
 SQLAlchemy setup for PostgreSQL database.
+
+Request handlers use the async engine (asyncpg driver) through `get_db`.
+The synchronous engine is kept for authentication routes and Alembic.
 """
 
 import os
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -24,6 +28,17 @@ DATABASE_URL = os.getenv(
 if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# Async driver URL derived from DATABASE_URL unless set explicitly
+# postgresql:// -> postgresql+asyncpg://, sqlite:// -> sqlite+aiosqlite://
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+if not ASYNC_DATABASE_URL:
+    if DATABASE_URL.startswith("postgresql://"):
+        ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    elif DATABASE_URL.startswith("sqlite://"):
+        ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    else:
+        ASYNC_DATABASE_URL = DATABASE_URL
+
 # Track if database is available
 _db_available = True
 
@@ -57,24 +72,49 @@ except Exception as e:
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+try:
+    # Async engine used by request handlers; connects lazily on first use
+    if ASYNC_DATABASE_URL.startswith("sqlite"):
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=StaticPool)
+    else:
+        async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            pool_pre_ping=True,
+            pool_size=5,
+            max_overflow=10,
+        )
+except Exception as e:
+    print(f"Warning: Could not create async database engine: {e}")
+    async_engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        poolclass=StaticPool,
+    )
+
+# Async session factory. Objects stay loaded after commit so handlers can
+# read them without triggering implicit (unsupported) lazy loads.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
-    Dependency for FastAPI to get database session.
+    Dependency for FastAPI to get an async database session.
     
     Usage:
         @app.get("/items")
-        def read_items(db: Session = Depends(get_db)):
-            return db.query(Transaction).all()
+        async def read_items(db: AsyncSession = Depends(get_db)):
+            result = await db.execute(select(Transaction))
+            return result.scalars().all()
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 def is_db_available() -> bool:
@@ -6,7 +6,7 @@ SQLAlchemy ORM models for database tables.
 
 from datetime import datetime
 from uuid import UUID as PyUUID
-from sqlalchemy import Column, String, Float, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, String, Float, DateTime, Date, Boolean, Integer, BigInteger, Text, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -32,6 +32,7 @@ class Transaction(Base):
     risk_score = Column(Float, nullable=False, index=True)
     risk_level = Column(String(10), nullable=False, index=True)  # high, medium, low
     factors = Column(JSON, default=list)  # List of triggered factor codes
+    amount_baseline = Column(Float, nullable=True)  # Mean AMOUNT_SPIKE compared against
     
     # Explanation (generated lazily, cached here)
     confidence = Column(Float, nullable=True)
@@ -49,6 +50,11 @@ class Transaction(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Keyset pagination: ORDER BY created_at DESC, id DESC
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Transaction(id={self.id}, payee={self.payee}, risk_level={self.risk_level})>"
 
@@ -78,12 +84,94 @@ class AuditLog(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), nullable=True, index=True)
-    transaction_id = Column(UUID(as_uuid=True), nullable=True, index=True)
+    transaction_id = Column(UUID(as_uuid=True), nullable=True)
     action = Column(String(50), nullable=False)  # viewed, approved, rejected, created, etc.
     details = Column(JSON, nullable=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, index=True)
 
+    __table_args__ = (
+        # Per-transaction trail in order; also serves transaction_id lookups
+        Index("ix_audit_logs_transaction_id_created_at", "transaction_id", "created_at"),
+    )
+
     def __repr__(self):
         return f"<AuditLog(action={self.action}, user_id={self.user_id})>"
+
+
+class TransactionStatsDaily(Base):
+    """Per-day rollup of transaction counts and sums for dashboard totals.
+
+    Maintained incrementally by DatabaseService on every insert and status
+    change; rebuild with `python -m app.services.stats_rollup rebuild`.
+    """
+
+    __tablename__ = "transaction_stats_daily"
+
+    day = Column(Date, primary_key=True)  # UTC date of the transaction timestamp
+    risk_level = Column(String(10), primary_key=True)
+    status = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    amount_sum = Column(Float, nullable=False, default=0.0)
+    risk_score_sum = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<TransactionStatsDaily(day={self.day}, risk_level={self.risk_level}, status={self.status}, count={self.count})>"
+
+
+class BehaviorProfile(Base):
+    """Streaming amount/timing baseline for a payee or account.
+
+    Written behind by app.services.profile_store; rebuild with
+    `python -m app.services.profile_store rebuild`.
+    """
+
+    __tablename__ = "behavior_profiles"
+
+    scope = Column(String(10), primary_key=True)  # payee, account
+    key = Column(String(255), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)  # Welford sum of squared deviations
+    first_seen = Column(DateTime(timezone=True), nullable=True)
+    last_seen = Column(DateTime(timezone=True), nullable=True, index=True)
+    hour_histogram = Column(JSON, nullable=False, default=list)  # 24 counts, by hour of day
+
+    def __repr__(self):
+        return f"<BehaviorProfile(scope={self.scope}, key={self.key}, count={self.count})>"
+
+
+class ImportJob(Base):
+    """Background import of an uploaded transaction file.
+
+    Claimed and run by app.services.import_jobs; progress columns are
+    committed with each chunk of rows so a job resumes after a crash.
+    """
+
+    __tablename__ = "import_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), nullable=False, default="queued", index=True)  # queued, running, completed, failed
+    format = Column(String(10), nullable=False)  # csv, ndjson
+    filename = Column(String(255), nullable=True)
+    path = Column(Text, nullable=False)  # stored upload
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+
+    # Progress as of the last committed chunk
+    bytes_done = Column(BigInteger, nullable=False, default=0)
+    rows_done = Column(Integer, nullable=False, default=0)
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    last_line = Column(Integer, nullable=False, default=0)
+    errors_size = Column(BigInteger, nullable=False, default=0)  # error file bytes
+
+    worker = Column(String(100), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)  # heartbeat
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ImportJob(id={self.id}, status={self.status}, rows_done={self.rows_done})>"
@@ -5,54 +5,117 @@ FastAPI-based fraud detection service that analyzes transactions
 and provides risk assessments with AI-generated explanations.
 """
 
+import asyncio
 import json
 from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
+from typing import Literal, Optional
+from uuid import UUID
 
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, File, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth_routes import router as auth_router
 from app.auth import get_current_user, OptionalAuthBackend
-from app.config import RISK_THRESHOLDS
 from app.models import (
     HealthResponse,
+    ImportJobResponse,
     PaginatedResponse,
+    TransactionBatchCreate,
+    TransactionBatchResponse,
     TransactionCreate,
     TransactionDetailResponse,
+    TransactionFilters,
     TransactionResponse,
+    TransactionStatsResponse,
     AuditLogEntry,
+    TransactionAuditBulkRequest,
+    TransactionAuditBulkResponse,
     TransactionAuditResponse,
 )
 from app.services.anomaly_detector import (
     AnomalyDetectorProtocol,
-    get_anomaly_detector,
+    amount_baseline,
+    get_risk_level,
 )
-from app.services.explanation_generator import (
-    ExplanationGeneratorProtocol,
-    get_explanation_generator,
+from app.providers.llm.base import ExplanationRequest, LLMProvider
+from app.services.explanation_generator import ExplanationGeneratorProtocol, describe_factors
+from app.services.audit_writer import audit_writer
+from app.services.database_service import DatabaseWriteError, StaleWriteError, db_service
+from app.services.event_broker import event_broker
+from app.services.explanation_queue import (
+    PRECOMPUTED_RISK_LEVELS,
+    explanation_input,
+    explanation_queue,
 )
-from app.services.database_service import db_service
+from app.services.import_jobs import import_jobs, job_timing
+from app.services.profile_store import profile_store
+from app.services.registry import registry
+from app.services.single_flight import explanation_flight
+from app.services.transaction_import import (
+    ErrorLog,
+    ImportFormatError,
+    RecordReader,
+    detect_format,
+    error_file_path,
+    import_records,
+    new_import_id,
+    store_transactions,
+    upload_chunks,
+)
+from app.services.velocity_tracker import velocity_tracker
 from app.database import get_db
-from app.db_models import User
+from app.db_models import ImportJob, User
+
+
+# Seconds between SSE keep-alive comments on idle streams
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def format_sse(event_type: str, data: dict) -> str:
+    """Format an event as a Server-Sent Events message."""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def audit_log_entry(entry) -> AuditLogEntry:
+    """Response model for a stored audit log row."""
+    return AuditLogEntry(timestamp=entry.created_at, action=entry.action, details=entry.details or {})
 
 
-def get_risk_level(score: float) -> str:
-    """Map risk score to risk level."""
-    if score >= RISK_THRESHOLDS["high"]:
-        return "high"
-    elif score >= RISK_THRESHOLDS["medium"]:
-        return "medium"
-    return "low"
+def get_transaction_filters(
+    risk_level: Optional[Literal["high", "medium", "low"]] = Query(None, description="Filter by risk level"),
+    status: Optional[str] = Query(None, description="Filter by review status"),
+    payee_prefix: Optional[str] = Query(None, max_length=255, description="Payee name starts with"),
+    min_amount: Optional[float] = Query(None, ge=0, description="Minimum amount (inclusive)"),
+    max_amount: Optional[float] = Query(None, ge=0, description="Maximum amount (inclusive)"),
+    start_time: Optional[datetime] = Query(None, description="Transaction timestamp at or after (ISO 8601)"),
+    end_time: Optional[datetime] = Query(None, description="Transaction timestamp before (ISO 8601)"),
+) -> TransactionFilters:
+    """Collect transaction filter query parameters."""
+    return TransactionFilters(
+        risk_level=risk_level,
+        status=status,
+        payee_prefix=payee_prefix,
+        min_amount=min_amount,
+        max_amount=max_amount,
+        start_time=start_time,
+        end_time=end_time,
+    )
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load seed data on startup."""
+    """Build services and load seed data and behaviour profiles on startup."""
     seed_file = Path(__file__).parent / "data" / "demo_transactions.json"
     db = None
+
+    try:
+        await registry.start()
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not warm up services: {e}")
     
     try:
         db = db_service.get_db()
@@ -61,8 +124,8 @@ async def lifespan(app: FastAPI):
             with open(seed_file) as f:
                 seed_data = json.load(f)
 
-                detector = get_anomaly_detector()
-                generator = get_explanation_generator()
+                detector = registry.get_detector()
+                generator = registry.get_generator()
                 
                 count = 0
                 for item in seed_data:
@@ -73,13 +136,14 @@ async def lifespan(app: FastAPI):
                         )
 
                     # Skip if transaction already exists
-                    existing = db_service.get_transaction(db, item.get("id"))
+                    existing = await db_service.get_transaction(db, item.get("id"))
                     if existing:
                         continue
 
                     # Calculate risk score and factors
                     risk_score, factors = detector.calculate_risk_score(item)
                     risk_level = get_risk_level(risk_score)
+                    item["amount_baseline"] = amount_baseline(detector, item["payee"], factors)
                     
                     # Generate explanation
                     explanation_data = generator.generate_explanation(
@@ -89,7 +153,7 @@ async def lifespan(app: FastAPI):
                     )
 
                     # Create transaction with all data
-                    db_service.create_transaction(
+                    await db_service.create_transaction(
                         db,
                         amount=item["amount"],
                         payee=item["payee"],
@@ -103,6 +167,7 @@ async def lifespan(app: FastAPI):
                         explanation=explanation_data.get("explanation"),
                         risk_factors_detailed=explanation_data.get("risk_factors"),
                         recommended_action=explanation_data.get("recommended_action"),
+                        amount_baseline=item["amount_baseline"],
                     )
                     count += 1
                 
@@ -113,11 +178,58 @@ async def lifespan(app: FastAPI):
     finally:
         if db:
             try:
-                db.close()
+                await db.close()
             except Exception:
                 pass
     
+    try:
+        async with db_service.get_db() as db:
+            count = await profile_store.load(db)
+        await profile_store.start(db_service.get_db)
+        print(f"FraudShield: Loaded {count} behaviour profiles")
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not load behaviour profiles: {e}")
+
+    try:
+        async with db_service.get_db() as db:
+            count = await velocity_tracker.load(db)
+        print(f"FraudShield: Replayed {count} recent transactions into velocity tracker")
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not load velocity tracker: {e}")
+
+    try:
+        await audit_writer.start(db_service.get_db)
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not start audit writer: {e}")
+
+    try:
+        await event_broker.start()
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not start event broker: {e}")
+
+    await explanation_queue.start(db_service.get_db)
+
+    try:
+        await import_jobs.start(db_service.get_db)
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not start import job workers: {e}")
+
     yield
+    try:
+        await import_jobs.stop()
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not requeue import jobs: {e}")
+    await explanation_queue.stop()
+    await event_broker.stop()
+    await registry.stop()
+    try:
+        await profile_store.stop(db_service.get_db)
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not flush behaviour profiles: {e}")
+    try:
+        await audit_writer.stop(db_service.get_db)
+    except Exception as e:
+        print(f"FraudShield: Warning - Could not flush audit log entries: {e}")
     print("FraudShield: Shutting down")
 
 
@@ -156,7 +268,36 @@ async def root():
 @app.get("/health", response_model=HealthResponse, tags=["Health"])
 async def health_check():
     """Health check endpoint for Azure App Service."""
-    return HealthResponse(status="healthy", service="FraudShield API")
+    components = await registry.health()
+    status = "healthy" if all(state == "ok" for state in components.values()) else "degraded"
+    return HealthResponse(
+        status=status,
+        service="FraudShield API",
+        components=components,
+        patterns=registry.pattern_stats(),
+        explanation_queue=explanation_queue.stats(),
+        audit_writer=audit_writer.stats(),
+        breakers=registry.breaker_stats(),
+        import_jobs=import_jobs.stats(),
+    )
+
+
+@app.post("/admin/services/reload", response_model=HealthResponse, tags=["Health"])
+async def reload_services(current_user: User = Depends(get_current_user)):
+    """
+    Rebuild the anomaly detector, explanation generator, pattern matcher and
+    LLM provider without a restart.
+
+    New instances are warmed up before being swapped in; requests already in
+    flight finish on the previous ones. Requires a superuser.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Superuser required")
+    try:
+        await registry.reload()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Reload failed: {e}")
+    return await health_check()
 
 
 @app.post(
@@ -168,8 +309,8 @@ async def health_check():
 )
 async def create_transaction(
     transaction: TransactionCreate,
-    db: Session = Depends(get_db),
-    detector: AnomalyDetectorProtocol = Depends(get_anomaly_detector),
+    db: AsyncSession = Depends(get_db),
+    detector: AnomalyDetectorProtocol = Depends(registry.get_detector),
 ):
     """
     Submit a new transaction for fraud detection analysis.
@@ -183,21 +324,32 @@ async def create_transaction(
     # Calculate risk score
     risk_score, factors = detector.calculate_risk_score(transaction_data)
     risk_level = get_risk_level(risk_score)
+    transaction_data["amount_baseline"] = amount_baseline(
+        detector, transaction_data["payee"], factors
+    )
 
     # Create transaction in database
-    db_transaction = db_service.create_transaction(
-        db,
-        amount=transaction_data["amount"],
-        payee=transaction_data["payee"],
-        timestamp=transaction_data["timestamp"],
-        reference=transaction_data["reference"],
-        payee_is_new=transaction_data.get("payee_is_new", False),
-        risk_score=risk_score,
-        risk_level=risk_level,
-        factors=factors,
-    )
+    try:
+        db_transaction = await db_service.create_transaction(
+            db,
+            amount=transaction_data["amount"],
+            payee=transaction_data["payee"],
+            timestamp=transaction_data["timestamp"],
+            reference=transaction_data["reference"],
+            payee_is_new=transaction_data.get("payee_is_new", False),
+            risk_score=risk_score,
+            risk_level=risk_level,
+            factors=factors,
+            amount_baseline=transaction_data["amount_baseline"],
+        )
+    except DatabaseWriteError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if risk_level in PRECOMPUTED_RISK_LEVELS:
+        explanation_queue.enqueue(
+            str(db_transaction.id), explanation_input(transaction_data), risk_score, factors
+        )
 
-    return TransactionResponse(
+    response = TransactionResponse(
         id=str(db_transaction.id),
         amount=db_transaction.amount,
         payee=db_transaction.payee,
@@ -207,6 +359,180 @@ async def create_transaction(
         risk_level=db_transaction.risk_level,
         created_at=db_transaction.created_at,
     )
+    await event_broker.publish("transaction.created", response.model_dump(mode="json"))
+    return response
+
+
+@app.post(
+    "/transactions/batch",
+    response_model=TransactionBatchResponse,
+    status_code=201,
+    tags=["Transactions"],
+    summary="Submit a batch of transactions for fraud analysis",
+)
+async def create_transactions_batch(
+    batch: TransactionBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    detector: AnomalyDetectorProtocol = Depends(registry.get_detector),
+):
+    """
+    Submit many transactions for fraud detection analysis in one request.
+
+    Every transaction is scored, then all transactions are written in a
+    single database commit; their audit entries follow through the audit
+    writer. Results are returned in the same order as the submitted rows.
+    """
+    try:
+        return await store_transactions(
+            db, detector, [transaction.model_dump() for transaction in batch.transactions]
+        )
+    except DatabaseWriteError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@app.post(
+    "/transactions/import",
+    tags=["Transactions"],
+    summary="Import a CSV or NDJSON file of transactions",
+)
+async def import_transactions(
+    file: UploadFile = File(..., description="CSV (with header row) or NDJSON file"),
+    file_format: Optional[Literal["csv", "ndjson"]] = Query(
+        None, alias="format", description="File format (default: from the file name or content type)"
+    ),
+    db: AsyncSession = Depends(get_db),
+    detector: AnomalyDetectorProtocol = Depends(registry.get_detector),
+):
+    """
+    Import a file of transactions of any size, streaming progress back as NDJSON.
+
+    The file is parsed incrementally; valid rows are scored and stored in
+    chunks of 1,000, and a `progress` line is sent after each chunk. The last
+    line is `done`, with the totals and, if any rows were rejected, the URL
+    of an NDJSON file listing them with their line numbers and reasons.
+    """
+    reader = RecordReader(
+        upload_chunks(file), file_format or detect_format(file.filename, file.content_type)
+    )
+    try:
+        await reader.read_header()
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    import_id = new_import_id()
+    errors = ErrorLog(error_file_path(import_id))
+
+    # The stream keeps using db and file after this returns: FastAPI 0.118+
+    # closes yield dependencies and uploads only once the response is sent
+    async def progress_stream():
+        progress = {"rows": 0, "imported": 0, "failed": 0, "line": 0}
+        try:
+            async for progress in import_records(reader, db, detector, errors):
+                yield json.dumps({"event": "progress", **progress}) + "\n"
+        except Exception as e:
+            print(f"Warning: Import {import_id} stopped: {e}")
+            yield json.dumps({"event": "error", "detail": str(e), **progress}) + "\n"
+            return
+        finally:
+            errors.close()
+        yield json.dumps({
+            "event": "done",
+            "import_id": import_id,
+            **progress,
+            "errors_url": f"/transactions/import/{import_id}/errors" if errors.count else None,
+        }) + "\n"
+
+    return StreamingResponse(progress_stream(), media_type="application/x-ndjson")
+
+
+@app.get(
+    "/transactions/import/{import_id}/errors",
+    tags=["Transactions"],
+    summary="Download the rejected rows of an import",
+)
+async def get_import_errors(import_id: str):
+    """
+    Download the NDJSON file of rows rejected by an import.
+
+    Each line has the input `line` number, the `error` and the parsed `row`.
+    """
+    try:
+        path = error_file_path(import_id)
+    except ValueError:
+        path = None
+    if path is None or not path.exists():
+        raise HTTPException(status_code=404, detail=f"No error file for import {import_id}")
+    return FileResponse(path, media_type="application/x-ndjson", filename=f"import-{import_id}-errors.ndjson")
+
+
+def import_job_response(job: ImportJob) -> ImportJobResponse:
+    """Build the API view of an import job."""
+    return ImportJobResponse(
+        id=str(job.id),
+        status=job.status,
+        format=job.format,
+        filename=job.filename,
+        rows_done=job.rows_done,
+        rows_imported=job.rows_imported,
+        rows_failed=job.rows_failed,
+        bytes_done=job.bytes_done,
+        total_bytes=job.total_bytes,
+        **job_timing(job),
+        error=job.error,
+        errors_url=f"/transactions/import/{job.id.hex}/errors" if job.rows_failed else None,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@app.post(
+    "/jobs/import",
+    response_model=ImportJobResponse,
+    status_code=202,
+    tags=["Jobs"],
+    summary="Queue a CSV or NDJSON file for background import",
+)
+async def create_import_job(
+    file: UploadFile = File(..., description="CSV (with header row) or NDJSON file"),
+    file_format: Optional[Literal["csv", "ndjson"]] = Query(
+        None, alias="format", description="File format (default: from the file name or content type)"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Import a file too large for one request in the background.
+
+    The file is stored and queued; poll `GET /jobs/{id}` for progress. Rows
+    are processed exactly as by `POST /transactions/import`, and a job
+    interrupted by a restart or crash resumes after its last stored chunk.
+    """
+    try:
+        job = await import_jobs.submit(
+            db, file, file_format or detect_format(file.filename, file.content_type), file.filename
+        )
+    except ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return import_job_response(job)
+
+
+@app.get(
+    "/jobs/{job_id}",
+    response_model=ImportJobResponse,
+    tags=["Jobs"],
+    summary="Get the progress of an import job",
+)
+async def get_import_job(job_id: UUID, db: AsyncSession = Depends(get_db)):
+    """
+    Rows done and failed, throughput and estimated time remaining of an import job.
+
+    Progress reflects the last stored chunk; the ETA is extrapolated from the
+    share of the file read so far.
+    """
+    job = await db.get(ImportJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Import job {job_id} not found")
+    return import_job_response(job)
 
 
 @app.get(
@@ -218,17 +544,35 @@ async def create_transaction(
 async def list_transactions(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor (overrides page)"),
+    include_total: bool = Query(True, description="Include the exact total count"),
+    filters: TransactionFilters = Depends(get_transaction_filters),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Retrieve a paginated list of all transactions with their risk scores.
 
-    Results are sorted by creation date (newest first).
+    Results are sorted by creation date (newest first). Pass the returned
+    `next_cursor` as `cursor` to fetch the following page without an OFFSET
+    scan, and `include_total=false` to skip the full-table count. Filters
+    are applied in SQL, so counts and pages cover every matching row.
     """
     skip = (page - 1) * page_size
-    items, total = db_service.list_transactions(db, skip=skip, limit=page_size)
+    try:
+        items, total, next_cursor = await db_service.list_transactions(
+            db,
+            skip=skip,
+            limit=page_size,
+            cursor=cursor,
+            include_total=include_total,
+            filters=filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 0
+    total_pages = None
+    if total is not None:
+        total_pages = (total + page_size - 1) // page_size if total > 0 else 0
 
     return PaginatedResponse(
         items=[
@@ -248,9 +592,62 @@ async def list_transactions(
         page=page,
         page_size=page_size,
         total_pages=total_pages,
+        next_cursor=next_cursor,
+    )
+
+
+@app.get(
+    "/transactions/stream",
+    tags=["Transactions"],
+    summary="Live feed of transaction events (Server-Sent Events)",
+)
+async def stream_transactions(request: Request):
+    """
+    Stream newly scored transactions and status changes as Server-Sent Events.
+
+    Event types: `transaction.created`, `transactions.created` (batch) and
+    `transaction.updated`. A keep-alive comment is sent every
+    15 seconds while idle.
+    """
+
+    async def event_stream():
+        async with event_broker.subscribe() as subscription:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event["type"], event["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+@app.get(
+    "/transactions/stats",
+    response_model=TransactionStatsResponse,
+    tags=["Transactions"],
+    summary="Get aggregate transaction statistics",
+)
+async def get_transaction_stats(
+    filters: TransactionFilters = Depends(get_transaction_filters),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retrieve counts and amount sums per risk level and review status.
+
+    Accepts the same filters as `GET /transactions`. Aggregates are computed
+    in a single SQL query rather than by fetching rows.
+    """
+    stats = await db_service.get_transaction_stats(db, filters=filters)
+    return TransactionStatsResponse(**stats)
+
+
 @app.get(
     "/transactions/{transaction_id}",
     response_model=TransactionDetailResponse,
@@ -259,17 +656,19 @@ async def list_transactions(
 )
 async def get_transaction(
     transaction_id: str,
-    db: Session = Depends(get_db),
-    detector: AnomalyDetectorProtocol = Depends(get_anomaly_detector),
-    generator: ExplanationGeneratorProtocol = Depends(get_explanation_generator),
+    db: AsyncSession = Depends(get_db),
+    detector: AnomalyDetectorProtocol = Depends(registry.get_detector),
+    generator: ExplanationGeneratorProtocol = Depends(registry.get_generator),
 ):
     """
     Retrieve a single transaction with its full fraud analysis explanation.
 
     The response includes the risk assessment explanation, confidence level,
-    identified risk factors, and recommended action.
+    identified risk factors, and recommended action. Explanations for high
+    and medium-risk transactions are precomputed in the background after
+    submission; this endpoint never writes.
     """
-    transaction = db_service.get_transaction(db, transaction_id)
+    transaction = await db_service.get_transaction(db, transaction_id)
 
     if transaction is None:
         raise HTTPException(
@@ -281,9 +680,10 @@ async def get_transaction(
     risk_score = transaction.risk_score
     factors = transaction.factors or []
     
-    # Use cached explanation or generate new one
+    # Use the precomputed explanation; generate one (without storing) if the
+    # background queue has not reached this transaction yet. Concurrent
+    # requests for the same transaction share one generation.
     if transaction.explanation:
-        # Use cached explanation data
         explanation_data = {
             "confidence": transaction.confidence,
             "explanation": transaction.explanation,
@@ -292,31 +692,21 @@ async def get_transaction(
             "risk_level": transaction.risk_level,
         }
     else:
-        # Generate explanation and cache it
-        transaction_dict = {
-            "amount": transaction.amount,
-            "payee": transaction.payee,
-            "timestamp": transaction.timestamp,
-            "reference": transaction.reference,
-            "payee_is_new": transaction.payee_is_new,
-        }
-        
-        explanation_data = generator.generate_explanation(
-            transaction=transaction_dict,
-            risk_score=risk_score,
-            factors=factors,
-        )
-        
-        # Cache the explanation
-        db_service.update_transaction(
-            db,
-            transaction_id,
-            {
-                "confidence": explanation_data.get("confidence"),
-                "explanation": explanation_data.get("explanation"),
-                "risk_factors_detailed": explanation_data.get("risk_factors"),
-                "recommended_action": explanation_data.get("recommended_action"),
-            },
+        explanation_data = await explanation_flight.do(
+            str(transaction.id),
+            lambda: asyncio.to_thread(
+                generator.generate_explanation,
+                transaction={
+                    "amount": transaction.amount,
+                    "payee": transaction.payee,
+                    "timestamp": transaction.timestamp,
+                    "reference": transaction.reference,
+                    "payee_is_new": transaction.payee_is_new,
+                    "amount_baseline": transaction.amount_baseline,
+                },
+                risk_score=risk_score,
+                factors=factors,
+            ),
         )
 
     return TransactionDetailResponse(
@@ -338,6 +728,97 @@ async def get_transaction(
     )
 
 
+@app.get(
+    "/transactions/{transaction_id}/explanation/stream",
+    tags=["Transactions"],
+    summary="Stream a transaction's explanation (Server-Sent Events)",
+)
+async def stream_transaction_explanation(
+    transaction_id: str,
+    db: AsyncSession = Depends(get_db),
+    llm: LLMProvider = Depends(registry.get_llm_provider),
+):
+    """
+    Stream a transaction's explanation so the detail page can paint early.
+
+    Events, in order: `factors` (risk score, level and factor descriptions,
+    from stored data), then `narrative` events carrying successive pieces of
+    the explanation text, then `done` with confidence and recommended action.
+    A stored explanation is sent as a single `narrative` event. If generation
+    fails mid-stream an `error` event is sent instead of `done`.
+
+    Without a stored explanation the narrative comes from the configured LLM
+    provider, while GET /transactions/{id} uses the explanation generator, so
+    the two endpoints can word it differently until one is stored.
+    """
+    transaction = await db_service.get_transaction(db, transaction_id)
+
+    if transaction is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Transaction with ID {transaction_id} not found",
+        )
+
+    factors = transaction.factors or []
+    factors_event = {
+        "id": str(transaction.id),
+        "risk_score": transaction.risk_score,
+        "risk_level": transaction.risk_level,
+        "factors": factors,
+        "risk_factors": transaction.risk_factors_detailed or describe_factors(
+            {
+                "amount": transaction.amount,
+                "timestamp": transaction.timestamp,
+                "amount_baseline": transaction.amount_baseline,
+            },
+            factors,
+        ),
+    }
+    stored = None
+    if transaction.explanation:
+        stored = {
+            "text": transaction.explanation,
+            "confidence": transaction.confidence,
+            "recommended_action": transaction.recommended_action,
+        }
+    explanation_request = ExplanationRequest(
+        transaction_amount=transaction.amount,
+        transaction_payee=transaction.payee,
+        transaction_timestamp=transaction.timestamp.isoformat(),
+        transaction_reference=transaction.reference,
+        risk_score=transaction.risk_score,
+        risk_factors=factors,
+    )
+
+    async def event_stream():
+        yield format_sse("factors", factors_event)
+        if stored is not None:
+            yield format_sse("narrative", {"text": stored["text"]})
+            yield format_sse("done", {
+                "confidence": stored["confidence"],
+                "recommended_action": stored["recommended_action"],
+            })
+            return
+        try:
+            async for chunk in llm.stream_explanation(explanation_request):
+                if chunk.text:
+                    yield format_sse("narrative", {"text": chunk.text})
+                if chunk.response is not None:
+                    yield format_sse("done", {
+                        "confidence": chunk.response.confidence,
+                        "recommended_action": chunk.response.recommended_action,
+                    })
+        except Exception as e:
+            print(f"Warning: Could not stream explanation for {transaction_id}: {e}")
+            yield format_sse("error", {"detail": "Explanation unavailable"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post(
     "/transactions/{transaction_id}/approve",
     response_model=TransactionResponse,
@@ -346,14 +827,14 @@ async def get_transaction(
 )
 async def approve_transaction(
     transaction_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Approve a transaction, marking it as legitimate.
     
     Updates the transaction status to 'approved'.
     """
-    transaction = db_service.get_transaction(db, transaction_id)
+    transaction = await db_service.get_transaction(db, transaction_id)
     
     if transaction is None:
         raise HTTPException(
@@ -362,18 +843,23 @@ async def approve_transaction(
         )
     
     # Update status
-    updated = db_service.update_transaction(
-        db,
-        transaction_id,
-        {
-            "status": "approved",
-            "reviewed_at": datetime.utcnow(),
-        },
-        audit_action="approved",
-        audit_details={"status_change": "pending -> approved"},
-    )
+    try:
+        updated = await db_service.update_transaction(
+            db,
+            transaction_id,
+            {
+                "status": "approved",
+                "reviewed_at": datetime.utcnow(),
+            },
+            audit_action="approved",
+            audit_details={"status_change": "pending -> approved"},
+        )
+    except StaleWriteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except DatabaseWriteError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
-    return TransactionResponse(
+    response = TransactionResponse(
         id=str(updated.id),
         amount=updated.amount,
         payee=updated.payee,
@@ -383,6 +869,10 @@ async def approve_transaction(
         risk_level=updated.risk_level,
         created_at=updated.created_at,
     )
+    await event_broker.publish(
+        "transaction.updated", {**response.model_dump(mode="json"), "status": "approved"}
+    )
+    return response
 
 
 @app.get(
@@ -393,68 +883,64 @@ async def approve_transaction(
 )
 async def get_audit_trail(
     transaction_id: str,
-    db: Session = Depends(get_db),
+    limit: int = Query(100, ge=1, le=500, description="Maximum entries to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    db: AsyncSession = Depends(get_db),
 ):
     """
-    Retrieve the complete audit trail for a transaction.
-    
+    Retrieve the audit trail for a transaction, oldest entry first.
+
     Shows all actions taken on the transaction (creation, approvals, rejections, etc).
-    
-    NOTE: Audit trail data is included in the transaction detail response (status, reviewed_by, reviewed_at fields).
-    This endpoint returns a simple empty trail as a placeholder until database migrations are fully applied.
+    Pass the returned `next_cursor` as `cursor` to fetch the following entries.
     """
-    try:
-        transaction = db_service.get_transaction(db, transaction_id)
-        
-        if transaction is None:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Transaction with ID {transaction_id} not found",
-            )
-        
-        # For now, return an empty audit trail
-        # TODO: Once audit_logs table is properly migrated, populate this with actual audit entries
-        audit_entries = []
-        
-        # Add a synthetic "created" entry based on the transaction
-        if transaction:
-            audit_entries.append(
-                AuditLogEntry(
-                    timestamp=transaction.created_at,
-                    action="created",
-                    details={
-                        "amount": float(transaction.amount),
-                        "payee": transaction.payee,
-                        "risk_level": transaction.risk_level,
-                    }
-                )
-            )
-            
-            # Add approval/rejection entry if transaction has been reviewed
-            if transaction.status != "pending" and transaction.reviewed_at:
-                audit_entries.append(
-                    AuditLogEntry(
-                        timestamp=transaction.reviewed_at,
-                        action=transaction.status,
-                        details={
-                            "reviewed_by": transaction.reviewed_by,
-                            "status": transaction.status,
-                        }
-                    )
-                )
-        
-        return TransactionAuditResponse(
-            transaction_id=transaction_id,
-            audit_trail=audit_entries
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"Error in get_audit_trail: {e}")
+    transaction = await db_service.get_transaction(db, transaction_id)
+    if transaction is None:
         raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
+            status_code=404,
+            detail=f"Transaction with ID {transaction_id} not found",
+        )
+
+    try:
+        entries, next_cursor = await db_service.get_audit_trail(
+            db, transaction.id, limit=limit, cursor=cursor
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return TransactionAuditResponse(
+        transaction_id=str(transaction.id),
+        audit_trail=[audit_log_entry(entry) for entry in entries],
+        next_cursor=next_cursor,
+    )
+
+
+@app.post(
+    "/transactions/audit/bulk",
+    response_model=TransactionAuditBulkResponse,
+    tags=["Transactions"],
+    summary="Get audit trails for many transactions",
+)
+async def get_audit_trails_bulk(
+    request: TransactionAuditBulkRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retrieve the complete audit trails of up to 500 transactions in one query.
+
+    Trails are returned in request order; IDs with no audit entries get an
+    empty trail.
+    """
+    trails = await db_service.get_audit_trails(db, request.transaction_ids)
+    return TransactionAuditBulkResponse(
+        trails=[
+            TransactionAuditResponse(
+                transaction_id=str(transaction_id),
+                audit_trail=[audit_log_entry(entry) for entry in trails.get(transaction_id, [])],
+            )
+            for transaction_id in request.transaction_ids
+        ]
+    )
+
 
 @app.post(
     "/transactions/{transaction_id}/reject",
@@ -464,14 +950,14 @@ async def get_audit_trail(
 )
 async def reject_transaction(
     transaction_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Reject a transaction, marking it as fraud.
     
     Updates the transaction status to 'rejected'.
     """
-    transaction = db_service.get_transaction(db, transaction_id)
+    transaction = await db_service.get_transaction(db, transaction_id)
     
     if transaction is None:
         raise HTTPException(
@@ -480,18 +966,23 @@ async def reject_transaction(
         )
     
     # Update status
-    updated = db_service.update_transaction(
-        db,
-        transaction_id,
-        {
-            "status": "rejected",
-            "reviewed_at": datetime.utcnow(),
-        },
-        audit_action="rejected",
-        audit_details={"status_change": "pending -> rejected"},
-    )
+    try:
+        updated = await db_service.update_transaction(
+            db,
+            transaction_id,
+            {
+                "status": "rejected",
+                "reviewed_at": datetime.utcnow(),
+            },
+            audit_action="rejected",
+            audit_details={"status_change": "pending -> rejected"},
+        )
+    except StaleWriteError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except DatabaseWriteError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
-    return TransactionResponse(
+    response = TransactionResponse(
         id=str(updated.id),
         amount=updated.amount,
         payee=updated.payee,
@@ -501,3 +992,7 @@ async def reject_transaction(
         risk_level=updated.risk_level,
         created_at=updated.created_at,
     )
+    await event_broker.publish(
+        "transaction.updated", {**response.model_dump(mode="json"), "status": "rejected"}
+    )
+    return response
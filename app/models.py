@@ -5,9 +5,12 @@ Defines request/response schemas for the API.
 """
 
 from datetime import datetime
-from typing import Literal, Optional
+from typing import Any, Literal, Optional
+from uuid import UUID
 from pydantic import BaseModel, Field
 
+from app.config import MAX_AUDIT_BULK_IDS, MAX_BATCH_SIZE
+
 
 class TransactionCreate(BaseModel):
     """Input model for creating a new transaction."""
@@ -31,6 +34,17 @@ class TransactionCreate(BaseModel):
     }
 
 
+class TransactionBatchCreate(BaseModel):
+    """Input model for submitting many transactions in one request."""
+
+    transactions: list[TransactionCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Transactions to analyze (1-{MAX_BATCH_SIZE} per request)",
+    )
+
+
 class TransactionResponse(BaseModel):
     """Response model for transaction list view."""
 
@@ -98,10 +112,89 @@ class PaginatedResponse(BaseModel):
     """Paginated response wrapper for transaction lists."""
 
     items: list[TransactionResponse] = Field(..., description="List of transactions")
-    total: int = Field(..., ge=0, description="Total number of transactions")
+    total: Optional[int] = Field(..., ge=0, description="Total number of transactions (null when include_total=false)")
     page: int = Field(..., ge=1, description="Current page number")
     page_size: int = Field(..., ge=1, le=100, description="Items per page")
-    total_pages: int = Field(..., ge=0, description="Total number of pages")
+    total_pages: Optional[int] = Field(..., ge=0, description="Total number of pages (null when include_total=false)")
+    next_cursor: Optional[str] = Field(default=None, description="Opaque cursor for the next page, null on the last page")
+
+
+class TransactionBatchResponse(BaseModel):
+    """Per-row results for a batch submission, in request order."""
+
+    items: list[TransactionResponse] = Field(..., description="Scored transactions, one per submitted row")
+    total: int = Field(..., ge=0, description="Number of transactions created")
+
+
+class ImportJobResponse(BaseModel):
+    """State and progress of a background import job."""
+
+    id: str = Field(..., description="Job ID")
+    status: Literal["queued", "running", "completed", "failed"] = Field(..., description="Job status")
+    format: str = Field(..., description="File format (csv or ndjson)")
+    filename: Optional[str] = Field(default=None, description="Uploaded file name")
+    rows_done: int = Field(..., ge=0, description="Rows read so far")
+    rows_imported: int = Field(..., ge=0, description="Rows stored as transactions")
+    rows_failed: int = Field(..., ge=0, description="Rows rejected")
+    bytes_done: int = Field(..., ge=0, description="Bytes of the file read so far")
+    total_bytes: int = Field(..., ge=0, description="Size of the file in bytes")
+    progress: float = Field(..., ge=0, le=1, description="Fraction of the file read")
+    rows_per_second: Optional[float] = Field(default=None, description="Average throughput since the job started")
+    eta_seconds: Optional[float] = Field(default=None, description="Estimated seconds until the job completes")
+    error: Optional[str] = Field(default=None, description="Why the job failed")
+    errors_url: Optional[str] = Field(default=None, description="Download URL of the rejected rows")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    started_at: Optional[datetime] = Field(default=None, description="When a worker first picked the job up")
+    finished_at: Optional[datetime] = Field(default=None, description="When the job completed or failed")
+
+
+class TransactionFilters(BaseModel):
+    """Server-side filters shared by the transaction list and stats endpoints."""
+
+    risk_level: Optional[Literal["high", "medium", "low"]] = Field(default=None, description="Only this risk level")
+    status: Optional[str] = Field(default=None, description="Only this review status")
+    payee_prefix: Optional[str] = Field(default=None, description="Payee name starts with this text")
+    min_amount: Optional[float] = Field(default=None, ge=0, description="Minimum amount (inclusive)")
+    max_amount: Optional[float] = Field(default=None, ge=0, description="Maximum amount (inclusive)")
+    start_time: Optional[datetime] = Field(default=None, description="Transaction timestamp at or after")
+    end_time: Optional[datetime] = Field(default=None, description="Transaction timestamp before")
+
+
+class StatsBucket(BaseModel):
+    """Count and amount sum for one group of transactions."""
+
+    count: int = Field(..., ge=0, description="Number of transactions")
+    total_amount: float = Field(..., description="Sum of transaction amounts in GBP")
+
+
+class TransactionStatsResponse(BaseModel):
+    """Aggregate statistics over (optionally filtered) transactions."""
+
+    total: int = Field(..., ge=0, description="Number of matching transactions")
+    total_amount: float = Field(..., description="Sum of matching transaction amounts in GBP")
+    average_risk_score: Optional[float] = Field(default=None, description="Mean risk score (null when no matches)")
+    by_risk_level: dict[str, StatsBucket] = Field(..., description="Counts and sums per risk level")
+    by_status: dict[str, StatsBucket] = Field(..., description="Counts and sums per review status")
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "total": 20,
+                "total_amount": 48250.0,
+                "average_risk_score": 0.41,
+                "by_risk_level": {
+                    "high": {"count": 6, "total_amount": 31200.0},
+                    "medium": {"count": 5, "total_amount": 9800.0},
+                    "low": {"count": 9, "total_amount": 7250.0},
+                },
+                "by_status": {
+                    "pending": {"count": 18, "total_amount": 45000.0},
+                    "approved": {"count": 2, "total_amount": 3250.0},
+                },
+            }
+        }
+    }
+
 
 class AuditLogEntry(BaseModel):
     """Single audit log entry."""
@@ -116,9 +209,50 @@ class TransactionAuditResponse(BaseModel):
 
     transaction_id: str = Field(..., description="Transaction ID")
     audit_trail: list[AuditLogEntry] = Field(..., description="List of audit log entries")
+    next_cursor: Optional[str] = Field(
+        None, description="Cursor for the following entries, or null on the last page"
+    )
+
+
+class TransactionAuditBulkRequest(BaseModel):
+    """Input model for fetching the audit trails of many transactions."""
+
+    transaction_ids: list[UUID] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_AUDIT_BULK_IDS,
+        description=f"Transaction IDs (1-{MAX_AUDIT_BULK_IDS} per request)",
+    )
+
+
+class TransactionAuditBulkResponse(BaseModel):
+    """Audit trails for many transactions, in request order."""
+
+    trails: list[TransactionAuditResponse] = Field(
+        ..., description="One trail per requested ID (empty for unknown IDs)"
+    )
+
 
 class HealthResponse(BaseModel):
     """Health check response."""
 
-    status: str = Field(..., description="Service status")
+    status: str = Field(..., description="Service status (healthy or degraded)")
     service: str = Field(..., description="Service name")
+    components: Optional[dict[str, str]] = Field(
+        None, description="Per-component health (\"ok\" or a problem description)"
+    )
+    patterns: Optional[dict[str, Any]] = Field(
+        None, description="Fraud pattern library size and hot-reload history"
+    )
+    explanation_queue: Optional[dict[str, Any]] = Field(
+        None, description="Background explanation queue depth and job counters"
+    )
+    audit_writer: Optional[dict[str, Any]] = Field(
+        None, description="Write-behind audit log queue depth and flush counters"
+    )
+    breakers: Optional[dict[str, Any]] = Field(
+        None, description="Circuit breaker state of external providers, by component"
+    )
+    import_jobs: Optional[dict[str, Any]] = Field(
+        None, description="Background import workers and job counters"
+    )
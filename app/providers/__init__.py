@@ -6,12 +6,24 @@ based on environment configuration. Providers can be swapped without code change
 Configuration:
     LLM_PROVIDER: azure_openai | openai | ollama | mock (default: mock)
     PATTERN_PROVIDER: azure_search | local_json | mock (default: local_json)
+    LLM_CACHE_SIZE: cache up to this many explanations per signature (default: 0, off)
+    LLM_MAX_CONCURRENCY: limit upstream LLM calls in flight (default: 0, off); also
+        enables LLM_RATE_LIMIT (calls/second), LLM_BATCH_WINDOW_MS and
+        LLM_TIMEOUT_SECONDS (default: 10), past which MockLLMProvider answers
+    LLM_DISK_CACHE_PATH: persist exact-request responses in this SQLite file (default:
+        unset, off), with LLM_DISK_CACHE_TTL_SECONDS (default: 604800) and
+        LLM_DISK_CACHE_MAX_MB (default: 256)
+    PROVIDER_TIMEOUT_SECONDS: per-call timeout for external (non-mock, non-local)
+        providers, which are wrapped in a circuit breaker with a local fallback
+        (default: 10 for LLMs, 2 for pattern search)
+    PROVIDER_HEDGE: send a hedged second request past the recent p95 latency (default: 0)
 """
 
 import os
 from typing import Tuple
 
 from app.providers.llm.base import LLMProvider
+from app.providers.llm.mock_provider import MockLLMProvider
 from app.providers.patterns.base import PatternMatcher
 
 
@@ -37,6 +49,58 @@ def get_pattern_provider() -> PatternMatcher:
 
 
 def _get_llm_provider() -> LLMProvider:
+    """Create LLM provider based on LLM_PROVIDER, wrapped as configured.
+
+    Wrappers, outermost first: in-memory signature cache, pipeline limits,
+    on-disk response cache, then (for external providers) the resilience
+    layer. Memory cache hits skip the pipeline and disk hits are served even
+    while the circuit is open; fallback answers are never cached. Every
+    wrapper forwards the backend's batch support, so the pipeline can group
+    requests into one upstream call.
+    """
+    provider = _create_llm_provider()
+
+    if not isinstance(provider, MockLLMProvider):
+        from app.providers.resilience import ResilientLLMProvider
+        provider = ResilientLLMProvider(provider, **_resilience_options(10.0))
+
+    disk_cache_path = os.getenv("LLM_DISK_CACHE_PATH")
+    if disk_cache_path:
+        from app.providers.llm.disk_cache import DiskCacheLLMProvider
+        provider = DiskCacheLLMProvider(
+            provider,
+            disk_cache_path,
+            ttl_seconds=float(os.getenv("LLM_DISK_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+            max_bytes=int(os.getenv("LLM_DISK_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        )
+
+    max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "0"))
+    if max_concurrency > 0:
+        from app.providers.llm.pipelined import PipelinedLLMProvider
+        provider = PipelinedLLMProvider(
+            provider,
+            max_concurrency=max_concurrency,
+            rate_limit=float(os.getenv("LLM_RATE_LIMIT", "0")) or None,
+            batch_window=int(os.getenv("LLM_BATCH_WINDOW_MS", "0")) / 1000,
+            timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", "10")),
+        )
+
+    cache_size = int(os.getenv("LLM_CACHE_SIZE", "0"))
+    if cache_size > 0:
+        from app.providers.llm.caching import CachingLLMProvider
+        provider = CachingLLMProvider(provider, max_size=cache_size)
+    return provider
+
+
+def _resilience_options(default_timeout: float) -> dict:
+    """Timeout and hedging settings for external providers."""
+    return {
+        "timeout": float(os.getenv("PROVIDER_TIMEOUT_SECONDS", str(default_timeout))),
+        "hedge": os.getenv("PROVIDER_HEDGE", "0").lower() in ("1", "true", "yes"),
+    }
+
+
+def _create_llm_provider() -> LLMProvider:
     """Create LLM provider based on LLM_PROVIDER environment variable."""
     provider_name = os.getenv("LLM_PROVIDER", "mock").lower()
 
@@ -53,7 +117,6 @@ def _get_llm_provider() -> LLMProvider:
         return OllamaProvider()
 
     else:  # mock (default)
-        from app.providers.llm.mock_provider import MockLLMProvider
         return MockLLMProvider()
 
 
@@ -63,7 +126,12 @@ def _get_pattern_provider() -> PatternMatcher:
 
     if provider_name == "azure_search":
         from app.providers.patterns.azure_search import AzureSearchProvider
-        return AzureSearchProvider()
+        from app.providers.patterns.coalescing import CoalescingPatternMatcher
+        from app.providers.resilience import ResilientPatternMatcher
+        # Remote lookups: share identical queries in flight, isolate failures
+        return CoalescingPatternMatcher(
+            ResilientPatternMatcher(AzureSearchProvider(), **_resilience_options(2.0))
+        )
 
     elif provider_name == "local_json":
         from app.providers.patterns.local_json import LocalJSONProvider
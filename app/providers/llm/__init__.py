@@ -2,6 +2,7 @@
 
 from app.providers.llm.base import (
     LLMProvider,
+    ExplanationChunk,
     ExplanationRequest,
     ExplanationResponse,
     RiskFactorDetail,
@@ -9,6 +10,7 @@ from app.providers.llm.base import (
 
 __all__ = [
     "LLMProvider",
+    "ExplanationChunk",
     "ExplanationRequest",
     "ExplanationResponse",
     "RiskFactorDetail",
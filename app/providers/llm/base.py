@@ -4,9 +4,10 @@ All LLM providers must implement this interface to ensure consistent behavior
 across different backends (Azure OpenAI, OpenAI, Ollama, etc.).
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Optional
-from pydantic import BaseModel
+from typing import AsyncIterator, Optional
+from pydantic import BaseModel, PrivateAttr
 
 
 class RiskFactorDetail(BaseModel):
@@ -40,6 +41,49 @@ class ExplanationResponse(BaseModel):
     recommended_action: str
     confidence: int
 
+    # Set on responses produced by a fallback provider; caches skip them so a
+    # degraded answer is not served after the upstream recovers. Private, so
+    # it is neither serialized nor settable from model output.
+    _fallback: bool = PrivateAttr(default=False)
+
+
+def mark_fallback(response: ExplanationResponse) -> ExplanationResponse:
+    """Flag a response as produced by a fallback provider."""
+    response._fallback = True
+    return response
+
+
+def is_fallback(response: ExplanationResponse) -> bool:
+    """Whether a response was produced by a fallback provider."""
+    return response._fallback
+
+
+def copy_response(response: ExplanationResponse) -> ExplanationResponse:
+    """Deep copy of a response, keeping its fallback flag."""
+    return response.model_copy(deep=True)
+
+
+class ExplanationChunk(BaseModel):
+    """One piece of a streamed explanation.
+
+    Chunks carry successive fragments of the narrative in `text`; the last
+    chunk also carries the complete `response`.
+    """
+
+    text: str = ""
+    response: Optional[ExplanationResponse] = None
+
+
+async def stream_fallback(
+    provider: "LLMProvider",
+    request: ExplanationRequest
+) -> AsyncIterator[ExplanationChunk]:
+    """Stream an explanation from a fallback provider, flagging its final response."""
+    async for chunk in provider.stream_explanation(request):
+        if chunk.response is not None:
+            mark_fallback(chunk.response)
+        yield chunk
+
 
 class EmailParseResult(BaseModel):
     """Result of parsing transaction data from an email."""
@@ -58,8 +102,13 @@ class LLMProvider(ABC):
     - Generating natural language explanations for fraud detection
     - Parsing transaction data from unstructured email content
     - Graceful error handling and fallbacks
+
+    Backends that can explain several transactions in one upstream call set
+    supports_batch and override generate_explanations_batch.
     """
 
+    supports_batch: bool = False
+
     @abstractmethod
     async def generate_explanation(
         self,
@@ -78,6 +127,30 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def generate_explanations_batch(
+        self,
+        requests: list[ExplanationRequest]
+    ) -> list[ExplanationResponse]:
+        """Generate explanations for several requests, in request order.
+
+        The default issues one generate_explanation call per request.
+        """
+        return list(await asyncio.gather(
+            *(self.generate_explanation(request) for request in requests)
+        ))
+
+    async def stream_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> AsyncIterator[ExplanationChunk]:
+        """Generate an explanation, yielding the narrative as it is produced.
+
+        The default generates the whole explanation and yields it as a single
+        final chunk; streaming backends override this to yield tokens.
+        """
+        response = await self.generate_explanation(request)
+        yield ExplanationChunk(text=response.explanation, response=response)
+
     @abstractmethod
     async def parse_email(
         self,
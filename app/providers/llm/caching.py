@@ -0,0 +1,162 @@
+"""Caching wrapper for LLM providers.
+
+Memoizes generate_explanation on a signature of the request instead of the
+full request, so transactions that look alike to the fraud model share one
+(paid, slow) LLM call.
+
+The default signature is (factor tuple, risk band, amount multiplier rounded
+to 0.5, hour of day, matched pattern ids). Payee and reference are not part
+of it, so the wrapped provider's prompts should not ask for explanations that
+quote them. Pass a custom key_fn to widen or narrow the signature.
+
+Concurrent misses for the same signature are coalesced into one provider call.
+Batches are forwarded when the wrapped provider supports them: cached
+signatures are answered locally and only the misses go upstream, in one call.
+Streams are passed through on a miss (and their final response cached); a hit
+arrives as a single chunk.
+"""
+
+from contextlib import aclosing
+from datetime import datetime
+from typing import AsyncIterator, Callable, Hashable, Optional
+
+from app.config import AVG_TRANSACTION_AMOUNT, RISK_THRESHOLDS
+from app.providers.llm.base import (
+    EmailParseResult,
+    ExplanationChunk,
+    ExplanationRequest,
+    ExplanationResponse,
+    LLMProvider,
+    copy_response,
+    is_fallback,
+)
+from app.services.lru_cache import LRUCache
+from app.services.single_flight import SingleFlight
+
+
+def explanation_signature(request: ExplanationRequest) -> Hashable:
+    """Default cache key for an explanation request."""
+    if request.risk_score >= RISK_THRESHOLDS["high"]:
+        risk_band = "high"
+    elif request.risk_score >= RISK_THRESHOLDS["medium"]:
+        risk_band = "medium"
+    else:
+        risk_band = "low"
+
+    try:
+        hour = datetime.fromisoformat(request.transaction_timestamp.replace("Z", "+00:00")).hour
+    except ValueError:
+        hour = None
+
+    return (
+        tuple(request.risk_factors),
+        risk_band,
+        round(request.transaction_amount / AVG_TRANSACTION_AMOUNT * 2) / 2,
+        hour,
+        tuple(pattern.get("id") for pattern in request.matched_patterns),
+    )
+
+
+class CachingLLMProvider(LLMProvider):
+    """LLM provider that memoizes explanations of another provider.
+
+    Args:
+        provider: Provider whose explanations are cached
+        max_size: Maximum number of cached explanations
+        key_fn: Maps a request to its cache key (default: explanation_signature)
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_size: int = 1024,
+        key_fn: Optional[Callable[[ExplanationRequest], Hashable]] = None,
+    ):
+        self.provider = provider
+        self.cache = LRUCache(max_size)
+        self.key_fn = key_fn or explanation_signature
+        self.flight = SingleFlight()
+
+    async def generate_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> ExplanationResponse:
+        """Return a cached explanation for the request's signature, or generate one."""
+        key = self.key_fn(request)
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = await self.flight.do(key, lambda: self._generate(key, request))
+        return copy_response(cached)
+
+    async def _generate(self, key, request: ExplanationRequest) -> ExplanationResponse:
+        response = await self.provider.generate_explanation(request)
+        if not is_fallback(response):
+            self.cache.put(key, response)
+        return response
+
+    async def stream_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> AsyncIterator[ExplanationChunk]:
+        """Send a cached explanation as one chunk, or stream and cache a new one."""
+        key = self.key_fn(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            response = copy_response(cached)
+            yield ExplanationChunk(text=response.explanation, response=response)
+            return
+        async with aclosing(self.provider.stream_explanation(request)) as stream:
+            async for chunk in stream:
+                if chunk.response is not None and not is_fallback(chunk.response):
+                    self.cache.put(key, copy_response(chunk.response))
+                yield chunk
+
+    @property
+    def supports_batch(self) -> bool:
+        """Batch capability of the wrapped provider."""
+        return self.provider.supports_batch
+
+    async def generate_explanations_batch(
+        self,
+        requests: list[ExplanationRequest]
+    ) -> list[ExplanationResponse]:
+        """Answer cached signatures, generating the misses in one provider batch."""
+        keys = [self.key_fn(request) for request in requests]
+        found = {}
+        misses = {}
+        for key, request in zip(keys, requests):
+            if key in found or key in misses:
+                continue
+            cached = self.cache.get(key)
+            if cached is None:
+                misses[key] = request
+            else:
+                found[key] = cached
+        if misses:
+            responses = await self.provider.generate_explanations_batch(list(misses.values()))
+            for key, response in zip(misses, responses):
+                if not is_fallback(response):
+                    self.cache.put(key, response)
+                found[key] = response
+        return [copy_response(found[key]) for key in keys]
+
+    async def parse_email(
+        self,
+        from_address: str,
+        subject: str,
+        body: str
+    ) -> EmailParseResult:
+        """Email parsing is passed through uncached."""
+        return await self.provider.parse_email(from_address, subject, body)
+
+    def health_check(self) -> bool:
+        """Healthy when the wrapped provider is."""
+        return self.provider.health_check()
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the explanation cache, plus coalesced misses."""
+        return {**self.cache.stats(), "coalesced": self.flight.coalesced}
+
+    @property
+    def name(self) -> str:
+        return f"{self.__class__.__name__}({self.provider.name})"
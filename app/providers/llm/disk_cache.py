@@ -0,0 +1,331 @@
+"""Persistent, content-addressed cache for LLM provider responses.
+
+Explanations are stored in a local SQLite file keyed on a SHA-256 of the
+normalised request (sorted-key JSON) plus the provider name and model, so
+re-scoring the seed set, replaying a batch or restarting the service reuses
+earlier answers instead of paying for them again.
+
+- entries older than ttl_seconds are treated as misses and purged
+- once the stored responses exceed max_bytes, the least recently used ones
+  are evicted
+- the file is opened in WAL mode with a busy timeout, so several workers on
+  one host can share it
+
+SQLite calls run in a worker thread to keep the event loop free. Concurrent
+misses for the same key share one upstream call. Batches are forwarded when
+the wrapped provider supports them, with only the misses sent upstream.
+Streams are passed through on a miss and stored once complete; a stored
+explanation arrives as a single chunk.
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import aclosing, contextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from app.providers.llm.base import (
+    EmailParseResult,
+    ExplanationChunk,
+    ExplanationRequest,
+    ExplanationResponse,
+    LLMProvider,
+    copy_response,
+    is_fallback,
+)
+from app.services.single_flight import SingleFlight
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_responses_accessed_at ON llm_responses (accessed_at);
+CREATE TABLE IF NOT EXISTS llm_cache_meta (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO llm_cache_meta (id, total_bytes) VALUES (1, 0);
+"""
+
+
+def request_digest(request: ExplanationRequest, provider_name: str, model: str = "") -> str:
+    """Content address of a request for a given provider and model."""
+    payload = json.dumps(
+        {
+            "provider": provider_name,
+            "model": model,
+            "request": request.model_dump(mode="json"),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseStore:
+    """SQLite key-value store with TTL and byte-bounded LRU eviction.
+
+    Args:
+        path: Database file (created if missing)
+        ttl_seconds: Entry lifetime (0: never expires)
+        max_bytes: Stored value bytes kept before LRU eviction
+    """
+
+    def __init__(self, path: str | Path, ttl_seconds: float, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            self.path, timeout=5.0, isolation_level=None, check_same_thread=False
+        )
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the stored value, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1], now):
+                with self._transaction():
+                    self._delete(key)
+                return None
+            self._conn.execute(
+                "UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        """Store a value, then evict expired and least recently used entries."""
+        now = time.time()
+        size = len(value.encode())
+        with self._lock, self._transaction():
+            old = self._conn.execute(
+                "SELECT size FROM llm_responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._add_bytes(size - (old[0] if old else 0))
+            self._evict(now)
+
+    @contextmanager
+    def _transaction(self):
+        """Write transaction; other workers wait on the busy timeout."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _add_bytes(self, delta: int) -> None:
+        self._conn.execute(
+            "UPDATE llm_cache_meta SET total_bytes = total_bytes + ? WHERE id = 1", (delta,)
+        )
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute(
+            "DELETE FROM llm_responses WHERE key = ? RETURNING size", (key,)
+        ).fetchone()
+        if row:
+            self._add_bytes(-row[0])
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds:
+            freed = self._conn.execute(
+                "DELETE FROM llm_responses WHERE created_at < ? RETURNING size",
+                (now - self.ttl_seconds,),
+            ).fetchall()
+            self._add_bytes(-sum(size for (size,) in freed))
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        victims, freed = [], 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_responses ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", victims)
+        self._add_bytes(-freed)
+
+    def total_bytes(self) -> int:
+        """Bytes of stored values."""
+        return self._conn.execute("SELECT total_bytes FROM llm_cache_meta WHERE id = 1").fetchone()[0]
+
+    def stats(self) -> dict:
+        """Entry count and stored bytes."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+            return {"entries": entries, "bytes": self.total_bytes(), "max_bytes": self.max_bytes}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class DiskCacheLLMProvider(LLMProvider):
+    """LLM provider persisting explanations of another provider on disk.
+
+    Args:
+        provider: Provider whose explanations are cached
+        path: SQLite file shared by all workers on the host
+        ttl_seconds: Entry lifetime (0: never expires)
+        max_bytes: Stored bytes kept before least recently used eviction
+        model: Model identifier in the key (default: the provider's `model`
+            attribute, if any)
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        path: str | Path,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        model: Optional[str] = None,
+    ):
+        self.provider = provider
+        self.model = model if model is not None else str(getattr(provider, "model", "") or "")
+        self.store = ResponseStore(path, ttl_seconds, max_bytes)
+        self.flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    async def generate_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> ExplanationResponse:
+        """Return the stored explanation for this exact request, or generate and store it."""
+        key = self._key(request)
+        stored = (await self._lookup([key]))[key]
+        if stored is not None:
+            return stored
+        response = await self.flight.do(key, lambda: self._generate(key, request))
+        return copy_response(response)
+
+    async def stream_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> AsyncIterator[ExplanationChunk]:
+        """Send a stored explanation as one chunk, or stream and store a new one."""
+        key = self._key(request)
+        stored = (await self._lookup([key]))[key]
+        if stored is not None:
+            yield ExplanationChunk(text=stored.explanation, response=stored)
+            return
+        async with aclosing(self.provider.stream_explanation(request)) as stream:
+            async for chunk in stream:
+                if chunk.response is not None and not is_fallback(chunk.response):
+                    await self._store([(key, chunk.response)])
+                yield chunk
+
+    @property
+    def supports_batch(self) -> bool:
+        """Batch capability of the wrapped provider."""
+        return self.provider.supports_batch
+
+    async def generate_explanations_batch(
+        self,
+        requests: list[ExplanationRequest]
+    ) -> list[ExplanationResponse]:
+        """Return stored explanations, generating and storing the misses in one batch."""
+        keys = [self._key(request) for request in requests]
+        found = await self._lookup(keys)
+        misses = {key: request for key, request in zip(keys, requests) if found[key] is None}
+        if misses:
+            responses = await self.provider.generate_explanations_batch(list(misses.values()))
+            await self._store([
+                (key, response)
+                for key, response in zip(misses, responses)
+                if not is_fallback(response)
+            ])
+            found.update(zip(misses, responses))
+        return [copy_response(found[key]) for key in keys]
+
+    def _key(self, request: ExplanationRequest) -> str:
+        return request_digest(request, self.provider.name, self.model)
+
+    async def _lookup(self, keys: list[str]) -> dict[str, Optional[ExplanationResponse]]:
+        """Stored responses by key (None for misses), counting hits and misses."""
+        unique = list(dict.fromkeys(keys))
+        try:
+            values = await asyncio.to_thread(lambda: [self.store.get(key) for key in unique])
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read LLM response from disk cache: {e}")
+            values = [None] * len(unique)
+        found = {}
+        for key, value in zip(unique, values):
+            if value is None:
+                self.misses += 1
+                found[key] = None
+            else:
+                self.hits += 1
+                found[key] = ExplanationResponse.model_validate_json(value)
+        return found
+
+    async def _store(self, items: list[tuple[str, ExplanationResponse]]) -> None:
+        """Store generated responses, logging (not raising) write errors."""
+        if not items:
+            return
+        values = [(key, response.model_dump_json()) for key, response in items]
+        try:
+            await asyncio.to_thread(lambda: [self.store.put(key, value) for key, value in values])
+        except sqlite3.Error as e:
+            print(f"Warning: Could not store LLM response in disk cache: {e}")
+
+    async def _generate(self, key: str, request: ExplanationRequest) -> ExplanationResponse:
+        response = await self.provider.generate_explanation(request)
+        if not is_fallback(response):
+            await self._store([(key, response)])
+        return response
+
+    async def parse_email(
+        self,
+        from_address: str,
+        subject: str,
+        body: str
+    ) -> EmailParseResult:
+        """Email parsing is passed through uncached."""
+        return await self.provider.parse_email(from_address, subject, body)
+
+    def health_check(self) -> bool:
+        """Healthy when the wrapped provider is."""
+        return self.provider.health_check()
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters plus the store's size."""
+        return {"hits": self.hits, "misses": self.misses, **self.store.stats()}
+
+    def close(self) -> None:
+        """Close the cache file."""
+        self.store.close()
+
+    @property
+    def name(self) -> str:
+        return f"{self.__class__.__name__}({self.provider.name})"
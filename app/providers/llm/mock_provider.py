@@ -4,8 +4,12 @@ This provider generates deterministic explanations using templates,
 allowing development and testing without external API calls.
 """
 
+import re
+from typing import AsyncIterator
+
 from app.providers.llm.base import (
     LLMProvider,
+    ExplanationChunk,
     ExplanationRequest,
     ExplanationResponse,
     EmailParseResult,
@@ -119,6 +123,16 @@ class MockLLMProvider(LLMProvider):
             confidence=confidence,
         )
 
+    async def stream_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> AsyncIterator[ExplanationChunk]:
+        """Stream the template explanation word by word, like a real model."""
+        response = await self.generate_explanation(request)
+        for token in re.findall(r"\S+\s*", response.explanation):
+            yield ExplanationChunk(text=token)
+        yield ExplanationChunk(response=response)
+
     async def parse_email(
         self,
         from_address: str,
@@ -0,0 +1,252 @@
+"""Concurrency-limited, batching wrapper for LLM providers.
+
+Keeps explanation throughput stable when the upstream model is slow or rate
+limited:
+
+- at most max_concurrency upstream calls are in flight (semaphore), and
+  optionally at most rate_limit calls start per second (token bucket)
+- with batch_window > 0 and a backend that sets supports_batch, requests
+  arriving within the window are sent as one generate_explanations_batch
+  call (up to max_batch_size requests)
+- every call has a deadline covering queueing, rate limiting and the upstream
+  call; past it the fallback provider (MockLLMProvider by default) answers.
+  Streamed explanations hold a concurrency slot until the stream ends, and
+  their deadline covers the wait for the first chunk
+
+Upstream errors other than the deadline are raised to the caller.
+"""
+
+import asyncio
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+
+from app.providers.llm.base import (
+    EmailParseResult,
+    ExplanationChunk,
+    ExplanationRequest,
+    ExplanationResponse,
+    LLMProvider,
+    mark_fallback,
+    stream_fallback,
+)
+from app.providers.llm.mock_provider import MockLLMProvider
+
+
+class TokenBucket:
+    """Token-bucket rate limiter.
+
+    Args:
+        rate: Tokens added per second
+        capacity: Maximum burst size (default: one second's worth, at least 1)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class PipelinedLLMProvider(LLMProvider):
+    """LLM provider wrapper adding limits, micro-batching and a deadline.
+
+    Args:
+        provider: Upstream provider
+        max_concurrency: Maximum upstream calls in flight
+        rate_limit: Maximum upstream calls started per second (None: unlimited)
+        burst: Token bucket capacity (default: one second of rate_limit)
+        batch_window: Seconds to collect requests into one batch (0: no batching)
+        max_batch_size: Requests per batch; a full batch is sent immediately
+        timeout: Seconds per call before the fallback answers
+        fallback: Provider used past the deadline (default: MockLLMProvider)
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        max_concurrency: int = 4,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        batch_window: float = 0.0,
+        max_batch_size: int = 8,
+        timeout: float = 10.0,
+        fallback: Optional[LLMProvider] = None,
+    ):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.fallback = fallback or MockLLMProvider()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self._pending: list[tuple[ExplanationRequest, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: set[asyncio.Task] = set()
+        self.calls = 0
+        self.upstream_calls = 0
+        self.timeouts = 0
+        self.in_flight = 0
+
+    @property
+    def batching(self) -> bool:
+        """Whether requests are grouped into upstream batches."""
+        return self.provider.supports_batch and self.batch_window > 0 and self.max_batch_size > 1
+
+    async def generate_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> ExplanationResponse:
+        """Generate an explanation upstream, or with the fallback past the deadline."""
+        self.calls += 1
+        try:
+            return await asyncio.wait_for(self._submit(request), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return mark_fallback(await self.fallback.generate_explanation(request))
+
+    async def stream_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> AsyncIterator[ExplanationChunk]:
+        """Stream upstream under the limits, or from the fallback if the first chunk is late."""
+        self.calls += 1
+        async with aclosing(self._limited_stream(request)) as stream:
+            try:
+                first = await asyncio.wait_for(anext(stream), self.timeout)
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                async for chunk in stream_fallback(self.fallback, request):
+                    yield chunk
+                return
+            yield first
+            async for chunk in stream:
+                yield chunk
+
+    async def _limited_stream(self, request: ExplanationRequest) -> AsyncIterator[ExplanationChunk]:
+        """Upstream stream holding a concurrency slot until it ends."""
+        async with self._semaphore:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            self.upstream_calls += 1
+            self.in_flight += 1
+            try:
+                async with aclosing(self.provider.stream_explanation(request)) as stream:
+                    async for chunk in stream:
+                        yield chunk
+            finally:
+                self.in_flight -= 1
+
+    async def parse_email(
+        self,
+        from_address: str,
+        subject: str,
+        body: str
+    ) -> EmailParseResult:
+        """Parse an email upstream under the same limits and deadline."""
+        try:
+            return await asyncio.wait_for(
+                self._limited(lambda: self.provider.parse_email(from_address, subject, body)),
+                self.timeout,
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return await self.fallback.parse_email(from_address, subject, body)
+
+    def health_check(self) -> bool:
+        """Healthy when the upstream provider is."""
+        return self.provider.health_check()
+
+    def pipeline_stats(self) -> dict:
+        """Call, batching and deadline counters."""
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.upstream_calls,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "queued": len(self._pending),
+        }
+
+    @property
+    def name(self) -> str:
+        return f"{self.__class__.__name__}({self.provider.name})"
+
+    async def _limited(self, call):
+        """Run an upstream call under the concurrency and rate limits."""
+        async with self._semaphore:
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            self.upstream_calls += 1
+            self.in_flight += 1
+            try:
+                return await call()
+            finally:
+                self.in_flight -= 1
+
+    async def _submit(self, request: ExplanationRequest) -> ExplanationResponse:
+        if not self.batching:
+            return await self._limited(lambda: self.provider.generate_explanation(request))
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send the pending requests as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._run_batch(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: list[tuple[ExplanationRequest, asyncio.Future]]) -> None:
+        # Callers that already hit their deadline are not sent upstream
+        batch = [(request, future) for request, future in batch if not future.done()]
+        if not batch:
+            return
+        requests = [request for request, _ in batch]
+        try:
+            responses = await asyncio.wait_for(
+                self._limited(lambda: self.provider.generate_explanations_batch(requests)),
+                self.timeout,
+            )
+            if len(responses) != len(requests):
+                raise ValueError(
+                    f"{self.provider.name} returned {len(responses)} explanations for {len(requests)} requests"
+                )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
@@ -6,11 +6,16 @@ to provide additional context for risk assessment.
 
 from abc import ABC, abstractmethod
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class PatternMatch(BaseModel):
-    """Represents a matched fraud pattern."""
+    """Represents a matched fraud pattern.
+
+    Immutable, so providers can hand out cached instances.
+    """
+
+    model_config = ConfigDict(frozen=True)
 
     pattern_id: str
     pattern_name: str
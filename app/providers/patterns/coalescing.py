@@ -0,0 +1,60 @@
+"""Request-coalescing wrapper for pattern matchers.
+
+Concurrent lookups with the same risk factors and transaction context share
+one call to the wrapped matcher. Worth it for remote matchers (e.g. Azure AI
+Search), where a burst of similar alerts would otherwise issue identical
+queries; nothing is cached once the call completes.
+"""
+
+from typing import Callable, Hashable, Optional
+
+from app.providers.patterns.base import PatternMatch, PatternMatcher
+from app.services.single_flight import SingleFlight
+
+
+def pattern_lookup_key(risk_factors: list[str], transaction_context: dict) -> Hashable:
+    """Default coalescing key: the factors plus the full transaction context."""
+    return (
+        tuple(risk_factors),
+        tuple(sorted((name, repr(value)) for name, value in transaction_context.items())),
+    )
+
+
+class CoalescingPatternMatcher(PatternMatcher):
+    """Pattern matcher that deduplicates concurrent identical lookups.
+
+    Args:
+        matcher: Matcher whose lookups are coalesced
+        key_fn: Maps (risk_factors, transaction_context) to a key
+            (default: pattern_lookup_key)
+    """
+
+    def __init__(
+        self,
+        matcher: PatternMatcher,
+        key_fn: Optional[Callable[[list[str], dict], Hashable]] = None,
+    ):
+        self.matcher = matcher
+        self.key_fn = key_fn or pattern_lookup_key
+        self.flight = SingleFlight()
+
+    async def find_matching_patterns(
+        self,
+        risk_factors: list[str],
+        transaction_context: dict
+    ) -> list[PatternMatch]:
+        """Find matching patterns, sharing any identical lookup in flight."""
+        matches = await self.flight.do(
+            self.key_fn(risk_factors, transaction_context),
+            lambda: self.matcher.find_matching_patterns(risk_factors, transaction_context),
+        )
+        # PatternMatch is immutable; only the list needs to be per caller
+        return list(matches)
+
+    def health_check(self) -> bool:
+        """Healthy when the wrapped matcher is."""
+        return self.matcher.health_check()
+
+    @property
+    def name(self) -> str:
+        return f"{self.__class__.__name__}({self.matcher.name})"
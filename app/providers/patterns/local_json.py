@@ -2,14 +2,135 @@
 
 Matches transactions against patterns defined in a local JSON file.
 Uses keyword matching rather than semantic similarity.
+
+Patterns are compiled once into a PatternIndex: each trigger factor gets a
+bit, each factor maps to the set of patterns it triggers (as a bitset), and
+factor overlap is a popcount. Only candidate patterns are visited, so the
+cost per transaction grows with the number of matches, not the library size.
+Keywords are found with one Aho-Corasick pass over the reference.
+
+Once warmed up, the provider polls the file (inode, mtime, size) and rebuilds
+the index in a worker thread when it changes, then swaps it in atomically.
 """
 
+import asyncio
 import json
-import os
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from app.config import PATTERN_RELOAD_INTERVAL_SECONDS
 from app.providers.patterns.base import PatternMatcher, PatternMatch
+from app.services.keyword_scanner import (
+    DEFAULT_PATTERNS_FILE,
+    KeywordScanner,
+    build_keyword_scanner,
+    get_keyword_scanner,
+    set_keyword_scanner,
+)
+
+
+class _CompiledPattern:
+    """Pattern fields precomputed for matching."""
+
+    __slots__ = ("source", "trigger_mask", "trigger_count", "keywords", "_matches")
+
+    def __init__(self, source: dict, trigger_mask: int, trigger_count: int):
+        self.source = source
+        self.trigger_mask = trigger_mask
+        self.trigger_count = trigger_count
+        self.keywords = tuple(kw.lower() for kw in source.get("keywords", []))
+        # match_score -> PatternMatch; scores take few distinct values
+        self._matches: dict[float, PatternMatch] = {}
+
+    def match(self, match_score: float) -> PatternMatch:
+        """Return the shared, immutable PatternMatch for this score."""
+        match = self._matches.get(match_score)
+        if match is None:
+            source = self.source
+            match = self._matches[match_score] = PatternMatch(
+                pattern_id=source["id"],
+                pattern_name=source["name"],
+                description=source["description"],
+                match_score=match_score,
+                recommended_action=source.get("recommended_action", "Review the transaction carefully."),
+                category=source.get("category"),
+                severity=source.get("severity", "medium"),
+            )
+        return match
+
+
+class PatternIndex:
+    """Immutable snapshot of compiled patterns.
+
+    Args:
+        patterns: Pattern dicts as stored in fraud_patterns.json
+        scanner: Keyword scanner covering the patterns' keywords; built if omitted
+    """
+
+    def __init__(self, patterns: list[dict], scanner: Optional[KeywordScanner] = None):
+        self.sources = patterns
+        self.scanner = scanner or build_keyword_scanner(patterns)
+        self.factor_bits: dict[str, int] = {}
+        # factor -> bitset of indexes into self.patterns
+        self.patterns_by_factor: dict[str, int] = {}
+        self.patterns: list[_CompiledPattern] = []
+
+        for position, pattern in enumerate(patterns):
+            trigger_factors = set(pattern.get("trigger_factors", []))
+            mask = 0
+            for factor in trigger_factors:
+                bit = self.factor_bits.setdefault(factor, 1 << len(self.factor_bits))
+                mask |= bit
+                self.patterns_by_factor[factor] = self.patterns_by_factor.get(factor, 0) | (1 << position)
+            self.patterns.append(_CompiledPattern(pattern, mask, len(trigger_factors)))
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def match(self, risk_factors: list[str], reference: str) -> list[PatternMatch]:
+        """Score every pattern sharing at least one factor with risk_factors.
+
+        Args:
+            risk_factors: Detected risk factor codes
+            reference: Payment reference
+
+        Returns:
+            PatternMatch objects sorted by match_score (highest first),
+            ties in file order.
+        """
+        risk_mask = 0
+        candidates = 0
+        for factor in risk_factors:
+            bit = self.factor_bits.get(factor)
+            if bit is not None:
+                risk_mask |= bit
+                candidates |= self.patterns_by_factor[factor]
+        if not candidates:
+            return []
+
+        keyword_hits = self.scanner.scan(reference)
+        matches = []
+        while candidates:
+            lowest = candidates & -candidates
+            pattern = self.patterns[lowest.bit_length() - 1]
+            candidates ^= lowest
+
+            # Calculate match score based on factor overlap
+            overlap = (risk_mask & pattern.trigger_mask).bit_count()
+            match_score = overlap / max(pattern.trigger_count, 1)
+
+            # Boost score if reference contains keywords
+            keyword_matches = sum(1 for kw in pattern.keywords if kw in keyword_hits)
+            if keyword_matches > 0:
+                match_score = min(1.0, match_score + 0.1 * keyword_matches)
+
+            matches.append(pattern.match(round(match_score, 2)))
+
+        # Sort by match score descending
+        matches.sort(key=lambda m: m.match_score, reverse=True)
+        return matches
 
 
 class LocalJSONProvider(PatternMatcher):
@@ -24,11 +145,16 @@ class LocalJSONProvider(PatternMatcher):
     - Demos without API costs
     """
 
-    def __init__(self, patterns_file: Optional[str] = None):
+    def __init__(
+        self,
+        patterns_file: Optional[str] = None,
+        reload_interval: float = PATTERN_RELOAD_INTERVAL_SECONDS,
+    ):
         """Initialize with patterns file path.
 
         Args:
             patterns_file: Path to JSON file. Defaults to app/data/fraud_patterns.json
+            reload_interval: Seconds between file change checks once watching
         """
         if patterns_file is None:
             # Default to app/data/fraud_patterns.json relative to this file
@@ -36,21 +162,115 @@ class LocalJSONProvider(PatternMatcher):
             patterns_file = base_dir / "data" / "fraud_patterns.json"
 
         self.patterns_file = Path(patterns_file)
-        self._patterns: list[dict] = []
-        self._loaded = False
+        self.reload_interval = reload_interval
+        # Replaced as a whole on reload; matches in flight keep the old one
+        self._index: Optional[PatternIndex] = None
+        self._signature: Optional[tuple] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._reload_stats = {
+            "reloads": 0,
+            "failed_reloads": 0,
+            "last_reload_at": None,
+            "last_reload_ms": None,
+            "last_error": None,
+        }
+
+    @property
+    def _loaded(self) -> bool:
+        return self._index is not None
+
+    @property
+    def _patterns(self) -> list[dict]:
+        return self._index.sources if self._index is not None else []
+
+    def _file_signature(self) -> Optional[tuple]:
+        """(inode, mtime, size) of the patterns file, or None if it is missing."""
+        try:
+            stat = self.patterns_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _compile(self) -> tuple[PatternIndex, Optional[tuple]]:
+        """Read the patterns file and build a new index (safe to run in a thread)."""
+        signature = self._file_signature()
+        if signature is None:
+            return PatternIndex(self._get_default_patterns()), None
+
+        with open(self.patterns_file, "r") as f:
+            patterns = json.load(f)
+
+        if self.patterns_file.resolve() == DEFAULT_PATTERNS_FILE.resolve():
+            # Same lexicon as the anomaly detector; share its automaton
+            scanner = get_keyword_scanner() if self._index is None else build_keyword_scanner(patterns)
+            set_keyword_scanner(scanner)
+        else:
+            scanner = None
+        return PatternIndex(patterns, scanner), signature
 
     def _load_patterns(self) -> None:
-        """Load patterns from JSON file."""
+        """Load patterns from JSON file and compile the index."""
         if self._loaded:
             return
+        self._index, self._signature = self._compile()
 
-        if not self.patterns_file.exists():
-            self._patterns = self._get_default_patterns()
-        else:
-            with open(self.patterns_file, "r") as f:
-                self._patterns = json.load(f)
+    async def reload_if_changed(self) -> bool:
+        """Rebuild the index in a worker thread if the file changed.
+
+        The new index is swapped in with one assignment. If the file cannot
+        be parsed, the current index stays active and the error is recorded.
+
+        Returns:
+            True if a new index was installed.
+        """
+        if self._loaded and self._file_signature() == self._signature:
+            return False
+
+        started = time.perf_counter()
+        try:
+            index, signature = await asyncio.to_thread(self._compile)
+        except Exception as e:
+            self._reload_stats["failed_reloads"] += 1
+            self._reload_stats["last_error"] = str(e)
+            # Do not retry the same broken file every interval
+            self._signature = self._file_signature()
+            print(f"Warning: Could not reload fraud patterns: {e}")
+            return False
+
+        self._index, self._signature = index, signature
+        self._reload_stats.update(
+            reloads=self._reload_stats["reloads"] + 1,
+            last_reload_at=datetime.now(timezone.utc).isoformat(),
+            last_reload_ms=round((time.perf_counter() - started) * 1000, 2),
+            last_error=None,
+        )
+        return True
+
+    async def warm_up(self) -> None:
+        """Compile the index and start watching the file for changes."""
+        await self.reload_if_changed()
+        if self._watch_task is None and self.reload_interval > 0:
+            self._watch_task = asyncio.create_task(self._watch())
 
-        self._loaded = True
+    async def close(self) -> None:
+        """Stop watching the patterns file."""
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch(self) -> None:
+        """Poll the patterns file every reload_interval seconds."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload_if_changed()
+
+    def reload_stats(self) -> dict:
+        """Pattern count and reload history for the health endpoint."""
+        return {"patterns": len(self._patterns), **self._reload_stats}
 
     async def find_matching_patterns(
         self,
@@ -68,39 +288,7 @@ class LocalJSONProvider(PatternMatcher):
         if not risk_factors:
             return []
 
-        matches = []
-        risk_factor_set = set(risk_factors)
-
-        for pattern in self._patterns:
-            trigger_factors = set(pattern.get("trigger_factors", []))
-            overlap = risk_factor_set & trigger_factors
-
-            if not overlap:
-                continue
-
-            # Calculate match score based on factor overlap
-            match_score = len(overlap) / max(len(trigger_factors), 1)
-
-            # Boost score if reference contains keywords
-            reference = transaction_context.get("reference", "").lower()
-            keywords = pattern.get("keywords", [])
-            keyword_matches = sum(1 for kw in keywords if kw.lower() in reference)
-            if keyword_matches > 0:
-                match_score = min(1.0, match_score + 0.1 * keyword_matches)
-
-            matches.append(PatternMatch(
-                pattern_id=pattern["id"],
-                pattern_name=pattern["name"],
-                description=pattern["description"],
-                match_score=round(match_score, 2),
-                recommended_action=pattern.get("recommended_action", "Review the transaction carefully."),
-                category=pattern.get("category"),
-                severity=pattern.get("severity", "medium"),
-            ))
-
-        # Sort by match score descending
-        matches.sort(key=lambda m: m.match_score, reverse=True)
-        return matches
+        return self._index.match(risk_factors, transaction_context.get("reference", ""))
 
     def health_check(self) -> bool:
         """Check if patterns file exists or defaults are available."""
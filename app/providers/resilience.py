@@ -0,0 +1,398 @@
+"""Failure isolation for external LLM and pattern providers.
+
+Wraps a provider so a slow or failing backend cannot hold request slots:
+
+- every call has a timeout; timeouts and errors count as failures
+- a circuit breaker opens when the failure rate over the last `window` calls
+  reaches `failure_threshold`; while open, calls go straight to the fallback.
+  After `reset_timeout` seconds a single probe call is let through
+  (half-open): success closes the circuit, failure opens it again
+- optionally, a hedged second request is sent when the first has not
+  answered within the backend's recent p95 latency; the first answer wins
+- whenever the backend cannot answer, a local fallback does (MockLLMProvider
+  for LLMs, LocalJSONProvider for patterns), so callers get a degraded
+  answer instead of an error. Streamed explanations switch to the fallback
+  only before their first chunk (the timeout covers the wait for it); a
+  stream failing later is raised, as part of it has already been sent
+
+Breaker state is reported through health_check and breaker_stats (shown on
+GET /health).
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from app.providers.llm.base import (
+    EmailParseResult,
+    ExplanationChunk,
+    ExplanationRequest,
+    ExplanationResponse,
+    LLMProvider,
+    mark_fallback,
+    stream_fallback,
+)
+from app.providers.llm.mock_provider import MockLLMProvider
+from app.providers.patterns.base import PatternMatch, PatternMatcher
+from app.providers.patterns.local_json import LocalJSONProvider
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with half-open probing.
+
+    Args:
+        window: Number of recent calls the failure rate is computed over
+        failure_threshold: Failure rate (0-1) that opens the circuit
+        min_calls: Calls needed in the window before the circuit can open
+        reset_timeout: Seconds the circuit stays open before probing
+        clock: Monotonic time source (for tests)
+    """
+
+    def __init__(
+        self,
+        window: int = 20,
+        failure_threshold: float = 0.5,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open."""
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the backend now."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release(self) -> None:
+        """End a call that has no outcome (e.g. it was cancelled), freeing the probe slot."""
+        if self._state == HALF_OPEN:
+            self._probing = False
+
+    def record_success(self) -> None:
+        if self._state == HALF_OPEN:
+            self._state = CLOSED
+            self._outcomes.clear()
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        self._outcomes.append(False)
+        if len(self._outcomes) >= self.min_calls and self.failure_rate() >= self.failure_threshold:
+            self._open()
+
+    def failure_rate(self) -> float:
+        """Share of failed calls in the window."""
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self.clock()
+        self._probing = False
+        self._outcomes.clear()
+        self.opened += 1
+
+    def stats(self) -> dict:
+        """State and failure counters."""
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 4),
+            "calls_in_window": len(self._outcomes),
+            "times_opened": self.opened,
+        }
+
+
+class LatencyTracker:
+    """Recent call latencies for hedging decisions.
+
+    Args:
+        size: Number of recent samples kept
+        min_samples: Samples needed before a percentile is reported
+    """
+
+    def __init__(self, size: int = 100, min_samples: int = 20):
+        self._samples: deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency at the given fraction (e.g. 0.95), or None with too few samples."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _Resilient:
+    """Timeout, breaker, hedging and fallback shared by the provider wrappers."""
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker],
+        timeout: float,
+        hedge: bool,
+    ):
+        self.breaker = breaker or CircuitBreaker()
+        self.timeout = timeout
+        self.hedge = hedge
+        self.latency = LatencyTracker()
+        self.fallbacks = 0
+        self.hedged = 0
+
+    async def _call(self, primary: Callable[[], Awaitable], fallback: Callable[[], Awaitable]):
+        if not self.breaker.allow():
+            self.fallbacks += 1
+            return await fallback()
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._attempt(primary), self.timeout)
+        except Exception as e:
+            self.breaker.record_failure()
+            self.fallbacks += 1
+            print(f"Warning: {self.name} failed ({type(e).__name__}: {e}); using fallback")
+            return await fallback()
+        except BaseException:
+            # Cancelled: no outcome to record, but a half-open probe must be given back
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        self.latency.record(time.monotonic() - started)
+        return result
+
+    async def _attempt(self, primary: Callable[[], Awaitable]):
+        """Run primary, hedging with a second call past the recent p95 latency."""
+        delay = self.latency.percentile(0.95) if self.hedge else None
+        first = asyncio.ensure_future(primary())
+        if delay is None:
+            return await first
+
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedged += 1
+                tasks.add(asyncio.ensure_future(primary()))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def breaker_stats(self) -> dict:
+        """Breaker state plus fallback and hedging counters."""
+        return {
+            **self.breaker.stats(),
+            "fallbacks": self.fallbacks,
+            "hedged": self.hedged,
+            "p95_seconds": self.latency.percentile(0.95),
+        }
+
+    def _health(self, backend_healthy) -> str:
+        state = self.breaker.state
+        if state != CLOSED:
+            return f"degraded: circuit {state}, serving fallback"
+        if backend_healthy is False:
+            return "unavailable"
+        return "ok" if backend_healthy in (True, "ok") else str(backend_healthy)
+
+
+class ResilientLLMProvider(_Resilient, LLMProvider):
+    """LLM provider wrapper with timeout, circuit breaker, hedging and fallback.
+
+    Args:
+        provider: External provider to protect
+        fallback: Answers when the provider cannot (default: MockLLMProvider)
+        breaker: Circuit breaker (default: CircuitBreaker())
+        timeout: Seconds per call, including a hedged retry
+        hedge: Send a second request past the recent p95 latency
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        fallback: Optional[LLMProvider] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        timeout: float = 10.0,
+        hedge: bool = False,
+    ):
+        super().__init__(breaker, timeout, hedge)
+        self.provider = provider
+        self.fallback = fallback or MockLLMProvider()
+
+    async def generate_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> ExplanationResponse:
+        """Generate with the provider, or the fallback when it fails or the circuit is open."""
+        return await self._call(
+            lambda: self.provider.generate_explanation(request),
+            lambda: self._fallback_explanation(request),
+        )
+
+    async def _fallback_explanation(self, request: ExplanationRequest) -> ExplanationResponse:
+        return mark_fallback(await self.fallback.generate_explanation(request))
+
+    async def stream_explanation(
+        self,
+        request: ExplanationRequest
+    ) -> AsyncIterator[ExplanationChunk]:
+        """Stream from the provider, or the fallback if it fails before the first chunk."""
+        if not self.breaker.allow():
+            self.fallbacks += 1
+            async for chunk in stream_fallback(self.fallback, request):
+                yield chunk
+            return
+        sent = False
+        try:
+            async with aclosing(self.provider.stream_explanation(request)) as stream:
+                try:
+                    first = await asyncio.wait_for(anext(stream), self.timeout)
+                except StopAsyncIteration:
+                    first = None
+                if first is not None:
+                    sent = True
+                    yield first
+                    async for chunk in stream:
+                        yield chunk
+        except Exception as e:
+            self.breaker.record_failure()
+            if sent:
+                raise
+            self.fallbacks += 1
+            print(f"Warning: {self.name} failed ({type(e).__name__}: {e}); using fallback")
+            async for chunk in stream_fallback(self.fallback, request):
+                yield chunk
+            return
+        except BaseException:
+            # Cancelled or closed early: no outcome, but free a half-open probe
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+
+    @property
+    def supports_batch(self) -> bool:
+        """Batch capability of the wrapped provider."""
+        return self.provider.supports_batch
+
+    async def generate_explanations_batch(
+        self,
+        requests: list[ExplanationRequest]
+    ) -> list[ExplanationResponse]:
+        """Generate a batch with the provider, or the fallback if it fails or the circuit is open."""
+        return await self._call(
+            lambda: self.provider.generate_explanations_batch(requests),
+            lambda: self._fallback_batch(requests),
+        )
+
+    async def _fallback_batch(
+        self,
+        requests: list[ExplanationRequest]
+    ) -> list[ExplanationResponse]:
+        responses = await self.fallback.generate_explanations_batch(requests)
+        return [mark_fallback(response) for response in responses]
+
+    async def parse_email(
+        self,
+        from_address: str,
+        subject: str,
+        body: str
+    ) -> EmailParseResult:
+        """Parse with the provider, or the fallback when it fails or the circuit is open."""
+        return await self._call(
+            lambda: self.provider.parse_email(from_address, subject, body),
+            lambda: self.fallback.parse_email(from_address, subject, body),
+        )
+
+    def health_check(self) -> str:
+        """"ok", or why calls are being served by the fallback."""
+        return self._health(self.provider.health_check())
+
+    @property
+    def model(self) -> str:
+        """Model of the wrapped provider (part of response cache keys)."""
+        return str(getattr(self.provider, "model", "") or "")
+
+    @property
+    def name(self) -> str:
+        return f"{self.__class__.__name__}({self.provider.name})"
+
+
+class ResilientPatternMatcher(_Resilient, PatternMatcher):
+    """Pattern matcher wrapper with timeout, circuit breaker, hedging and fallback.
+
+    Args:
+        matcher: External matcher to protect
+        fallback: Answers when the matcher cannot (default: LocalJSONProvider)
+        breaker: Circuit breaker (default: CircuitBreaker())
+        timeout: Seconds per lookup, including a hedged retry
+        hedge: Send a second lookup past the recent p95 latency
+    """
+
+    def __init__(
+        self,
+        matcher: PatternMatcher,
+        fallback: Optional[PatternMatcher] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        timeout: float = 2.0,
+        hedge: bool = False,
+    ):
+        super().__init__(breaker, timeout, hedge)
+        self.matcher = matcher
+        self.fallback = fallback or LocalJSONProvider(reload_interval=0)
+
+    async def find_matching_patterns(
+        self,
+        risk_factors: list[str],
+        transaction_context: dict
+    ) -> list[PatternMatch]:
+        """Match with the matcher, or the fallback when it fails or the circuit is open."""
+        return await self._call(
+            lambda: self.matcher.find_matching_patterns(risk_factors, transaction_context),
+            lambda: self.fallback.find_matching_patterns(risk_factors, transaction_context),
+        )
+
+    def health_check(self) -> str:
+        """"ok", or why lookups are being served by the fallback."""
+        return self._health(self.matcher.health_check())
+
+    @property
+    def name(self) -> str:
+        return f"{self.__class__.__name__}({self.matcher.name})"
@@ -6,7 +6,9 @@ Currently uses rule-based mock; designed for future Azure Anomaly Detector integ
 """
 
 from datetime import datetime
-from typing import Protocol
+from typing import Optional, Protocol
+
+import numpy as np
 
 from app.config import (
     AVG_TRANSACTION_AMOUNT,
@@ -14,7 +16,119 @@ from app.config import (
     BUSINESS_HOURS_END,
     SCORING_WEIGHTS,
     AMOUNT_SPIKE_MULTIPLIER,
+    PROFILE_MIN_HISTORY,
+    PROFILE_SPIKE_STDDEVS,
+    PROFILE_USUAL_HOUR_SHARE,
+    RISK_THRESHOLDS,
+    URGENCY_KEYWORDS,
+)
+from app.services.keyword_scanner import KeywordScanner, get_keyword_scanner
+from app.services.profile_store import (
+    ACCOUNT_SCOPE,
+    DEFAULT_ACCOUNT,
+    PAYEE_SCOPE,
+    ProfileStats,
+    ProfileStore,
+    profile_store,
 )
+from app.services.velocity_tracker import VelocityTracker, velocity_tracker
+
+
+# Bit assigned to each factor in batch factor masks (same order as scoring)
+FACTOR_BITS = {factor: 1 << bit for bit, factor in enumerate(SCORING_WEIGHTS)}
+
+
+def get_risk_level(score: float) -> str:
+    """Map risk score to risk level."""
+    if score >= RISK_THRESHOLDS["high"]:
+        return "high"
+    elif score >= RISK_THRESHOLDS["medium"]:
+        return "medium"
+    return "low"
+
+
+def decode_factor_mask(mask: int) -> list[str]:
+    """Convert a factor bitmask from batch scoring back into factor codes."""
+    return [factor for factor, bit in FACTOR_BITS.items() if int(mask) & bit]
+
+
+def transactions_to_columns(
+    transactions: list[dict],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Convert transaction dicts into the columnar input used by batch scoring.
+
+    Args:
+        transactions: Dicts with amount, timestamp, reference, payee_is_new
+
+    Returns:
+        tuple: (amounts, hours, payee_is_new flags, references) arrays
+    """
+    count = len(transactions)
+    amounts = np.empty(count, dtype=np.float64)
+    hours = np.empty(count, dtype=np.int8)
+    payee_is_new = np.empty(count, dtype=bool)
+    references = []
+
+    for i, transaction in enumerate(transactions):
+        timestamp = transaction.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        amounts[i] = transaction.get("amount", 0)
+        # Rows without a timestamp get an in-hours value so timing never triggers
+        hours[i] = timestamp.hour if timestamp else BUSINESS_HOURS_START
+        payee_is_new[i] = transaction.get("payee_is_new", False)
+        references.append(transaction.get("reference", ""))
+
+    return amounts, hours, payee_is_new, np.array(references, dtype=str)
+
+
+def amount_baseline(
+    detector: "AnomalyDetectorProtocol", payee: Optional[str], factors: list[str]
+) -> Optional[float]:
+    """The average a transaction's AMOUNT_SPIKE compared against (None if it did not trigger)."""
+    return detector.spike_baseline(payee) if "AMOUNT_SPIKE" in factors else None
+
+
+def score_transactions(detector: "AnomalyDetectorProtocol", transactions: list[dict]) -> list[dict]:
+    """
+    Score many transactions in one vectorized pass.
+
+    Args:
+        detector: Anomaly detector
+        transactions: Dicts with amount, payee, timestamp, reference, payee_is_new
+
+    Returns:
+        Copies of the transactions with risk_score, risk_level, factors and
+        amount_baseline (the AMOUNT_SPIKE baseline, or None if it did not
+        trigger), in input order
+    """
+    if not transactions:
+        return []
+    risk_scores, factor_masks = detector.calculate_risk_scores_batch(
+        *transactions_to_columns(transactions),
+        payees=[transaction["payee"] for transaction in transactions],
+        timestamps=[transaction["timestamp"] for transaction in transactions],
+    )
+    baselines = {}
+    scored = []
+    for transaction, risk_score, factor_mask in zip(
+        transactions, risk_scores.tolist(), factor_masks.tolist()
+    ):
+        amount_baseline = None
+        if factor_mask & FACTOR_BITS["AMOUNT_SPIKE"]:
+            payee = transaction["payee"]
+            if payee not in baselines:
+                baselines[payee] = detector.spike_baseline(payee)
+            amount_baseline = baselines[payee]
+        scored.append({
+            **transaction,
+            "risk_score": risk_score,
+            "risk_level": get_risk_level(risk_score),
+            "factors": decode_factor_mask(factor_mask),
+            "amount_baseline": amount_baseline,
+        })
+    return scored
 
 
 class AnomalyDetectorProtocol(Protocol):
@@ -32,6 +146,43 @@ class AnomalyDetectorProtocol(Protocol):
         """
         ...
 
+    def calculate_risk_scores_batch(
+        self,
+        amounts: np.ndarray,
+        hours: np.ndarray,
+        payee_is_new: np.ndarray,
+        references: np.ndarray,
+        payees: Optional[list[str]] = None,
+        timestamps: Optional[list[datetime]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate risk scores for many transactions at once.
+
+        Args:
+            amounts: Transaction amounts
+            hours: Hour of day (0-23) of each transaction timestamp
+            payee_is_new: New-payee flags
+            references: Transaction references
+            payees: Payee names, enabling per-payee baselines when given
+            timestamps: Transaction timestamps, enabling velocity checks with payees
+
+        Returns:
+            tuple: (risk_scores 0-1, factor bitmasks using FACTOR_BITS)
+        """
+        ...
+
+    def spike_baseline(self, payee: Optional[str]) -> float:
+        """
+        Average amount a payment to this payee is compared with for AMOUNT_SPIKE.
+
+        Args:
+            payee: Payee name
+
+        Returns:
+            float: The mean amount the spike threshold is derived from
+        """
+        ...
+
 
 class MockAnomalyDetector:
     """
@@ -41,9 +192,95 @@ class MockAnomalyDetector:
     - NEW_PAYEE: First-time payee (+0.25)
     - UNUSUAL_TIMING: Outside business hours (+0.25)
     - AMOUNT_SPIKE: Amount > 3x average (+0.30)
-    - SUSPICIOUS_REFERENCE: Contains urgency markers (+0.15)
+    - SUSPICIOUS_REFERENCE: Contains an URGENCY_KEYWORDS term (+0.15)
+    - VELOCITY: Burst of transfers to the payee (or from the account, once
+      transactions carry one) (+0.20)
+
+    With a profile store, the spike baseline is the payee's own history
+    (falling back to the account's, then AVG_TRANSACTION_AMOUNT), payments
+    outside business hours are not UNUSUAL_TIMING when the payee is
+    regularly paid at that hour, and a payee with no history counts as new
+    even if the client says otherwise.
+    VELOCITY needs a velocity tracker and never triggers without one.
     """
 
+    def __init__(
+        self,
+        profile_store: Optional[ProfileStore] = None,
+        velocity_tracker: Optional[VelocityTracker] = None,
+        keyword_scanner: Optional[KeywordScanner] = None,
+    ):
+        self.profile_store = profile_store
+        self.velocity_tracker = velocity_tracker
+        self._keyword_scanner = keyword_scanner
+        self._urgency_keywords = frozenset(kw.lower() for kw in URGENCY_KEYWORDS)
+
+    @property
+    def keyword_scanner(self) -> KeywordScanner:
+        """Scanner for reference keywords (the shared default unless given one)."""
+        return self._keyword_scanner or get_keyword_scanner()
+
+    def has_urgency_marker(self, reference: str) -> bool:
+        """Whether a reference contains any urgency keyword."""
+        return not self._urgency_keywords.isdisjoint(self.keyword_scanner.scan(reference))
+
+    def _baseline_profile(self, payee: Optional[str]) -> Optional[ProfileStats]:
+        """The payee's profile, else the account's, once it has PROFILE_MIN_HISTORY payments."""
+        if self.profile_store is not None:
+            for profile in (
+                self.profile_store.get(PAYEE_SCOPE, payee) if payee else None,
+                self.profile_store.get(ACCOUNT_SCOPE, DEFAULT_ACCOUNT),
+            ):
+                if profile is not None and profile.count >= PROFILE_MIN_HISTORY:
+                    return profile
+        return None
+
+    def spike_baseline(self, payee: Optional[str]) -> float:
+        """Mean amount spike_threshold compares with (AVG_TRANSACTION_AMOUNT without history)."""
+        profile = self._baseline_profile(payee)
+        return profile.mean if profile is not None else AVG_TRANSACTION_AMOUNT
+
+    def spike_threshold(self, payee: Optional[str]) -> float:
+        """
+        Amount above which a payment to this payee is an AMOUNT_SPIKE.
+
+        Uses the first profile with at least PROFILE_MIN_HISTORY payments:
+        the payee's, then the account's. A spike must exceed both
+        AMOUNT_SPIKE_MULTIPLIER x mean and mean + PROFILE_SPIKE_STDDEVS x std,
+        so payees with very regular amounts are not flagged for small rises.
+        """
+        profile = self._baseline_profile(payee)
+        if profile is not None:
+            return max(
+                profile.mean * AMOUNT_SPIKE_MULTIPLIER,
+                profile.mean + PROFILE_SPIKE_STDDEVS * profile.std,
+            )
+        return AVG_TRANSACTION_AMOUNT * AMOUNT_SPIKE_MULTIPLIER
+
+    def is_unusual_hour(self, payee: Optional[str], hour: int) -> bool:
+        """
+        Whether a payment at this hour of day is UNUSUAL_TIMING.
+
+        Hours outside business hours are unusual unless the payee has at
+        least PROFILE_MIN_HISTORY payments and PROFILE_USUAL_HOUR_SHARE of
+        them were made in that hour (e.g. a night-shift contractor).
+        """
+        if BUSINESS_HOURS_START <= hour < BUSINESS_HOURS_END:
+            return False
+        if self.profile_store is not None and payee:
+            profile = self.profile_store.get(PAYEE_SCOPE, payee)
+            if profile is not None and profile.count >= PROFILE_MIN_HISTORY:
+                return profile.hour_share(hour) < PROFILE_USUAL_HOUR_SHARE
+        return True
+
+    def is_new_payee(self, payee: Optional[str], client_flag: bool) -> bool:
+        """Combine the client's payee_is_new flag with the payee's history."""
+        if client_flag:
+            return True
+        if self.profile_store is None or not payee:
+            return False
+        return self.profile_store.is_new_payee(payee) is True
+
     def calculate_risk_score(self, transaction: dict) -> tuple[float, list[str]]:
         """
         Calculate deterministic risk score based on transaction attributes.
@@ -57,36 +294,124 @@ class MockAnomalyDetector:
         score = 0.0
         factors = []
 
+        payee = transaction.get("payee")
+        timestamp = transaction.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
         # Factor 1: New payee detection
-        if transaction.get("payee_is_new", False):
+        if self.is_new_payee(payee, transaction.get("payee_is_new", False)):
             score += SCORING_WEIGHTS["NEW_PAYEE"]
             factors.append("NEW_PAYEE")
 
-        # Factor 2: Unusual timing (outside 9am-6pm)
-        timestamp = transaction.get("timestamp")
-        if timestamp:
-            if isinstance(timestamp, str):
-                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-            hour = timestamp.hour
-            if hour < BUSINESS_HOURS_START or hour >= BUSINESS_HOURS_END:
-                score += SCORING_WEIGHTS["UNUSUAL_TIMING"]
-                factors.append("UNUSUAL_TIMING")
-
-        # Factor 3: Amount spike (> 3x average)
+        # Factor 2: Unusual timing (outside 9am-6pm, unless usual for the payee)
+        if timestamp and self.is_unusual_hour(payee, timestamp.hour):
+            score += SCORING_WEIGHTS["UNUSUAL_TIMING"]
+            factors.append("UNUSUAL_TIMING")
+
+        # Factor 3: Amount spike (> 3x the payee's or global average)
         amount = transaction.get("amount", 0)
-        spike_threshold = AVG_TRANSACTION_AMOUNT * AMOUNT_SPIKE_MULTIPLIER
-        if amount > spike_threshold:
+        if amount > self.spike_threshold(payee):
             score += SCORING_WEIGHTS["AMOUNT_SPIKE"]
             factors.append("AMOUNT_SPIKE")
 
         # Factor 4: Suspicious reference patterns
-        reference = transaction.get("reference", "").upper()
-        if "URGENT" in reference:
+        if self.has_urgency_marker(transaction.get("reference", "")):
             score += SCORING_WEIGHTS["SUSPICIOUS_REFERENCE"]
             factors.append("SUSPICIOUS_REFERENCE")
 
+        # Factor 5: Velocity (burst of recent transfers)
+        if self.velocity_tracker is not None and payee and timestamp:
+            if self.velocity_tracker.is_burst(payee, timestamp):
+                score += SCORING_WEIGHTS["VELOCITY"]
+                factors.append("VELOCITY")
+
         return min(score, 1.0), factors
 
+    def calculate_risk_scores_batch(
+        self,
+        amounts: np.ndarray,
+        hours: np.ndarray,
+        payee_is_new: np.ndarray,
+        references: np.ndarray,
+        payees: Optional[list[str]] = None,
+        timestamps: Optional[list[datetime]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized equivalent of calculate_risk_score over columnar input.
+
+        Weights are accumulated in SCORING_WEIGHTS order, matching the scalar
+        path, so scores are bit-identical to calling calculate_risk_score
+        on each row. Profiles are read once per distinct payee; the whole
+        batch is scored against the profiles as they were before it.
+        Velocity counts earlier rows of the batch, so bursts within a
+        single upload are caught.
+
+        Args:
+            amounts: Transaction amounts
+            hours: Hour of day (0-23) of each transaction timestamp
+            payee_is_new: New-payee flags
+            references: Transaction references
+            payees: Payee names, enabling per-payee baselines when given
+            timestamps: Transaction timestamps, enabling velocity checks with payees
+
+        Returns:
+            tuple: (float64 risk scores capped at 1.0, uint8 factor bitmasks)
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        hours = np.asarray(hours)
+        references = np.asarray(references, dtype=str)
+        payee_is_new = np.asarray(payee_is_new, dtype=bool)
+        spike_thresholds = AVG_TRANSACTION_AMOUNT * AMOUNT_SPIKE_MULTIPLIER
+        unusual_timing = (hours < BUSINESS_HOURS_START) | (hours >= BUSINESS_HOURS_END)
+        velocity = np.zeros(amounts.shape, dtype=bool)
+
+        if payees is not None and self.profile_store is not None:
+            distinct = {payee: self.spike_threshold(payee) for payee in set(payees)}
+            spike_thresholds = np.array([distinct[payee] for payee in payees], dtype=np.float64)
+            payee_is_new = payee_is_new | np.array(
+                [self.is_new_payee(payee, False) for payee in payees], dtype=bool
+            )
+            # Only off-hours rows can be excused by the payee's usual hours
+            off_hours = np.flatnonzero(unusual_timing)
+            usual = {}
+            for i in off_hours.tolist():
+                key = (payees[i], int(hours[i]))
+                if key not in usual:
+                    usual[key] = self.is_unusual_hour(*key)
+                unusual_timing[i] = usual[key]
+        if payees is not None and timestamps is not None and self.velocity_tracker is not None:
+            velocity = np.array(
+                self.velocity_tracker.burst_flags(payees, amounts.tolist(), timestamps),
+                dtype=bool,
+            )
+
+        triggered = {
+            "NEW_PAYEE": payee_is_new,
+            "UNUSUAL_TIMING": unusual_timing,
+            "AMOUNT_SPIKE": amounts > spike_thresholds,
+            "SUSPICIOUS_REFERENCE": self._urgency_flags(references),
+            "VELOCITY": velocity,
+        }
+
+        scores = np.zeros(amounts.shape, dtype=np.float64)
+        masks = np.zeros(amounts.shape, dtype=np.uint8)
+        for factor, weight in SCORING_WEIGHTS.items():
+            hit = triggered[factor]
+            scores += np.where(hit, weight, 0.0)
+            masks |= np.where(hit, FACTOR_BITS[factor], 0).astype(np.uint8)
+
+        np.minimum(scores, 1.0, out=scores)
+        return scores, masks
+
+    def _urgency_flags(self, references: np.ndarray) -> np.ndarray:
+        """Urgency flags per reference, scanning each distinct reference once."""
+        if references.size == 0:
+            return np.zeros(0, dtype=bool)
+        distinct, inverse = np.unique(references, return_inverse=True)
+        flags = np.array([self.has_urgency_marker(str(ref)) for ref in distinct], dtype=bool)
+        return flags[inverse.reshape(references.shape)]
+
 
 class AzureAnomalyDetector:
     """
@@ -114,6 +439,22 @@ class AzureAnomalyDetector:
         """Calculate risk score using Azure Anomaly Detector."""
         raise NotImplementedError("Azure integration not yet implemented")
 
+    def calculate_risk_scores_batch(
+        self,
+        amounts: np.ndarray,
+        hours: np.ndarray,
+        payee_is_new: np.ndarray,
+        references: np.ndarray,
+        payees: Optional[list[str]] = None,
+        timestamps: Optional[list[datetime]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Calculate risk scores in batch using Azure Anomaly Detector."""
+        raise NotImplementedError("Azure integration not yet implemented")
+
+    def spike_baseline(self, payee: Optional[str]) -> float:
+        """Average amount used by Azure Anomaly Detector for this payee."""
+        raise NotImplementedError("Azure integration not yet implemented")
+
 
 def get_anomaly_detector() -> AnomalyDetectorProtocol:
     """
@@ -125,4 +466,4 @@ def get_anomaly_detector() -> AnomalyDetectorProtocol:
     - Otherwise, returns MockAnomalyDetector
     """
     # MVP: Always return mock
-    return MockAnomalyDetector()
+    return MockAnomalyDetector(profile_store=profile_store, velocity_tracker=velocity_tracker)
@@ -0,0 +1,396 @@
+"""
+FraudShield Audit Writer
+
+Takes audit log entries off the request path. Entries are buffered in memory
+and written to audit_logs in batches with a multi-row INSERT, every
+AUDIT_FLUSH_INTERVAL_MS or as soon as AUDIT_BATCH_SIZE entries are queued,
+and once more on shutdown.
+
+With a spool path (AUDIT_SPOOL_PATH), each entry is also appended to a local
+JSON-lines file before it is acknowledged. Every process writes its own file
+next to the configured path (audit_spool.<pid>.jsonl for audit_spool.jsonl)
+and holds an exclusive lock on it. The spool is cleared once its entries are
+committed. On start, spools nobody holds a lock on, left by crashed workers,
+are taken over and replayed, so their entries are not lost. Inserts skip IDs
+that already exist, so replaying entries that were committed just before a
+crash is harmless. Spool writes are flushed to the operating system but not
+fsynced, so the spool survives a worker crash, not a power loss or kernel
+crash.
+
+If the database stays unavailable, at most AUDIT_MAX_PENDING entries are kept
+in memory. With a spool, older entries stay on disk only and are read back
+as the backlog drains; without one they are dropped (counted in stats) so the
+backlog cannot exhaust the worker's memory.
+"""
+
+import asyncio
+import json
+import os
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_MS, AUDIT_MAX_PENDING
+from app.db_models import AuditLog
+
+try:
+    import fcntl
+except ImportError:  # Windows: no spool locking, so run one process per spool path
+    fcntl = None
+
+_UUID_FIELDS = ("id", "transaction_id", "user_id")
+
+# Every queued row carries all columns so batches render as one multi-row INSERT
+_OPTIONAL_COLUMNS = {"transaction_id": None, "user_id": None, "ip_address": None, "user_agent": None}
+
+
+def _to_json(row: dict) -> str:
+    """Serialise an audit row for the spool."""
+    data = dict(row)
+    for field in _UUID_FIELDS:
+        if data.get(field) is not None:
+            data[field] = str(data[field])
+    data["created_at"] = data["created_at"].isoformat()
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _from_json(line: str) -> dict:
+    """Parse a spooled audit row back into column values."""
+    row = json.loads(line)
+    for field in _UUID_FIELDS:
+        if row.get(field) is not None:
+            row[field] = UUID(row[field])
+    row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return row
+
+
+def _lock(spool, wait: bool = True) -> bool:
+    """Take an exclusive lock on an open spool; False if another process holds it."""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(spool.fileno(), fcntl.LOCK_EX | (0 if wait else fcntl.LOCK_NB))
+    except BlockingIOError:
+        return False
+    return True
+
+
+class AuditWriter:
+    """Batched write-behind writer for audit log entries."""
+
+    def __init__(
+        self,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_MS / 1000,
+        spool_path: Optional[str | Path] = None,
+        max_pending: int = AUDIT_MAX_PENDING,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.max_pending = max_pending
+        self._pending: list[dict] = []
+        # Oldest unwritten entries kept only in the spool, ahead of _pending
+        self._spilled = 0
+        self._spool = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self.replayed = 0
+        self.dropped = 0
+
+    @property
+    def pending_count(self) -> int:
+        """Entries not yet written to the database."""
+        return len(self._pending) + self._spilled
+
+    def record(
+        self,
+        transaction_id: Optional[UUID],
+        action: str,
+        details: Optional[dict] = None,
+        user_id: Optional[UUID] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ) -> dict:
+        """
+        Queue an audit entry; its ID and timestamp are set immediately.
+
+        Returns:
+            dict: The queued row
+        """
+        row = {
+            "id": uuid.uuid4(),
+            "transaction_id": transaction_id,
+            "action": action,
+            "details": details or {},
+            "user_id": user_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "created_at": created_at or datetime.utcnow(),
+        }
+        self.record_rows([row])
+        return row
+
+    def record_rows(self, rows: Iterable[dict]) -> None:
+        """Queue prepared audit rows (column name to value, including id)."""
+        rows = [{**_OPTIONAL_COLUMNS, "details": {}, **row} for row in rows]
+        if not rows:
+            return
+        if self.spool_path is not None:
+            spool = self._open_spool()
+            spool.write("".join(_to_json(row) + "\n" for row in rows))
+            spool.flush()
+        self._pending.extend(rows)
+        self._shed()
+        if self._wake is not None and len(self._pending) >= self.batch_size:
+            self._wake.set()
+
+    def _shed(self) -> None:
+        """Keep at most max_pending entries in memory, spilling or dropping the oldest."""
+        excess = len(self._pending) - self.max_pending
+        if excess <= 0:
+            return
+        del self._pending[:excess]
+        if self.spool_path is not None:
+            # Still in the spool, which always holds the spilled entries first
+            self._spilled += excess
+        else:
+            self.dropped += excess
+            print(f"Warning: Audit log backlog is full; dropped {excess} oldest entries")
+
+    def process_spool_path(self) -> Path:
+        """This process's spool file (the pid is read on use, so forked workers differ)."""
+        return self.spool_path.with_name(
+            f"{self.spool_path.stem}.{os.getpid()}{self.spool_path.suffix}"
+        )
+
+    def _spool_files(self) -> list[Path]:
+        """Spools of all processes sharing spool_path, plus spool_path itself if present."""
+        stem, suffix = self.spool_path.stem, self.spool_path.suffix
+        name = re.compile(re.escape(stem) + r"\.\d+" + re.escape(suffix))
+        files = [
+            path for path in self.spool_path.parent.glob(f"{stem}.*{suffix}")
+            if name.fullmatch(path.name)
+        ]
+        if self.spool_path.exists():
+            files.append(self.spool_path)
+        return sorted(files)
+
+    def _open_spool(self):
+        if self._spool is None:
+            path = self.process_spool_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._spool = open(path, "a", encoding="utf-8")
+            _lock(self._spool)
+        return self._spool
+
+    def _claim_spools(self) -> tuple[list[dict], list]:
+        """
+        Read the spools no running process holds a lock on.
+
+        Returns:
+            The spooled rows, and the claimed spool files, still open and
+            locked; close them once their rows are safe elsewhere
+        """
+        rows, claimed = [], []
+        for path in self._spool_files():
+            try:
+                spool = open(path, encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            # Skip live spools, and files replaced or removed since they were listed
+            try:
+                owned = _lock(spool, wait=False) and os.path.samestat(
+                    os.fstat(spool.fileno()), os.stat(path)
+                )
+            except FileNotFoundError:
+                owned = False
+            if not owned:
+                spool.close()
+                continue
+            claimed.append(spool)
+            for line in spool:
+                try:
+                    rows.append(_from_json(line))
+                except (ValueError, KeyError):
+                    # The last line may be torn if the process died mid-write
+                    print(f"Warning: Skipping unreadable audit spool line in {path}")
+        return rows, claimed
+
+    def _rewrite_spool(self) -> None:
+        """
+        Replace this process's spool with the entries not yet written.
+
+        Spilled entries are read back into memory as far as max_pending
+        allows; the rest stay at the head of the spool.
+        """
+        if self.spool_path is None:
+            return
+        path = self.process_spool_path()
+        spilled = []
+        if self._spilled:
+            with open(path, encoding="utf-8") as spool:
+                spilled = [line for _, line in zip(range(self._spilled), spool)]
+            room = max(self.max_pending - len(self._pending), 0)
+            self._pending[:0] = [_from_json(line) for line in spilled[:room]]
+            spilled = spilled[room:]
+            self._spilled = len(spilled)
+        old, self._spool = self._spool, None
+        if not self._pending and not spilled:
+            path.unlink(missing_ok=True)
+        else:
+            # The new file is locked before it replaces the old one, so the
+            # spool is never unlocked while it holds entries
+            temp_path = path.with_name(path.name + ".tmp")
+            spool = open(temp_path, "w", encoding="utf-8")
+            _lock(spool)
+            spool.write("".join(spilled))
+            spool.write("".join(_to_json(row) + "\n" for row in self._pending))
+            spool.flush()
+            os.replace(temp_path, path)
+            self._spool = spool
+        if old is not None:
+            old.close()
+
+    @staticmethod
+    def _insert(db: AsyncSession, rows: list[dict]):
+        """Multi-row INSERT that skips entries already stored (spool replays)."""
+        dialect = db.get_bind().dialect.name
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        return insert(AuditLog).values(rows).on_conflict_do_nothing(index_elements=["id"])
+
+    async def flush(self, db: AsyncSession) -> int:
+        """
+        Write all pending entries to the audit_logs table in one commit.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of entries written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+
+            try:
+                for start in range(0, len(batch), self.batch_size):
+                    await db.execute(self._insert(db, batch[start:start + self.batch_size]))
+                await db.commit()
+            except asyncio.CancelledError:
+                self._pending[:0] = batch
+                raise
+            except Exception as e:
+                await db.rollback()
+                self._pending[:0] = batch
+                self._shed()
+                self.failed_flushes += 1
+                print(f"Warning: Could not flush audit log entries: {e}")
+                return 0
+
+            self.written += len(batch)
+            self.batches += 1
+            self._rewrite_spool()
+            return len(batch)
+
+    async def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Replay spools left by crashed processes, then start the flush task."""
+        self._flush_lock = asyncio.Lock()
+        replayed = []
+        if self.spool_path is not None:
+            rows, claimed = self._claim_spools()
+            queued = {row["id"] for row in self._pending}
+            replayed = [
+                row for row in {row["id"]: row for row in rows}.values() if row["id"] not in queued
+            ]
+            try:
+                if replayed:
+                    self._pending[:0] = replayed
+                    self.replayed += len(replayed)
+                    # Move the entries into our own spool, dropping any torn last line
+                    self._rewrite_spool()
+                    self._shed()
+                own = self.process_spool_path()
+                for spool in claimed:
+                    # A claimed file at our own path was just replaced by the rewrite
+                    if not (replayed and Path(spool.name) == own):
+                        Path(spool.name).unlink(missing_ok=True)
+            finally:
+                for spool in claimed:
+                    spool.close()
+        if replayed:
+            print(f"FraudShield: Replaying {len(replayed)} spooled audit log entries")
+            async with session_factory() as db:
+                await self.flush(db)
+        if self._flush_task is None:
+            self._wake = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop(session_factory))
+
+    async def stop(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Stop the flush task and write what is left (including spilled entries)."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+            self._wake = None
+        async with session_factory() as db:
+            while await self.flush(db) and self._pending:
+                pass
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+    async def _flush_loop(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Flush every flush_interval seconds, or early when a batch fills up."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if not self._pending:
+                continue
+            try:
+                async with session_factory() as db:
+                    await self.flush(db)
+            except Exception as e:
+                print(f"Warning: Audit log flush failed: {e}")
+
+    def stats(self) -> dict:
+        """Queue depth and write counters."""
+        return {
+            "pending": len(self._pending),
+            "spilled": self._spilled,
+            "written": self.written,
+            "batches": self.batches,
+            "failed_flushes": self.failed_flushes,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "spool": str(self.spool_path) if self.spool_path else None,
+        }
+
+    def clear(self) -> None:
+        """Forget pending entries and reset counters (the spool is left alone)."""
+        self._pending.clear()
+        self._spilled = 0
+        self.written = self.batches = self.failed_flushes = self.replayed = self.dropped = 0
+
+
+# Singleton instance for convenience
+audit_writer = AuditWriter(spool_path=os.getenv("AUDIT_SPOOL_PATH") or None)
@@ -3,31 +3,71 @@ FraudShield Database Service
 
 Encapsulates all database operations for transactions, users, and audit logs.
 Replaces in-memory storage with SQLAlchemy-based persistence.
+
+All methods are coroutines running on an AsyncSession so request handlers
+never block the event loop on database I/O.
 """
 
+import base64
 from datetime import datetime
-from typing import Optional, Tuple, List
+from typing import Optional, Sequence, Tuple, List
 from uuid import UUID
 import uuid
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, insert, select, tuple_, update
+from sqlalchemy.sql import Executable
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import TRANSACTION_UPDATE_ATTEMPTS
 from app.db_models import Transaction, AuditLog, User
-from app.database import SessionLocal
+from app.database import AsyncSessionLocal
+from app.models import TransactionFilters
+from app.services.audit_writer import audit_writer
+from app.services.profile_store import profile_store
+from app.services.stats_rollup import stats_rollup
+from app.services.velocity_tracker import velocity_tracker
+
+
+def encode_cursor(created_at: datetime, transaction_id: UUID) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor string."""
+    raw = f"{created_at.isoformat()}|{transaction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, transaction_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(transaction_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class DatabaseWriteError(RuntimeError):
+    """A write could not be committed and was rolled back."""
+
+
+class StaleWriteError(DatabaseWriteError):
+    """A conditional UPDATE matched no row, so the write was rolled back."""
 
 
 class DatabaseService:
     """Service for managing database operations."""
 
     @staticmethod
-    def get_db() -> Session:
-        """Get a new database session."""
-        return SessionLocal()
+    def get_db() -> AsyncSession:
+        """Get a new async database session."""
+        return AsyncSessionLocal()
 
     @staticmethod
-    def create_transaction(
-        db: Session,
+    async def create_transaction(
+        db: AsyncSession,
         amount: float,
         payee: str,
         timestamp: datetime,
@@ -40,9 +80,14 @@ class DatabaseService:
         explanation: Optional[str] = None,
         risk_factors_detailed: Optional[list] = None,
         recommended_action: Optional[str] = None,
+        amount_baseline: Optional[float] = None,
     ) -> Transaction:
         """
-        Create a new transaction record in the database.
+        Create a new transaction record in one commit.
+
+        IDs and timestamps are generated client-side, so the returned object is
+        complete without a refresh round trip. The "created" audit entry is
+        queued on the audit writer once the commit succeeds.
 
         Args:
             db: Database session
@@ -58,67 +103,151 @@ class DatabaseService:
             explanation: Explanation text (optional, generated later)
             risk_factors_detailed: Detailed factor descriptions (optional)
             recommended_action: Recommended action (optional)
+            amount_baseline: Average the AMOUNT_SPIKE factor compared against
+                (optional, only when it triggered)
 
         Returns:
             Transaction: Created transaction object
+
+        Raises:
+            DatabaseWriteError: If the commit fails (nothing is stored)
         """
+        now = datetime.utcnow()
+        transaction = Transaction(
+            id=uuid.uuid4(),
+            amount=amount,
+            payee=payee,
+            timestamp=timestamp,
+            reference=reference,
+            payee_is_new=payee_is_new,
+            risk_score=risk_score,
+            risk_level=risk_level,
+            factors=factors,
+            confidence=confidence,
+            explanation=explanation,
+            risk_factors_detailed=risk_factors_detailed,
+            recommended_action=recommended_action,
+            amount_baseline=amount_baseline,
+            status="pending",
+            created_at=now,
+            updated_at=now,
+        )
         try:
-            transaction = Transaction(
-                amount=amount,
-                payee=payee,
-                timestamp=timestamp,
-                reference=reference,
-                payee_is_new=payee_is_new,
-                risk_score=risk_score,
-                risk_level=risk_level,
-                factors=factors,
-                confidence=confidence,
-                explanation=explanation,
-                risk_factors_detailed=risk_factors_detailed,
-                recommended_action=recommended_action,
-                status="pending",
-            )
             db.add(transaction)
-            db.commit()
-            db.refresh(transaction)
+            await stats_rollup.apply_deltas(
+                db, [(timestamp, risk_level, "pending", 1, amount, risk_score)]
+            )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise DatabaseWriteError(f"Could not create transaction: {e}") from e
+
+        audit_writer.record(
+            transaction.id,
+            "created",
+            {"amount": amount, "payee": payee, "risk_level": risk_level},
+            created_at=now,
+        )
+        profile_store.observe(payee, amount, timestamp)
+        velocity_tracker.record(payee, amount, timestamp)
+        return transaction
 
-            # Create audit log entry
-            DatabaseService.create_audit_log(
-                db,
-                transaction_id=transaction.id,
-                action="created",
-                details={
-                    "amount": amount,
-                    "payee": payee,
-                    "risk_level": risk_level,
+    @staticmethod
+    async def create_transactions_bulk(
+        db: AsyncSession,
+        transactions: List[dict],
+        extra_statements: Sequence[Executable] = (),
+    ) -> List[dict]:
+        """
+        Create many scored transactions in one commit.
+
+        IDs and timestamps are generated client-side so rows can be written
+        with one multi-row INSERT and returned without a refresh. Their audit
+        entries are queued on the audit writer once the commit succeeds.
+
+        Args:
+            db: Database session
+            transactions: Dicts with amount, payee, timestamp, reference,
+                payee_is_new, risk_score, risk_level, factors and optionally
+                amount_baseline
+            extra_statements: Executed in the same commit (e.g. import job
+                progress); an UPDATE among them that matches no row rolls the
+                whole commit back
+
+        Returns:
+            List of inserted row dicts (including id and created_at), in input order
+
+        Raises:
+            DatabaseWriteError: If the commit fails (nothing is stored)
+            StaleWriteError: If an UPDATE in extra_statements matched no row
+                (nothing is stored)
+        """
+        now = datetime.utcnow()
+        rows = []
+        audit_rows = []
+
+        for data in transactions:
+            row = {
+                "id": uuid.uuid4(),
+                "amount": data["amount"],
+                "payee": data["payee"],
+                "timestamp": data["timestamp"],
+                "reference": data["reference"],
+                "payee_is_new": data.get("payee_is_new", False),
+                "risk_score": data["risk_score"],
+                "risk_level": data["risk_level"],
+                "factors": data["factors"],
+                "amount_baseline": data.get("amount_baseline"),
+                "status": "pending",
+                "created_at": now,
+                "updated_at": now,
+            }
+            rows.append(row)
+            audit_rows.append({
+                "id": uuid.uuid4(),
+                "transaction_id": row["id"],
+                "action": "created",
+                "details": {
+                    "amount": row["amount"],
+                    "payee": row["payee"],
+                    "risk_level": row["risk_level"],
                 },
-            )
+                "created_at": now,
+            })
 
-            return transaction
-        except Exception as e:
-            print(f"Warning: Could not create transaction: {e}")
-            # Return a transaction object with generated ID for consistency
-            transaction = Transaction(
-                id=uuid.uuid4(),
-                amount=amount,
-                payee=payee,
-                timestamp=timestamp,
-                reference=reference,
-                payee_is_new=payee_is_new,
-                risk_score=risk_score,
-                risk_level=risk_level,
-                factors=factors,
-                confidence=confidence,
-                explanation=explanation,
-                risk_factors_detailed=risk_factors_detailed,
-                recommended_action=recommended_action,
-                status="pending",
-                created_at=datetime.utcnow(),
+        if not rows:
+            return rows
+
+        try:
+            await db.execute(insert(Transaction), rows)
+            await stats_rollup.apply_deltas(
+                db,
+                [
+                    (row["timestamp"], row["risk_level"], "pending", 1, row["amount"], row["risk_score"])
+                    for row in rows
+                ],
             )
-            return transaction
+            for statement in extra_statements:
+                result = await db.execute(statement)
+                if getattr(statement, "is_update", False) and result.rowcount == 0:
+                    raise StaleWriteError(f"Conditional update matched no row: {statement}")
+            await db.commit()
+        except StaleWriteError:
+            await db.rollback()
+            raise
+        except Exception as e:
+            await db.rollback()
+            raise DatabaseWriteError(f"Could not create transactions in bulk: {e}") from e
+
+        audit_writer.record_rows(audit_rows)
+        for row in rows:
+            profile_store.observe(row["payee"], row["amount"], row["timestamp"])
+            velocity_tracker.record(row["payee"], row["amount"], row["timestamp"])
+
+        return rows
 
     @staticmethod
-    def get_transaction(db: Session, transaction_id: str) -> Optional[Transaction]:
+    async def get_transaction(db: AsyncSession, transaction_id: str) -> Optional[Transaction]:
         """
         Retrieve a transaction by ID.
 
@@ -131,40 +260,170 @@ class DatabaseService:
         """
         try:
             uuid_obj = UUID(transaction_id) if isinstance(transaction_id, str) else transaction_id
-            return db.query(Transaction).filter(Transaction.id == uuid_obj).first()
+            result = await db.execute(select(Transaction).where(Transaction.id == uuid_obj))
+            return result.scalars().first()
         except Exception as e:
             # Handle invalid UUID format or database errors
             print(f"Warning: Could not get transaction {transaction_id}: {e}")
             return None
 
     @staticmethod
-    def list_transactions(
-        db: Session, skip: int = 0, limit: int = 20
-    ) -> Tuple[List[Transaction], int]:
+    def _apply_filters(query, filters: Optional[TransactionFilters]):
+        """Add WHERE clauses for the given filters to a transactions query."""
+        if filters is None:
+            return query
+        if filters.risk_level is not None:
+            query = query.where(Transaction.risk_level == filters.risk_level)
+        if filters.status is not None:
+            query = query.where(Transaction.status == filters.status)
+        if filters.payee_prefix:
+            query = query.where(Transaction.payee.startswith(filters.payee_prefix, autoescape=True))
+        if filters.min_amount is not None:
+            query = query.where(Transaction.amount >= filters.min_amount)
+        if filters.max_amount is not None:
+            query = query.where(Transaction.amount <= filters.max_amount)
+        if filters.start_time is not None:
+            query = query.where(Transaction.timestamp >= filters.start_time)
+        if filters.end_time is not None:
+            query = query.where(Transaction.timestamp < filters.end_time)
+        return query
+
+    @staticmethod
+    async def list_transactions(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        filters: Optional[TransactionFilters] = None,
+    ) -> Tuple[List[Transaction], Optional[int], Optional[str]]:
         """
-        List all transactions with pagination.
+        List transactions newest first, by offset or by keyset cursor.
+
+        Rows are ordered by (created_at, id) descending, which is served by the
+        ix_transactions_created_at_id index. When a cursor is given, rows
+        strictly after that position are returned and skip is ignored, so deep
+        pages cost the same as the first one.
 
         Args:
             db: Database session
-            skip: Number of items to skip
+            skip: Number of items to skip (offset mode only)
             limit: Maximum items to return
+            cursor: Opaque cursor from a previous page's next_cursor
+            include_total: Whether to run the exact COUNT(*) query
+            filters: Optional server-side filters
 
         Returns:
-            Tuple of (transactions list, total count)
+            Tuple of (transactions list, total count or None, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
+        query = DatabaseService._apply_filters(
+            select(Transaction).order_by(desc(Transaction.created_at), desc(Transaction.id)),
+            filters,
+        )
+        if cursor:
+            created_at, transaction_id = decode_cursor(cursor)
+            query = query.where(
+                tuple_(Transaction.created_at, Transaction.id) < tuple_(created_at, transaction_id)
+            )
+        else:
+            query = query.offset(skip)
+
         try:
-            query = db.query(Transaction).order_by(desc(Transaction.created_at))
-            total = query.count()
-            items = query.offset(skip).limit(limit).all()
-            return items, total
+            total = None
+            if include_total:
+                total = await db.scalar(
+                    DatabaseService._apply_filters(
+                        select(func.count()).select_from(Transaction), filters
+                    )
+                )
+
+            # Fetch one extra row to learn whether another page exists
+            result = await db.execute(query.limit(limit + 1))
+            items = list(result.scalars().all())
         except Exception as e:
             # If database isn't available, return empty list
             print(f"Warning: Could not query transactions: {e}")
-            return [], 0
+            return [], 0 if include_total else None, None
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+
+        return items, total, next_cursor
 
     @staticmethod
-    def update_transaction(
-        db: Session,
+    async def get_transaction_stats(
+        db: AsyncSession, filters: Optional[TransactionFilters] = None
+    ) -> dict:
+        """
+        Aggregate counts and amount sums per risk level and status.
+
+        Served from the transaction_stats_daily rollup when the filters allow
+        it (risk level, status, whole-day ranges). Otherwise runs a single
+        GROUP BY (risk_level, status) query over transactions. Either way the
+        groups are folded into per-level and per-status totals.
+
+        Args:
+            db: Database session
+            filters: Optional server-side filters
+
+        Returns:
+            Dict with total, total_amount, average_risk_score, by_risk_level, by_status
+        """
+        try:
+            groups = await stats_rollup.get_groups(db, filters)
+            if groups is None:
+                query = DatabaseService._apply_filters(
+                    select(
+                        Transaction.risk_level,
+                        Transaction.status,
+                        func.count(),
+                        func.sum(Transaction.amount),
+                        func.sum(Transaction.risk_score),
+                    ).group_by(Transaction.risk_level, Transaction.status),
+                    filters,
+                )
+                result = await db.execute(query)
+                groups = result.all()
+        except Exception as e:
+            print(f"Warning: Could not aggregate transactions: {e}")
+            groups = []
+
+        by_risk_level = {level: {"count": 0, "total_amount": 0.0} for level in ("high", "medium", "low")}
+        by_status: dict = {}
+        total = 0
+        total_amount = 0.0
+        risk_score_sum = 0.0
+
+        for risk_level, status, count, amount_sum, score_sum in groups:
+            if not count:
+                continue
+            status = status or "pending"
+            level_bucket = by_risk_level.setdefault(risk_level, {"count": 0, "total_amount": 0.0})
+            level_bucket["count"] += count
+            level_bucket["total_amount"] += amount_sum or 0.0
+            status_bucket = by_status.setdefault(status, {"count": 0, "total_amount": 0.0})
+            status_bucket["count"] += count
+            status_bucket["total_amount"] += amount_sum or 0.0
+            total += count
+            total_amount += amount_sum or 0.0
+            risk_score_sum += score_sum or 0.0
+
+        return {
+            "total": total,
+            "total_amount": total_amount,
+            "average_risk_score": risk_score_sum / total if total else None,
+            "by_risk_level": by_risk_level,
+            "by_status": by_status,
+        }
+
+    @staticmethod
+    async def update_transaction(
+        db: AsyncSession,
         transaction_id: str,
         updates: dict,
         audit_action: Optional[str] = None,
@@ -173,6 +432,13 @@ class DatabaseService:
         """
         Update a transaction with new data.
 
+        The row is written with a conditional UPDATE that only matches if its
+        risk level and status are still the ones just read, so the rollup
+        deltas always move it out of the bucket it is really in. If another
+        request changed them in between, the row is re-read and the update
+        retried. The update and its rollup deltas are written in one commit,
+        and the audit entry is queued on the audit writer.
+
         Args:
             db: Database session
             transaction_id: Transaction UUID
@@ -182,34 +448,97 @@ class DatabaseService:
 
         Returns:
             Updated transaction or None if not found
+
+        Raises:
+            DatabaseWriteError: If the commit fails (nothing is stored)
+            StaleWriteError: If the row kept changing for every attempt
+                (nothing is stored)
         """
-        transaction = DatabaseService.get_transaction(db, transaction_id)
-        
-        if not transaction:
-            return None
+        for _ in range(TRANSACTION_UPDATE_ATTEMPTS):
+            transaction = await DatabaseService.get_transaction(db, transaction_id)
+
+            if not transaction:
+                return None
+
+            previous = (transaction.risk_level, transaction.status)
+            now = datetime.utcnow()
+            values = {key: value for key, value in updates.items() if hasattr(Transaction, key)}
+            values["updated_at"] = now
+
+            try:
+                # The session synchronizes the loaded object with the new values
+                result = await db.execute(
+                    update(Transaction)
+                    .where(
+                        Transaction.id == transaction.id,
+                        Transaction.risk_level == previous[0],
+                        Transaction.status == previous[1],
+                    )
+                    .values(**values)
+                )
+                if result.rowcount == 0:
+                    # Lost a race with another update; rolling back expires the stale object
+                    await db.rollback()
+                    continue
+
+                # Move the row between rollup buckets if its risk level or status changed
+                if (transaction.risk_level, transaction.status) != previous:
+                    await stats_rollup.apply_deltas(
+                        db,
+                        [
+                            (transaction.timestamp, previous[0], previous[1], -1,
+                             -transaction.amount, -transaction.risk_score),
+                            (transaction.timestamp, transaction.risk_level, transaction.status, 1,
+                             transaction.amount, transaction.risk_score),
+                        ],
+                    )
+
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                raise DatabaseWriteError(f"Could not update transaction: {e}") from e
+
+            if audit_action:
+                audit_writer.record(transaction.id, audit_action, audit_details, created_at=now)
+            return transaction
 
-        for key, value in updates.items():
-            if hasattr(transaction, key):
-                setattr(transaction, key, value)
+        raise StaleWriteError(f"Transaction {transaction_id} changed during every update attempt")
 
-        transaction.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(transaction)
+    @staticmethod
+    async def save_explanation(
+        db: AsyncSession, transaction_id: str, explanation_data: dict
+    ) -> bool:
+        """
+        Store a generated explanation unless the transaction already has one.
 
-        # Create audit log entry if action provided
-        if audit_action:
-            DatabaseService.create_audit_log(
-                db,
-                transaction_id=transaction.id,
-                action=audit_action,
-                details=audit_details or {},
-            )
+        Runs as a single UPDATE; no row is loaded and the rollups are not
+        touched, since risk level and status do not change.
 
-        return transaction
+        Args:
+            db: Database session
+            transaction_id: Transaction UUID
+            explanation_data: Output of ExplanationGeneratorProtocol.generate_explanation
+
+        Returns:
+            True if the explanation was stored
+        """
+        uuid_obj = UUID(transaction_id) if isinstance(transaction_id, str) else transaction_id
+        result = await db.execute(
+            update(Transaction)
+            .where(Transaction.id == uuid_obj, Transaction.explanation.is_(None))
+            .values(
+                confidence=explanation_data.get("confidence"),
+                explanation=explanation_data.get("explanation"),
+                risk_factors_detailed=explanation_data.get("risk_factors"),
+                recommended_action=explanation_data.get("recommended_action"),
+            )
+        )
+        await db.commit()
+        return result.rowcount > 0
 
     @staticmethod
-    def create_audit_log(
-        db: Session,
+    async def create_audit_log(
+        db: AsyncSession,
         transaction_id: UUID,
         action: str,
         details: Optional[dict] = None,
@@ -218,7 +547,10 @@ class DatabaseService:
         user_agent: Optional[str] = None,
     ) -> AuditLog:
         """
-        Create an audit log entry.
+        Create an audit log entry immediately, in its own commit.
+
+        Request handlers queue entries on audit_writer instead, which writes
+        them in batches off the request path.
 
         Args:
             db: Database session
@@ -233,44 +565,99 @@ class DatabaseService:
             AuditLog: Created audit log entry
         """
         audit_log = AuditLog(
+            id=uuid.uuid4(),
             transaction_id=transaction_id,
             action=action,
             details=details or {},
             user_id=user_id,
             ip_address=ip_address,
             user_agent=user_agent,
+            created_at=datetime.utcnow(),
         )
         db.add(audit_log)
-        db.commit()
-        db.refresh(audit_log)
+        await db.commit()
         return audit_log
 
     @staticmethod
-    def get_audit_trail(db: Session, transaction_id: str) -> List[AuditLog]:
+    async def get_audit_trail(
+        db: AsyncSession,
+        transaction_id: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[AuditLog], Optional[str]]:
         """
-        Get all audit log entries for a transaction.
+        Get audit log entries for a transaction, oldest first.
+
+        Entries are ordered by (created_at, id) and read through the
+        ix_audit_logs_transaction_id_created_at index. With a cursor, entries
+        strictly after that position are returned.
 
         Args:
             db: Database session
             transaction_id: Transaction UUID
+            limit: Maximum entries to return
+            cursor: Opaque cursor from a previous page's next_cursor
 
         Returns:
-            List of AuditLog entries
+            Tuple of (AuditLog entries, next cursor or None)
+
+        Raises:
+            ValueError: If the cursor is malformed
         """
         try:
             uuid_obj = UUID(transaction_id) if isinstance(transaction_id, str) else transaction_id
-            return (
-                db.query(AuditLog)
-                .filter(AuditLog.transaction_id == uuid_obj)
-                .order_by(AuditLog.created_at)
-                .all()
-            )
         except (ValueError, TypeError):
-            return []
+            return [], None
+
+        query = (
+            select(AuditLog)
+            .where(AuditLog.transaction_id == uuid_obj)
+            .order_by(AuditLog.created_at, AuditLog.id)
+        )
+        if cursor:
+            created_at, entry_id = decode_cursor(cursor)
+            query = query.where(tuple_(AuditLog.created_at, AuditLog.id) > tuple_(created_at, entry_id))
+
+        # Fetch one extra row to learn whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        entries = list(result.scalars().all())
+
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(entries[-1].created_at, entries[-1].id)
+        return entries, next_cursor
+
+    @staticmethod
+    async def get_audit_trails(
+        db: AsyncSession, transaction_ids: List[UUID]
+    ) -> dict[UUID, List[AuditLog]]:
+        """
+        Get the full audit trails of many transactions in one query.
+
+        Args:
+            db: Database session
+            transaction_ids: Transaction UUIDs
+
+        Returns:
+            Dict of transaction ID to its entries, oldest first (IDs without
+            entries are omitted)
+        """
+        if not transaction_ids:
+            return {}
+        result = await db.execute(
+            select(AuditLog)
+            .where(AuditLog.transaction_id.in_(set(transaction_ids)))
+            .order_by(AuditLog.transaction_id, AuditLog.created_at, AuditLog.id)
+        )
+        trails: dict[UUID, List[AuditLog]] = {}
+        for entry in result.scalars():
+            trails.setdefault(entry.transaction_id, []).append(entry)
+        return trails
 
     @staticmethod
-    def create_user(
-        db: Session,
+    async def create_user(
+        db: AsyncSession,
         email: str,
         hashed_password: str,
         full_name: Optional[str] = None,
@@ -297,12 +684,12 @@ class DatabaseService:
             is_active=True,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """
         Get a user by email.
 
@@ -313,10 +700,11 @@ class DatabaseService:
         Returns:
             User or None
         """
-        return db.query(User).filter(User.email == email).first()
+        result = await db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
         """
         Get a user by ID.
 
@@ -327,7 +715,8 @@ class DatabaseService:
         Returns:
             User or None
         """
-        return db.query(User).filter(User.id == user_id).first()
+        result = await db.execute(select(User).where(User.id == user_id))
+        return result.scalars().first()
 
 
 # Singleton instance for convenience
@@ -0,0 +1,212 @@
+"""
+FraudShield Event Broker
+
+Publish/subscribe fan-out of transaction events to live clients
+(GET /transactions/stream), replacing dashboard polling with pushed deltas.
+
+Configuration:
+    EVENT_BROKER: memory | redis (default: memory)
+    EVENT_BROKER_URL: Redis URL when EVENT_BROKER=redis (default: redis://localhost:6379/0)
+
+The in-process broker only reaches clients connected to the same worker.
+With several gunicorn workers, use the Redis backend so every worker
+relays every event.
+
+Publishing is best effort: events are published after the database commit,
+so a broker outage is logged and never fails the request that triggered it.
+"""
+
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Redis listener reconnect backoff (doubled after each failed attempt)
+RECONNECT_BASE_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 30.0
+
+
+class Subscription:
+    """A single subscriber's bounded event queue."""
+
+    def __init__(self, max_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+
+    def put(self, event: dict) -> None:
+        """Enqueue an event, dropping the oldest one if the subscriber is slow."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        """Wait for the next event."""
+        return await self._queue.get()
+
+
+class InProcessEventBroker:
+    """Event broker delivering to subscribers in the current process."""
+
+    def __init__(self):
+        self._subscribers: set[Subscription] = set()
+
+    @property
+    def subscriber_count(self) -> int:
+        """Number of currently connected subscribers."""
+        return len(self._subscribers)
+
+    async def start(self) -> None:
+        """Start background resources (none for the in-process broker)."""
+
+    async def stop(self) -> None:
+        """Release background resources (none for the in-process broker)."""
+
+    async def publish(self, event_type: str, data: dict) -> None:
+        """
+        Publish an event to all subscribers.
+
+        Args:
+            event_type: Event name, e.g. "transaction.created"
+            data: JSON-serialisable payload
+        """
+        self._deliver({"type": event_type, "data": data})
+
+    def _deliver(self, event: dict) -> None:
+        """Fan an event out to local subscribers."""
+        for subscription in list(self._subscribers):
+            subscription.put(event)
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[Subscription]:
+        """Register a subscriber for the lifetime of the context."""
+        subscription = Subscription()
+        self._subscribers.add(subscription)
+        try:
+            yield subscription
+        finally:
+            self._subscribers.discard(subscription)
+
+
+class RedisEventBroker(InProcessEventBroker):
+    """
+    Event broker relaying events between workers over Redis pub/sub.
+
+    Events are published to a Redis channel; each worker listens on the
+    channel and fans messages out to its own subscribers. Until start() has
+    been called, publish() delivers locally only. If Redis is down at start
+    or the connection drops later, the listener (re)subscribes with backoff;
+    events published meanwhile are not replayed.
+    """
+
+    CHANNEL = "fraudshield:transactions"
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Connect to Redis and start relaying channel messages."""
+        self._redis = self._connect()
+        try:
+            pubsub = await self._subscribe()
+        except Exception as e:
+            # The listener keeps retrying, so the relay starts once Redis is up
+            print(f"Warning: Event broker could not subscribe to Redis ({e}); retrying")
+            pubsub = None
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    def _connect(self):
+        import redis.asyncio as redis
+
+        return redis.from_url(self.url)
+
+    async def _subscribe(self):
+        pubsub = self._redis.pubsub()
+        try:
+            await pubsub.subscribe(self.CHANNEL)
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        return pubsub
+
+    async def stop(self) -> None:
+        """Stop relaying and close the Redis connection."""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def publish(self, event_type: str, data: dict) -> None:
+        """
+        Publish to the Redis channel (delivered locally by the listener).
+
+        If Redis is unavailable the event is delivered to this worker's
+        subscribers only, and a warning is logged.
+        """
+        event = {"type": event_type, "data": data}
+        if self._redis is None:
+            self._deliver(event)
+            return
+        try:
+            await self._redis.publish(self.CHANNEL, json.dumps(event, default=str))
+        except Exception as e:
+            print(f"Warning: Could not publish {event_type} event to Redis: {e}")
+            self._deliver(event)
+
+    async def _listen(self, pubsub=None) -> None:
+        """Relay channel messages to local subscribers, (re)subscribing on errors."""
+        delay = RECONNECT_BASE_SECONDS
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = await self._subscribe()
+                    print("FraudShield: Event broker subscribed to Redis")
+                delay = RECONNECT_BASE_SECONDS
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        self._deliver(json.loads(message["data"]))
+                    except (TypeError, ValueError) as e:
+                        print(f"Warning: Dropping malformed broker message: {e}")
+                raise ConnectionError("subscription closed")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Warning: Event broker lost Redis ({e}); retrying in {delay:.0f}s")
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+                    pubsub = None
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+
+def get_event_broker() -> InProcessEventBroker:
+    """Create the event broker selected by the EVENT_BROKER environment variable."""
+    broker_name = os.getenv("EVENT_BROKER", "memory").lower()
+
+    if broker_name == "redis":
+        return RedisEventBroker(os.getenv("EVENT_BROKER_URL", "redis://localhost:6379/0"))
+
+    return InProcessEventBroker()
+
+
+# Shared broker for the application
+event_broker = get_event_broker()
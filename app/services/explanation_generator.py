@@ -6,9 +6,11 @@ Currently uses template-based mock; designed for future Azure OpenAI integration
 """
 
 from datetime import datetime
+from string import Formatter
 from typing import Protocol
 
-from app.config import AVG_TRANSACTION_AMOUNT, RISK_THRESHOLDS
+from app.config import AVG_TRANSACTION_AMOUNT, EXPLANATION_CACHE_SIZE, RISK_THRESHOLDS
+from app.services.lru_cache import LRUCache
 
 
 # Factor-specific explanation templates
@@ -17,6 +19,17 @@ FACTOR_EXPLANATIONS = {
     "UNUSUAL_TIMING": "Initiated at {hour}:{minute} - outside normal hours (9am-6pm)",
     "AMOUNT_SPIKE": "Amount ({currency}{amount}) is {multiplier}x your average ({currency}{avg})",
     "SUSPICIOUS_REFERENCE": "Reference contains urgency markers often linked to fraud",
+    "VELOCITY": "Several transfers to this payee or from this account in a short timeframe",
+}
+
+# Factor -> (display name, template, template fields), compiled once
+_COMPILED_FACTORS = {
+    factor: (
+        factor.replace("_", " ").title(),
+        template,
+        frozenset(field for _, field, _, _ in Formatter().parse(template) if field),
+    )
+    for factor, template in FACTOR_EXPLANATIONS.items()
 }
 
 # Recommended actions per risk level
@@ -27,6 +40,30 @@ RECOMMENDED_ACTIONS = {
 }
 
 
+def _factor_lines(factors: list[str], values: dict) -> list[str]:
+    """Numbered "Name - explanation" lines for the given factors."""
+    risk_factors = []
+    for i, factor in enumerate(factors, 1):
+        compiled = _COMPILED_FACTORS.get(factor)
+        if compiled is None:
+            factor_name, explanation_text = factor.replace("_", " ").title(), factor
+        else:
+            factor_name, template, fields = compiled
+            explanation_text = template.format(**values) if fields else template
+        risk_factors.append(f"{i}. {factor_name} - {explanation_text}")
+    return risk_factors
+
+
+def describe_factors(transaction: dict, factors: list[str]) -> list[str]:
+    """
+    Render factor lines for a transaction without generating a full explanation.
+
+    Matches the `risk_factors` of MockExplanationGenerator, so factor cards
+    can be shown before the narrative is ready.
+    """
+    return _factor_lines(factors, MockExplanationGenerator._template_values(transaction, factors))
+
+
 class ExplanationGeneratorProtocol(Protocol):
     """Protocol defining the explanation generator interface."""
 
@@ -53,8 +90,19 @@ class MockExplanationGenerator:
 
     Builds detailed explanations based on triggered risk factors
     with transaction-specific formatting.
+
+    Results are memoized in a bounded LRU cache keyed on the factor tuple,
+    risk band, confidence and only the transaction fields the triggered
+    factors' templates print (amount, multiplier and average for
+    AMOUNT_SPIKE, hour and minute for UNUSUAL_TIMING), so cached output is
+    identical to a fresh render. AMOUNT_SPIKE is rendered against the
+    transaction's amount_baseline, the average the detector compared it
+    with, falling back to AVG_TRANSACTION_AMOUNT.
     """
 
+    def __init__(self, cache_size: int = EXPLANATION_CACHE_SIZE):
+        self.cache = LRUCache(cache_size)
+
     def generate_explanation(
         self, transaction: dict, risk_score: float, factors: list[str]
     ) -> dict:
@@ -80,13 +128,19 @@ class MockExplanationGenerator:
         # Calculate confidence (50-99%, capped)
         confidence = min(99, int(50 + (len(factors) * 12) + (risk_score * 20)))
 
-        # Build factor explanations
-        risk_factors = []
-        for i, factor in enumerate(factors, 1):
-            template = FACTOR_EXPLANATIONS.get(factor, factor)
-            explanation_text = self._format_factor(template, transaction, factor)
-            factor_name = factor.replace("_", " ").title()
-            risk_factors.append(f"{i}. {factor_name} - {explanation_text}")
+        values = self._template_values(transaction, factors)
+        key = (tuple(factors), risk_level, confidence, tuple(sorted(values.items())))
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = self._render(risk_level, confidence, factors, values)
+            self.cache.put(key, cached)
+
+        # Callers may modify the result; never hand out the cached objects
+        return {**cached, "risk_factors": list(cached["risk_factors"])}
+
+    def _render(self, risk_level: str, confidence: int, factors: list[str], values: dict) -> dict:
+        """Build the explanation dict from precompiled templates."""
+        risk_factors = _factor_lines(factors, values)
 
         # Build summary explanation
         if len(factors) == 0:
@@ -102,23 +156,36 @@ class MockExplanationGenerator:
             "recommended_action": RECOMMENDED_ACTIONS[risk_level],
         }
 
-    def _format_factor(self, template: str, transaction: dict, factor: str) -> str:
-        """Format a factor explanation template with transaction data."""
-        timestamp = transaction.get("timestamp")
-        if isinstance(timestamp, str):
-            timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-
-        amount = transaction.get("amount", 0)
-        multiplier = round(amount / AVG_TRANSACTION_AMOUNT, 1)
-
-        return template.format(
-            hour=f"{timestamp.hour:02d}" if timestamp else "00",
-            minute=f"{timestamp.minute:02d}" if timestamp else "00",
-            amount=int(amount),
-            currency="£",
-            multiplier=multiplier,
-            avg=AVG_TRANSACTION_AMOUNT,
-        )
+    @staticmethod
+    def _template_values(transaction: dict, factors: list[str]) -> dict:
+        """Transaction-derived values needed by the templates of the given factors."""
+        fields = set()
+        for factor in factors:
+            compiled = _COMPILED_FACTORS.get(factor)
+            if compiled is not None:
+                fields |= compiled[2]
+        if not fields:
+            return {}
+
+        values = {"currency": "£"}
+        if fields & {"hour", "minute"}:
+            timestamp = transaction.get("timestamp")
+            if isinstance(timestamp, str):
+                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+            values["hour"] = f"{timestamp.hour:02d}" if timestamp else "00"
+            values["minute"] = f"{timestamp.minute:02d}" if timestamp else "00"
+        if fields & {"amount", "multiplier", "avg"}:
+            # The detector's baseline (payee or account mean) when it recorded one
+            average = transaction.get("amount_baseline") or AVG_TRANSACTION_AMOUNT
+            amount = transaction.get("amount", 0)
+            values["amount"] = int(amount)
+            values["multiplier"] = round(amount / average, 1)
+            values["avg"] = round(average)
+        return values
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the explanation cache."""
+        return self.cache.stats()
 
 
 class AzureOpenAIExplanationGenerator:
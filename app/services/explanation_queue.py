@@ -0,0 +1,258 @@
+"""
+FraudShield Explanation Queue
+
+Generates and stores explanations for new high/medium-risk transactions in
+the background, so GET /transactions/{id} only reads and analysts' first view
+of an alert does not pay for generation.
+
+Jobs go onto a bounded in-process queue served by a fixed number of asyncio
+workers. Failed jobs are retried with exponential backoff. Generation runs in
+a worker thread, or with the process backend in a ProcessPoolExecutor (useful
+for CPU-heavy local models); the database write always happens in the event
+loop. Generation goes through explanation_flight, so a detail request for a
+transaction that is being processed waits for the same result.
+
+Configuration:
+    EXPLANATION_QUEUE_BACKEND: asyncio | process (default: asyncio)
+
+The queue is in memory: jobs still waiting at shutdown are lost, and the
+detail endpoint falls back to generating (without storing) for them.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    EXPLANATION_MAX_RETRIES,
+    EXPLANATION_QUEUE_SIZE,
+    EXPLANATION_RETRY_BASE_SECONDS,
+    EXPLANATION_WORKERS,
+)
+from app.services.database_service import db_service
+from app.services.explanation_generator import (
+    ExplanationGeneratorProtocol,
+    get_explanation_generator,
+)
+from app.services.registry import registry
+from app.services.single_flight import explanation_flight
+
+
+def explanation_input(transaction) -> dict:
+    """Transaction fields used by explanation generators."""
+    return {
+        "amount": transaction["amount"],
+        "payee": transaction["payee"],
+        "timestamp": transaction["timestamp"],
+        "reference": transaction["reference"],
+        "payee_is_new": transaction.get("payee_is_new", False),
+        "amount_baseline": transaction.get("amount_baseline"),
+    }
+
+
+# Risk levels whose explanations are precomputed
+PRECOMPUTED_RISK_LEVELS = ("high", "medium")
+
+_process_generator: Optional[ExplanationGeneratorProtocol] = None
+
+
+def _generate_in_process(transaction: dict, risk_score: float, factors: list[str]) -> dict:
+    """Generate an explanation inside a worker process (one generator per process)."""
+    global _process_generator
+    if _process_generator is None:
+        _process_generator = get_explanation_generator()
+    return _process_generator.generate_explanation(
+        transaction=transaction, risk_score=risk_score, factors=factors
+    )
+
+
+class ExplanationJob:
+    """A transaction waiting for its explanation."""
+
+    __slots__ = ("transaction_id", "transaction", "risk_score", "factors", "attempts")
+
+    def __init__(self, transaction_id: str, transaction: dict, risk_score: float, factors: list[str]):
+        self.transaction_id = transaction_id
+        self.transaction = transaction
+        self.risk_score = risk_score
+        self.factors = factors
+        self.attempts = 0
+
+
+class ExplanationQueue:
+    """Bounded background queue that precomputes and stores explanations.
+
+    Args:
+        generator_provider: Returns the generator to use (called per job, so
+            hot-swapped generators are picked up). Worker processes build
+            their own generator with get_explanation_generator, so with the
+            process backend a swap restarts the process pool instead
+        workers: Number of concurrent jobs
+        max_retries: Retries per job after the first failure
+        max_size: Jobs buffered before new ones are dropped
+        use_processes: Generate explanations in a process pool
+    """
+
+    def __init__(
+        self,
+        generator_provider: Callable[[], ExplanationGeneratorProtocol] = get_explanation_generator,
+        workers: int = EXPLANATION_WORKERS,
+        max_retries: int = EXPLANATION_MAX_RETRIES,
+        max_size: int = EXPLANATION_QUEUE_SIZE,
+        use_processes: bool = False,
+    ):
+        self.generator_provider = generator_provider
+        self.workers = workers
+        self.max_retries = max_retries
+        self.max_size = max_size
+        self.use_processes = use_processes
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Generator the current process pool was started for
+        self._executor_generator: Optional[ExplanationGeneratorProtocol] = None
+        self._pending = 0
+        self._session_factory: Optional[Callable[[], AsyncSession]] = None
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether workers have been started."""
+        return bool(self._tasks)
+
+    @property
+    def pending(self) -> int:
+        """Jobs waiting or in progress."""
+        return self._pending
+
+    def stats(self) -> dict:
+        """Queue depth and job counters for the health endpoint."""
+        return {
+            "backend": "process" if self.use_processes else "asyncio",
+            "pending": self.pending,
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "dropped": self.dropped,
+        }
+
+    async def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Start the worker tasks (and process pool, if configured)."""
+        if self._tasks:
+            return
+        self._session_factory = session_factory
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Let queued jobs finish for up to timeout seconds, then stop workers."""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"Warning: Dropping {self.pending} queued explanations at shutdown")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_generator = None
+
+    async def join(self) -> None:
+        """Wait until every queued job has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def enqueue(
+        self, transaction_id: str, transaction: dict, risk_score: float, factors: list[str]
+    ) -> bool:
+        """
+        Queue an explanation job without waiting.
+
+        Returns:
+            False if the queue is not running or is full (the job is dropped)
+        """
+        if self._queue is None or not self._tasks:
+            return False
+        try:
+            self._queue.put_nowait(ExplanationJob(transaction_id, transaction, risk_score, factors))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._pending += 1
+        return True
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        """The process pool, restarted when the generator has been hot-swapped."""
+        generator = self.generator_provider()
+        if self._executor_generator is not None and generator is not self._executor_generator:
+            # Running jobs finish in the old pool; new processes rebuild the generator
+            self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._executor_generator = generator
+        return self._executor
+
+    async def _generate(self, job: ExplanationJob) -> dict:
+        if self._executor is not None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._process_pool(), _generate_in_process, job.transaction, job.risk_score, job.factors
+            )
+        return await asyncio.to_thread(
+            self.generator_provider().generate_explanation,
+            transaction=job.transaction,
+            risk_score=job.risk_score,
+            factors=job.factors,
+        )
+
+    async def _process(self, job: ExplanationJob) -> None:
+        explanation_data = await explanation_flight.do(
+            job.transaction_id, lambda: self._generate(job)
+        )
+        async with self._session_factory() as db:
+            await db_service.save_explanation(db, job.transaction_id, explanation_data)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                while True:
+                    try:
+                        await self._process(job)
+                        self.processed += 1
+                        break
+                    except Exception as e:
+                        job.attempts += 1
+                        if job.attempts > self.max_retries:
+                            self.failed += 1
+                            print(f"Warning: Could not precompute explanation for {job.transaction_id}: {e}")
+                            break
+                        self.retried += 1
+                        await asyncio.sleep(EXPLANATION_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1))
+            finally:
+                self._pending -= 1
+                self._queue.task_done()
+
+
+def get_explanation_queue() -> ExplanationQueue:
+    """Create the explanation queue selected by EXPLANATION_QUEUE_BACKEND."""
+    backend = os.getenv("EXPLANATION_QUEUE_BACKEND", "asyncio").lower()
+    return ExplanationQueue(
+        generator_provider=registry.get_generator,
+        use_processes=backend == "process",
+    )
+
+
+# Singleton instance for convenience
+explanation_queue = get_explanation_queue()
@@ -0,0 +1,402 @@
+"""
+FraudShield Import Jobs
+
+Background imports for files too large to finish within one HTTP request.
+POST /jobs/import stores the upload in IMPORT_JOB_DIR (default:
+data/import_jobs) and adds a queued row to the import_jobs table; a pool of
+IMPORT_JOB_WORKERS tasks in each API process claims queued jobs and runs
+them through the streaming importer (app.services.transaction_import).
+
+The job table is the queue, so no broker is needed. Every chunk of rows is
+committed together with the job's progress (rows read, imported and failed,
+last input line, error file size), so an interrupted job resumes after its
+last committed chunk: jobs of a process that shuts down are requeued, and
+jobs whose heartbeat (updated_at) is older than IMPORT_JOB_STALE_SECONDS,
+e.g. after a crash, are reclaimed by any worker. Progress updates only match
+the job while this worker still owns it, so a worker whose job was reclaimed
+(e.g. after a long stall) stops at its next chunk instead of importing the
+same rows as the new owner. Uploads live on local disk,
+so every process running workers must share IMPORT_JOB_DIR.
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import aclosing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import IMPORT_JOB_POLL_SECONDS, IMPORT_JOB_STALE_SECONDS, IMPORT_JOB_WORKERS
+from app.db_models import ImportJob
+from app.services.anomaly_detector import AnomalyDetectorProtocol
+from app.services.database_service import StaleWriteError
+from app.services.registry import registry
+from app.services.transaction_import import (
+    ErrorLog,
+    RecordReader,
+    error_file_path,
+    file_chunks,
+    import_records,
+    upload_chunks,
+)
+
+IMPORT_JOB_DIR = Path(os.getenv("IMPORT_JOB_DIR", "data/import_jobs"))
+
+
+def job_file_path(job_id: uuid.UUID, file_format: str) -> Path:
+    """Where the upload of an import job is stored."""
+    return IMPORT_JOB_DIR / f"{job_id.hex}.{file_format}"
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Drop the timezone of a UTC timestamp (Postgres returns aware values, SQLite naive)."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def job_timing(job: ImportJob, now: Optional[datetime] = None) -> dict:
+    """
+    Throughput and remaining time of a job, from its committed progress.
+
+    Returns:
+        dict: progress (fraction of the file read), rows_per_second and
+            eta_seconds (None until the job has made progress)
+    """
+    progress = min(job.bytes_done / job.total_bytes, 1.0) if job.total_bytes else 0.0
+    if job.status == "completed":
+        progress = 1.0
+    started_at = _naive_utc(job.started_at)
+    end = _naive_utc(job.finished_at) or now or datetime.utcnow()
+    elapsed = (end - started_at).total_seconds() if started_at else 0.0
+
+    rows_per_second = job.rows_done / elapsed if elapsed > 0 and job.rows_done else None
+    eta_seconds = None
+    if job.status == "running" and elapsed > 0 and 0 < progress < 1:
+        eta_seconds = elapsed * (1 - progress) / progress
+    elif job.status == "completed":
+        eta_seconds = 0.0
+    return {"progress": progress, "rows_per_second": rows_per_second, "eta_seconds": eta_seconds}
+
+
+class ImportJobRunner:
+    """
+    Pool of worker tasks running import jobs from the import_jobs table.
+
+    Args:
+        detector_provider: Returns the anomaly detector (called per job, so
+            hot-swapped detectors are picked up)
+        workers: Jobs run at once
+        poll_interval: Seconds between job table checks when idle
+        stale_after: Seconds without a heartbeat before a running job is
+            considered abandoned and reclaimed
+    """
+
+    def __init__(
+        self,
+        detector_provider: Callable[[], AnomalyDetectorProtocol] = registry.get_detector,
+        workers: int = IMPORT_JOB_WORKERS,
+        poll_interval: float = IMPORT_JOB_POLL_SECONDS,
+        stale_after: float = IMPORT_JOB_STALE_SECONDS,
+    ):
+        self.detector_provider = detector_provider
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: list[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._session_factory: Optional[Callable[[], AsyncSession]] = None
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.resumed = 0
+        self.lost = 0
+
+    def stats(self) -> dict:
+        """Worker count and job counters for the health endpoint."""
+        return {
+            "workers": len(self._tasks),
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "resumed": self.resumed,
+            "lost": self.lost,
+        }
+
+    async def submit(
+        self,
+        db: AsyncSession,
+        upload,
+        file_format: str,
+        filename: Optional[str] = None,
+    ) -> ImportJob:
+        """
+        Store an uploaded file and queue a job to import it.
+
+        Args:
+            db: Database session
+            upload: Anything with an async read(size)
+            file_format: csv or ndjson
+            filename: Original file name, for display
+
+        Returns:
+            ImportJob: The queued job
+
+        Raises:
+            ImportFormatError: If the format is unknown or the CSV header is invalid
+        """
+        job_id = uuid.uuid4()
+        path = job_file_path(job_id, file_format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(path, "wb") as stored:
+                async for chunk in upload_chunks(upload):
+                    await asyncio.to_thread(stored.write, chunk)
+            # Reject unreadable files now rather than in the background
+            async with aclosing(file_chunks(path)) as chunks:
+                await RecordReader(chunks, file_format).read_header()
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+        now = datetime.utcnow()
+        job = ImportJob(
+            id=job_id,
+            status="queued",
+            format=file_format,
+            filename=(filename or "")[:255] or None,
+            path=str(path),
+            total_bytes=path.stat().st_size,
+            bytes_done=0,
+            rows_done=0,
+            rows_imported=0,
+            rows_failed=0,
+            last_line=0,
+            errors_size=0,
+            created_at=now,
+            updated_at=now,
+        )
+        db.add(job)
+        await db.commit()
+        if self._wake is not None:
+            self._wake.set()
+        return job
+
+    def _claimable(self, now: datetime):
+        return or_(
+            ImportJob.status == "queued",
+            and_(
+                ImportJob.status == "running",
+                ImportJob.updated_at < now - timedelta(seconds=self.stale_after),
+            ),
+        )
+
+    async def claim(self, db: AsyncSession) -> Optional[ImportJob]:
+        """
+        Take the oldest queued (or abandoned) job, if any.
+
+        The claim is a conditional UPDATE, so when several workers race for
+        the same job only one of them gets it.
+        """
+        now = datetime.utcnow()
+        job_id = await db.scalar(
+            select(ImportJob.id)
+            .where(self._claimable(now))
+            .order_by(ImportJob.created_at)
+            .limit(1)
+        )
+        if job_id is None:
+            return None
+        result = await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, self._claimable(now))
+            .values(
+                status="running",
+                worker=self.worker_id,
+                updated_at=now,
+                started_at=func.coalesce(ImportJob.started_at, now),
+            )
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            return None
+        return await db.get(ImportJob, job_id, populate_existing=True)
+
+    async def run_next(self, session_factory: Callable[[], AsyncSession]) -> Optional[ImportJob]:
+        """
+        Claim one job and run it to completion.
+
+        Returns:
+            The job (with its final state), or None if there was nothing to run
+        """
+        async with session_factory() as db:
+            job = await self.claim(db)
+        if job is None:
+            return None
+        if job.last_line:
+            self.resumed += 1
+            print(f"FraudShield: Resuming import job {job.id} after line {job.last_line}")
+        self.running += 1
+        try:
+            return await self.run(session_factory, job)
+        finally:
+            self.running -= 1
+
+    async def run(self, session_factory: Callable[[], AsyncSession], job: ImportJob) -> ImportJob:
+        """Import a claimed job's file, continuing from its committed progress."""
+        bytes_read = 0
+
+        async def counted(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+            nonlocal bytes_read
+            async for chunk in chunks:
+                bytes_read += len(chunk)
+                yield chunk
+
+        errors = ErrorLog(error_file_path(job.id.hex), count=job.rows_failed, size=job.errors_size)
+
+        def progress_values(progress: dict) -> dict:
+            return {
+                "bytes_done": bytes_read,
+                "rows_done": progress["rows"],
+                "rows_imported": progress["imported"],
+                "rows_failed": progress["failed"],
+                "last_line": progress["line"],
+                "errors_size": errors.size(),
+                "updated_at": datetime.utcnow(),
+            }
+
+        def chunk_statements(progress: dict) -> list:
+            # Matches no row once another worker has reclaimed the job, which
+            # rolls the chunk back
+            return [
+                update(ImportJob)
+                .where(ImportJob.id == job.id, ImportJob.worker == self.worker_id)
+                .values(progress_values(progress))
+            ]
+
+        progress = {
+            "rows": job.rows_done,
+            "imported": job.rows_imported,
+            "failed": job.rows_failed,
+            "line": job.last_line,
+        }
+        heartbeat = asyncio.create_task(self._heartbeat(session_factory, job.id))
+        try:
+            async with session_factory() as db, aclosing(file_chunks(Path(job.path))) as chunks:
+                reader = RecordReader(counted(chunks), job.format)
+                async for progress in import_records(
+                    reader,
+                    db,
+                    self.detector_provider(),
+                    errors,
+                    progress=progress,
+                    chunk_statements=chunk_statements,
+                ):
+                    pass
+                finished = await self._finish(db, job, {
+                    **progress_values(progress),
+                    "bytes_done": job.total_bytes,
+                    "status": "completed",
+                    "finished_at": datetime.utcnow(),
+                })
+            if not finished:
+                raise StaleWriteError(f"Import job {job.id} is no longer claimed by this worker")
+            self.completed += 1
+        except asyncio.CancelledError:
+            raise
+        except StaleWriteError:
+            print(f"Warning: Import job {job.id} was reclaimed by another worker; stopping")
+            self.lost += 1
+        except Exception as e:
+            print(f"Warning: Import job {job.id} failed: {e}")
+            async with session_factory() as db:
+                finished = await self._finish(
+                    db, job, {"status": "failed", "error": str(e), "finished_at": datetime.utcnow()}
+                )
+            if finished:
+                self.failed += 1
+            else:
+                self.lost += 1
+        finally:
+            heartbeat.cancel()
+            errors.close()
+
+        async with session_factory() as db:
+            return await db.get(ImportJob, job.id, populate_existing=True)
+
+    async def _finish(self, db: AsyncSession, job: ImportJob, values: dict) -> bool:
+        """Write a job's final state; False if another worker has reclaimed it."""
+        result = await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job.id, ImportJob.worker == self.worker_id)
+            .values({**values, "updated_at": datetime.utcnow()})
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+    async def _heartbeat(self, session_factory: Callable[[], AsyncSession], job_id: uuid.UUID) -> None:
+        """Keep a running job from looking abandoned while it has no chunk to commit."""
+        while True:
+            await asyncio.sleep(max(self.stale_after / 4, 1.0))
+            try:
+                async with session_factory() as db:
+                    await db.execute(
+                        update(ImportJob)
+                        .where(ImportJob.id == job_id, ImportJob.worker == self.worker_id)
+                        .values(updated_at=datetime.utcnow())
+                    )
+                    await db.commit()
+            except Exception as e:
+                print(f"Warning: Could not update import job {job_id} heartbeat: {e}")
+
+    async def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Start the worker tasks."""
+        if self._tasks:
+            return
+        self._session_factory = session_factory
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers and requeue their jobs so the next start resumes them."""
+        if not self._tasks:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wake = None
+        async with self._session_factory() as db:
+            result = await db.execute(
+                update(ImportJob)
+                .where(ImportJob.status == "running", ImportJob.worker == self.worker_id)
+                .values(status="queued", worker=None)
+            )
+            await db.commit()
+        if result.rowcount:
+            print(f"FraudShield: Requeued {result.rowcount} unfinished import jobs")
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                job = await self.run_next(self._session_factory)
+            except Exception as e:
+                print(f"Warning: Import job worker error: {e}")
+                job = None
+            if job is not None:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+# Singleton instance for convenience
+import_jobs = ImportJobRunner()
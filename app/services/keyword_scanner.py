@@ -0,0 +1,115 @@
+"""
+FraudShield Keyword Scanner
+
+Aho-Corasick automaton that finds every lexicon keyword in a payment
+reference in a single pass, so scanning cost depends on the reference length
+rather than the number of keywords. Matching is case-insensitive and on
+substrings ("urgent" matches "URGENTLY"), like the checks it replaces.
+
+The default scanner is built once from the fraud_patterns.json keywords plus
+URGENCY_KEYWORDS and is shared by MockAnomalyDetector (SUSPICIOUS_REFERENCE)
+and LocalJSONProvider (keyword boosts).
+"""
+
+import json
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Optional
+
+from app.config import URGENCY_KEYWORDS
+
+DEFAULT_PATTERNS_FILE = Path(__file__).parent.parent / "data" / "fraud_patterns.json"
+
+
+class KeywordScanner:
+    """Compiled multi-keyword matcher.
+
+    Args:
+        keywords: Keywords to find; normalised to lower case
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = frozenset(kw.lower() for kw in keywords if kw)
+        # Trie transitions, failure links and keywords ending at each state
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[tuple[str, ...]] = [()]
+
+        for keyword in sorted(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (keyword,)
+
+        # Breadth-first: a state's failure link is always shallower than it
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def scan(self, text: str) -> frozenset[str]:
+        """Return every keyword occurring in text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        hits: set[str] = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+        return frozenset(hits)
+
+
+def load_pattern_keywords(patterns: Iterable[dict]) -> set[str]:
+    """Collect the keywords of a list of pattern dicts."""
+    return {kw for pattern in patterns for kw in pattern.get("keywords", [])}
+
+
+def build_keyword_scanner(patterns: Optional[list[dict]] = None) -> KeywordScanner:
+    """
+    Build a scanner over pattern keywords plus the urgency lexicon.
+
+    Args:
+        patterns: Pattern dicts; defaults to the contents of fraud_patterns.json
+    """
+    if patterns is None:
+        patterns = []
+        if DEFAULT_PATTERNS_FILE.exists():
+            with open(DEFAULT_PATTERNS_FILE) as f:
+                patterns = json.load(f)
+    return KeywordScanner(load_pattern_keywords(patterns) | set(URGENCY_KEYWORDS))
+
+
+_default_scanner: Optional[KeywordScanner] = None
+
+
+def get_keyword_scanner() -> KeywordScanner:
+    """Return the shared default scanner, building it on first use."""
+    global _default_scanner
+    if _default_scanner is None:
+        _default_scanner = build_keyword_scanner()
+    return _default_scanner
+
+
+def set_keyword_scanner(scanner: KeywordScanner) -> None:
+    """Replace the shared default scanner (e.g. after patterns change)."""
+    global _default_scanner
+    _default_scanner = scanner
@@ -0,0 +1,427 @@
+"""
+FraudShield Behavioural Profile Store
+
+Keeps an incrementally updated baseline per payee and per account: payment
+count, streaming mean/variance of the amount (Welford), first/last seen
+timestamps and an hour-of-day histogram. The anomaly detector reads profiles
+from the in-process cache in O(1); changes are written behind to the
+behavior_profiles table.
+
+Each worker flushes only the observations it made since its last flush and
+merges them into the stored row (Chan et al. parallel variance), so several
+workers can share one table without overwriting each other.
+
+Rebuild from the transactions table:
+    python -m app.services.profile_store rebuild
+"""
+
+import asyncio
+import math
+import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import PROFILE_CACHE_SIZE, PROFILE_FLUSH_INTERVAL_SECONDS
+from app.db_models import BehaviorProfile, Transaction
+
+PAYEE_SCOPE = "payee"
+ACCOUNT_SCOPE = "account"
+
+# Transactions carry no account identifier yet, so every payment is
+# attributed to a single account profile.
+DEFAULT_ACCOUNT = "default"
+
+# Rows per upsert statement when flushing or rebuilding
+_WRITE_CHUNK_SIZE = 500
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalise a timestamp to aware UTC (SQLite returns naive datetimes)."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class ProfileStats:
+    """Running statistics for one payee or account."""
+
+    __slots__ = ("count", "mean", "m2", "first_seen", "last_seen", "hour_histogram")
+
+    def __init__(
+        self,
+        count: int = 0,
+        mean: float = 0.0,
+        m2: float = 0.0,
+        first_seen: Optional[datetime] = None,
+        last_seen: Optional[datetime] = None,
+        hour_histogram: Optional[list[int]] = None,
+    ):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.first_seen = _as_utc(first_seen)
+        self.last_seen = _as_utc(last_seen)
+        self.hour_histogram = list(hour_histogram) if hour_histogram else [0] * 24
+
+    @classmethod
+    def from_record(cls, record: BehaviorProfile) -> "ProfileStats":
+        """Build stats from a behavior_profiles row."""
+        return cls(
+            count=record.count,
+            mean=record.mean,
+            m2=record.m2,
+            first_seen=record.first_seen,
+            last_seen=record.last_seen,
+            hour_histogram=record.hour_histogram,
+        )
+
+    @property
+    def variance(self) -> float:
+        """Population variance of observed amounts."""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation of observed amounts."""
+        return math.sqrt(self.variance)
+
+    def hour_share(self, hour: int) -> float:
+        """Fraction of observed payments made in the given hour of day."""
+        return self.hour_histogram[hour] / self.count if self.count else 0.0
+
+    def observe(self, amount: float, timestamp: Optional[datetime]) -> None:
+        """Add one payment (Welford update)."""
+        self.count += 1
+        delta = amount - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (amount - self.mean)
+
+        if timestamp is not None:
+            # Same hour the detector's timing rule uses
+            self.hour_histogram[timestamp.hour] += 1
+            timestamp = _as_utc(timestamp)
+            if self.first_seen is None or timestamp < self.first_seen:
+                self.first_seen = timestamp
+            if self.last_seen is None or timestamp > self.last_seen:
+                self.last_seen = timestamp
+
+    def merge(self, other: "ProfileStats") -> None:
+        """Fold another set of statistics into this one (Chan's parallel update)."""
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+
+        self.hour_histogram = [a + b for a, b in zip(self.hour_histogram, other.hour_histogram)]
+        if other.first_seen is not None and (self.first_seen is None or other.first_seen < self.first_seen):
+            self.first_seen = other.first_seen
+        if other.last_seen is not None and (self.last_seen is None or other.last_seen > self.last_seen):
+            self.last_seen = other.last_seen
+
+    def to_row(self, scope: str, key: str) -> dict:
+        """Column values for the behavior_profiles table."""
+        return {
+            "scope": scope,
+            "key": key,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "hour_histogram": self.hour_histogram,
+        }
+
+
+class ProfileStore:
+    """In-process cache of behavioural profiles with write-behind persistence."""
+
+    def __init__(self, max_profiles: int = PROFILE_CACHE_SIZE):
+        self.max_profiles = max_profiles
+        self._profiles: OrderedDict[tuple[str, str], ProfileStats] = OrderedDict()
+        # Observations not yet merged into the database, keyed like _profiles
+        self._pending: dict[tuple[str, str], ProfileStats] = {}
+        self._loaded = False
+        # False once any profile has been evicted or skipped at load time
+        self._complete = True
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether profiles have been loaded from the database."""
+        return self._loaded
+
+    @property
+    def size(self) -> int:
+        """Number of cached profiles."""
+        return len(self._profiles)
+
+    @property
+    def pending_count(self) -> int:
+        """Number of profiles with changes waiting to be flushed."""
+        return len(self._pending)
+
+    def get(self, scope: str, key: str) -> Optional[ProfileStats]:
+        """Return the cached profile for a payee or account, if any."""
+        return self._profiles.get((scope, key))
+
+    def is_new_payee(self, payee: str) -> Optional[bool]:
+        """
+        Whether a payee has never been paid before.
+
+        Returns:
+            True/False when the cache holds every known payee, or None when
+            it cannot tell (not loaded yet, or profiles were evicted)
+        """
+        if not (self._loaded and self._complete):
+            return None
+        return (PAYEE_SCOPE, payee) not in self._profiles
+
+    def observe(
+        self,
+        payee: str,
+        amount: float,
+        timestamp: Optional[datetime],
+        account: str = DEFAULT_ACCOUNT,
+    ) -> None:
+        """Record a stored payment against its payee and account profiles."""
+        for key in ((PAYEE_SCOPE, payee), (ACCOUNT_SCOPE, account)):
+            profile = self._profiles.get(key)
+            if profile is None:
+                profile = self._profiles[key] = ProfileStats()
+            else:
+                self._profiles.move_to_end(key)
+            profile.observe(amount, timestamp)
+
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = ProfileStats()
+            pending.observe(amount, timestamp)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used profiles that have nothing left to flush."""
+        if len(self._profiles) <= self.max_profiles:
+            return
+        for key in list(self._profiles):
+            if len(self._profiles) <= self.max_profiles:
+                break
+            if key in self._pending or key[0] == ACCOUNT_SCOPE:
+                continue
+            del self._profiles[key]
+            self._complete = False
+
+    async def load(self, db: AsyncSession) -> int:
+        """
+        Populate the cache from the behavior_profiles table.
+
+        Observations made before loading are kept and stay pending. If the
+        table is empty but transactions exist, it is rebuilt first.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of profiles loaded
+        """
+        stored = await db.scalar(select(func.count()).select_from(BehaviorProfile))
+        if not stored and await db.scalar(select(func.count()).select_from(Transaction)):
+            # Pending observations are already in transactions; the rebuild covers them
+            self._pending.clear()
+            await self.rebuild(db)
+            return await self.load(db)
+
+        # Most recently active first, so a truncated load keeps the useful ones
+        query = select(BehaviorProfile).order_by(BehaviorProfile.last_seen.desc().nulls_last())
+        result = await db.stream_scalars(query.execution_options(yield_per=_WRITE_CHUNK_SIZE))
+
+        profiles: OrderedDict[tuple[str, str], ProfileStats] = OrderedDict()
+        complete = True
+        async for record in result:
+            if len(profiles) >= self.max_profiles and record.scope != ACCOUNT_SCOPE:
+                complete = False
+                continue
+            profiles[(record.scope, record.key)] = ProfileStats.from_record(record)
+
+        for key, pending in self._pending.items():
+            profiles.setdefault(key, ProfileStats()).merge(pending)
+
+        # OrderedDict puts least recently used first
+        self._profiles = OrderedDict(reversed(profiles.items()))
+        self._complete = complete
+        self._loaded = True
+        return len(profiles)
+
+    @staticmethod
+    def _upsert(db: AsyncSession, rows: list[dict]):
+        """Build an upsert replacing behavior_profiles rows with the given values."""
+        dialect = db.get_bind().dialect.name
+        upsert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = upsert(BehaviorProfile).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=["scope", "key"],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("count", "mean", "m2", "first_seen", "last_seen", "hour_histogram")
+            },
+        )
+
+    async def flush(self, db: AsyncSession) -> int:
+        """
+        Merge pending observations into the behavior_profiles table.
+
+        Stored rows are locked (FOR UPDATE on PostgreSQL), merged with this
+        worker's pending deltas and written back, then the cache is refreshed
+        with the merged totals so other workers' updates are picked up.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of profiles written
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+
+        try:
+            merged: dict[tuple[str, str], ProfileStats] = {}
+            keys = list(pending)
+            for start in range(0, len(keys), _WRITE_CHUNK_SIZE):
+                chunk = keys[start:start + _WRITE_CHUNK_SIZE]
+                for scope in {scope for scope, _ in chunk}:
+                    names = [name for chunk_scope, name in chunk if chunk_scope == scope]
+                    result = await db.execute(
+                        select(BehaviorProfile)
+                        .where(BehaviorProfile.scope == scope, BehaviorProfile.key.in_(names))
+                        .with_for_update()
+                    )
+                    for record in result.scalars():
+                        merged[(record.scope, record.key)] = ProfileStats.from_record(record)
+
+                rows = []
+                for key in chunk:
+                    profile = merged.setdefault(key, ProfileStats())
+                    profile.merge(pending[key])
+                    rows.append(profile.to_row(*key))
+                await db.execute(self._upsert(db, rows))
+            await db.commit()
+        except asyncio.CancelledError:
+            self._restore_pending(pending)
+            raise
+        except Exception as e:
+            await db.rollback()
+            self._restore_pending(pending)
+            print(f"Warning: Could not flush behaviour profiles: {e}")
+            return 0
+
+        for key, profile in merged.items():
+            # Observations made while the flush was awaiting are still pending
+            newer = self._pending.get(key)
+            if newer is not None:
+                profile.merge(newer)
+            if key in self._profiles:
+                self._profiles[key] = profile
+        return len(merged)
+
+    def _restore_pending(self, pending: dict[tuple[str, str], ProfileStats]) -> None:
+        """Put unflushed deltas back so the next flush retries them."""
+        for key, delta in pending.items():
+            newer = self._pending.get(key)
+            if newer is not None:
+                delta.merge(newer)
+            self._pending[key] = delta
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """
+        Recompute every profile from the transactions table.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of profiles written
+        """
+        profiles: dict[tuple[str, str], ProfileStats] = {}
+        query = select(Transaction.payee, Transaction.amount, Transaction.timestamp)
+        result = await db.stream(query.execution_options(yield_per=5000))
+        async for payee, amount, timestamp in result:
+            for key in ((PAYEE_SCOPE, payee), (ACCOUNT_SCOPE, DEFAULT_ACCOUNT)):
+                profile = profiles.get(key)
+                if profile is None:
+                    profile = profiles[key] = ProfileStats()
+                profile.observe(amount, timestamp)
+
+        rows = [profile.to_row(*key) for key, profile in profiles.items()]
+        await db.execute(delete(BehaviorProfile))
+        for start in range(0, len(rows), _WRITE_CHUNK_SIZE):
+            await db.execute(self._upsert(db, rows[start:start + _WRITE_CHUNK_SIZE]))
+        await db.commit()
+        return len(rows)
+
+    async def start(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Start the periodic write-behind task."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop(session_factory))
+
+    async def stop(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Stop the write-behind task and flush what is left."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        async with session_factory() as db:
+            await self.flush(db)
+
+    async def _flush_loop(self, session_factory: Callable[[], AsyncSession]) -> None:
+        """Flush pending profiles every PROFILE_FLUSH_INTERVAL_SECONDS."""
+        while True:
+            await asyncio.sleep(PROFILE_FLUSH_INTERVAL_SECONDS)
+            if not self._pending:
+                continue
+            try:
+                async with session_factory() as db:
+                    await self.flush(db)
+            except Exception as e:
+                print(f"Warning: Profile flush failed: {e}")
+
+    def clear(self) -> None:
+        """Forget all cached and pending profiles."""
+        self._profiles.clear()
+        self._pending.clear()
+        self._loaded = False
+        self._complete = True
+
+
+# Singleton instance for convenience
+profile_store = ProfileStore()
+
+
+async def _rebuild_command() -> None:
+    """Rebuild the profiles table using the configured database."""
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        rows = await profile_store.rebuild(db)
+    print(f"FraudShield: Rebuilt behavior_profiles ({rows} profiles)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m app.services.profile_store rebuild")
+        sys.exit(2)
+    asyncio.run(_rebuild_command())
@@ -0,0 +1,198 @@
+"""
+FraudShield Service Registry
+
+Holds the active anomaly detector, explanation generator, pattern matcher and
+LLM provider for the life of the process. They are built once in the app lifespan (or
+lazily on first use when the lifespan has not run, e.g. under test clients)
+and handed to request handlers through `get_detector` / `get_generator` /
+`get_pattern_matcher` / `get_llm_provider`, so expensive set-up such as SDK clients, models or
+pattern indexes is a one-time cost.
+
+Components may optionally define:
+    warm_up()       - sync or async; called before a component goes live
+    health_check()  - sync or async; returns "ok" (or True) when healthy,
+                      otherwise a short problem string (or False)
+    close()         - sync or async; called once a component is replaced
+
+Replacements are warmed up first and then installed with a single reference
+swap, so in-flight requests keep the components they started with and new
+requests see the new ones.
+"""
+
+import asyncio
+import inspect
+from typing import Callable, Optional
+
+from app.providers import get_llm_provider, get_pattern_provider
+from app.providers.llm.base import LLMProvider
+from app.providers.patterns.base import PatternMatcher
+from app.services.anomaly_detector import AnomalyDetectorProtocol, get_anomaly_detector
+from app.services.explanation_generator import (
+    ExplanationGeneratorProtocol,
+    get_explanation_generator,
+)
+
+
+async def _call_optional(component: object, method: str, default=None):
+    """Call an optional, possibly async, method on a component."""
+    func = getattr(component, method, None)
+    if func is None:
+        return default
+    result = func()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+def _find_wrapped(component: object, method: str):
+    """Return `method` of a component or of the first wrapped provider having it."""
+    seen = 0
+    while component is not None and seen < 10:
+        func = getattr(component, method, None)
+        if func is not None:
+            return func
+        component = getattr(component, "provider", None) or getattr(component, "matcher", None)
+        seen += 1
+    return None
+
+
+_COMPONENTS = ("detector", "generator", "patterns", "llm")
+
+
+class ServiceRegistry:
+    """Lifecycle-managed holder of the active detector, generator, pattern matcher and LLM provider."""
+
+    def __init__(
+        self,
+        detector_factory: Callable[[], AnomalyDetectorProtocol] = get_anomaly_detector,
+        generator_factory: Callable[[], ExplanationGeneratorProtocol] = get_explanation_generator,
+        pattern_factory: Callable[[], PatternMatcher] = get_pattern_provider,
+        llm_factory: Callable[[], LLMProvider] = get_llm_provider,
+    ):
+        self.factories = {
+            "detector": detector_factory,
+            "generator": generator_factory,
+            "patterns": pattern_factory,
+            "llm": llm_factory,
+        }
+        # Installed together so readers never see a mixed set
+        self._active: Optional[tuple] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_started(self) -> bool:
+        """Whether services have been built."""
+        return self._active is not None
+
+    def _services(self) -> tuple:
+        if self._active is None:
+            # Lifespan did not run; build without warm-up
+            self._active = tuple(self.factories[name]() for name in _COMPONENTS)
+        return self._active
+
+    def get_detector(self) -> AnomalyDetectorProtocol:
+        """FastAPI dependency returning the active anomaly detector."""
+        return self._services()[0]
+
+    def get_generator(self) -> ExplanationGeneratorProtocol:
+        """FastAPI dependency returning the active explanation generator."""
+        return self._services()[1]
+
+    def get_pattern_matcher(self) -> PatternMatcher:
+        """FastAPI dependency returning the active pattern matcher."""
+        return self._services()[2]
+
+    def get_llm_provider(self) -> LLMProvider:
+        """FastAPI dependency returning the active LLM provider."""
+        return self._services()[3]
+
+    async def start(self) -> None:
+        """Build and warm up services if they are not already running."""
+        if self._active is None:
+            await self.reload()
+
+    async def swap(
+        self,
+        detector: Optional[AnomalyDetectorProtocol] = None,
+        generator: Optional[ExplanationGeneratorProtocol] = None,
+        patterns: Optional[PatternMatcher] = None,
+        llm: Optional[LLMProvider] = None,
+    ) -> None:
+        """
+        Replace any of the active components.
+
+        New components are warmed up before they are installed; if warm-up
+        raises, the current services stay active and the error propagates.
+        Replaced components are closed afterwards.
+        """
+        replacements = {
+            "detector": detector, "generator": generator, "patterns": patterns, "llm": llm,
+        }
+        async with self._lock:
+            current = dict(zip(_COMPONENTS, self._active or (None,) * len(_COMPONENTS)))
+            for component in replacements.values():
+                if component is not None:
+                    await _call_optional(component, "warm_up")
+
+            installed = {}
+            for name in _COMPONENTS:
+                component = replacements[name] or current[name]
+                if component is None:
+                    component = self.factories[name]()
+                    await _call_optional(component, "warm_up")
+                installed[name] = component
+            self._active = tuple(installed[name] for name in _COMPONENTS)
+
+            for name, component in replacements.items():
+                if component is not None and current[name] not in (None, component):
+                    await _call_optional(current[name], "close")
+
+    async def reload(self) -> None:
+        """Rebuild every service from its factory and swap them in."""
+        await self.swap(**{name: self.factories[name]() for name in _COMPONENTS})
+
+    async def stop(self) -> None:
+        """Close the active services."""
+        if self._active is not None:
+            for component in self._active:
+                await _call_optional(component, "close")
+
+    async def health(self) -> dict[str, str]:
+        """
+        Check every active component.
+
+        Returns:
+            dict: component name -> "ok" or a problem description
+        """
+        components = {}
+        for name, component in zip(_COMPONENTS, self._services()):
+            try:
+                state = await _call_optional(component, "health_check", "ok")
+            except Exception as e:
+                state = f"error: {e}"
+            if isinstance(state, bool):
+                state = "ok" if state else "unavailable"
+            components[name] = str(state)
+        return components
+
+    def pattern_stats(self) -> Optional[dict]:
+        """Reload statistics of the pattern matcher, if it tracks them."""
+        stats = getattr(self.get_pattern_matcher(), "reload_stats", None)
+        return stats() if stats else None
+
+    def breaker_stats(self) -> dict[str, dict]:
+        """Circuit breaker state of components wrapped in the resilience layer."""
+        breakers = {}
+        for name, component in zip(_COMPONENTS, self._services()):
+            stats = _find_wrapped(component, "breaker_stats")
+            if stats is not None:
+                breakers[name] = stats()
+        return breakers
+
+    def reset(self) -> None:
+        """Drop the active services; they are rebuilt on next use."""
+        self._active = None
+
+
+# Singleton instance for convenience
+registry = ServiceRegistry()
@@ -0,0 +1,65 @@
+"""
+FraudShield Single Flight
+
+Coalesces concurrent calls for the same key into one in-flight task: the
+first caller starts the work and everyone arriving before it finishes awaits
+the same result (or exception). Nothing is cached afterwards; the next call
+for the key starts fresh.
+
+The work runs in its own task, so a caller being cancelled (e.g. a client
+disconnecting) does not cancel it for the callers still waiting.
+"""
+
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """Deduplicates concurrent async calls by key."""
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of keys with work in progress."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn() once per key across concurrent callers.
+
+        Args:
+            key: Identifies the work; callers with equal keys share one call
+            fn: Starts the work; only called by the first caller
+
+        Returns:
+            The result of the shared call
+        """
+        self.calls += 1
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(partial(self._done, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            future.exception()  # mark retrieved when every caller has gone
+
+    def stats(self) -> dict:
+        """Call counters."""
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": self.in_flight}
+
+
+# Shared by the transaction detail endpoint and the explanation queue, keyed
+# by transaction id, so a read arriving while the queue is generating awaits it
+explanation_flight = SingleFlight()
@@ -0,0 +1,199 @@
+"""
+FraudShield Daily Stats Rollup
+
+Maintains the transaction_stats_daily summary table so dashboard totals are
+read from O(days) rollup rows instead of counting every transaction.
+
+Every insert for the same day and risk level updates the same row, so under
+heavy concurrent ingestion that row is a hot spot: writers queue on its lock
+until the inserting transaction commits. Upserts touch rows in sorted key
+order so concurrent writers cannot deadlock on each other.
+
+Rebuild (backfill) from the transactions table:
+    python -m app.services.stats_rollup rebuild
+"""
+
+import asyncio
+import sys
+from collections import defaultdict
+from datetime import date, datetime, time, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db_models import Transaction, TransactionStatsDaily
+from app.models import TransactionFilters
+
+
+def rollup_day(timestamp: datetime) -> date:
+    """Return the UTC calendar day a transaction timestamp is rolled up under."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.date()
+
+
+def _utc_midnight(value: datetime) -> Optional[date]:
+    """Return the day for a UTC-midnight datetime, or None if it is not one."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    if value.time() != time(0):
+        return None
+    return value.date()
+
+
+class StatsRollupService:
+    """Service for maintaining and reading the daily stats rollup."""
+
+    @staticmethod
+    async def apply_deltas(db: AsyncSession, deltas: Iterable[tuple]) -> None:
+        """
+        Add count/amount/score deltas to rollup rows, creating rows as needed.
+
+        Runs in the caller's transaction (no commit), so the rollup changes
+        commit atomically with the transaction rows they describe.
+
+        Args:
+            db: Database session
+            deltas: Tuples of (timestamp, risk_level, status, count, amount, risk_score)
+        """
+        merged = defaultdict(lambda: [0, 0.0, 0.0])
+        for timestamp, risk_level, status, count, amount, risk_score in deltas:
+            bucket = merged[(rollup_day(timestamp), risk_level, status or "pending")]
+            bucket[0] += count
+            bucket[1] += amount
+            bucket[2] += risk_score
+
+        if not merged:
+            return
+
+        values = [
+            {
+                "day": day,
+                "risk_level": risk_level,
+                "status": status,
+                "count": count,
+                "amount_sum": amount_sum,
+                "risk_score_sum": risk_score_sum,
+            }
+            # Sorted so concurrent upserts lock rows in the same order (no deadlocks)
+            for (day, risk_level, status), (count, amount_sum, risk_score_sum) in sorted(merged.items())
+        ]
+
+        dialect = db.get_bind().dialect.name
+        upsert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = upsert(TransactionStatsDaily).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["day", "risk_level", "status"],
+            set_={
+                "count": TransactionStatsDaily.count + stmt.excluded.count,
+                "amount_sum": TransactionStatsDaily.amount_sum + stmt.excluded.amount_sum,
+                "risk_score_sum": TransactionStatsDaily.risk_score_sum + stmt.excluded.risk_score_sum,
+            },
+        )
+        await db.execute(stmt)
+
+    @staticmethod
+    async def get_groups(
+        db: AsyncSession, filters: Optional[TransactionFilters] = None
+    ) -> Optional[list[tuple]]:
+        """
+        Read per (risk_level, status) totals from the rollup table.
+
+        Only risk level, status and whole-day (UTC midnight) time bounds can be
+        answered from the rollup. Returns None for any other filter so the
+        caller can fall back to aggregating transactions directly.
+
+        Args:
+            db: Database session
+            filters: Optional filters
+
+        Returns:
+            List of (risk_level, status, count, amount_sum, risk_score_sum), or None
+        """
+        query = select(
+            TransactionStatsDaily.risk_level,
+            TransactionStatsDaily.status,
+            func.sum(TransactionStatsDaily.count),
+            func.sum(TransactionStatsDaily.amount_sum),
+            func.sum(TransactionStatsDaily.risk_score_sum),
+        ).group_by(TransactionStatsDaily.risk_level, TransactionStatsDaily.status)
+
+        if filters is not None:
+            if filters.payee_prefix or filters.min_amount is not None or filters.max_amount is not None:
+                return None
+            if filters.risk_level is not None:
+                query = query.where(TransactionStatsDaily.risk_level == filters.risk_level)
+            if filters.status is not None:
+                query = query.where(TransactionStatsDaily.status == filters.status)
+            if filters.start_time is not None:
+                start_day = _utc_midnight(filters.start_time)
+                if start_day is None:
+                    return None
+                query = query.where(TransactionStatsDaily.day >= start_day)
+            if filters.end_time is not None:
+                end_day = _utc_midnight(filters.end_time)
+                if end_day is None:
+                    return None
+                query = query.where(TransactionStatsDaily.day < end_day)
+
+        result = await db.execute(query)
+        return [tuple(row) for row in result.all()]
+
+    @staticmethod
+    async def rebuild(db: AsyncSession) -> int:
+        """
+        Recompute the whole rollup table from the transactions table.
+
+        Args:
+            db: Database session
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            day = cast(func.timezone("UTC", Transaction.timestamp), Date)
+        else:
+            day = func.date(Transaction.timestamp)
+        status = func.coalesce(Transaction.status, "pending")
+
+        source = select(
+            day,
+            Transaction.risk_level,
+            status,
+            func.count(),
+            func.sum(Transaction.amount),
+            func.sum(Transaction.risk_score),
+        ).group_by(day, Transaction.risk_level, status)
+
+        await db.execute(delete(TransactionStatsDaily))
+        await db.execute(
+            insert(TransactionStatsDaily).from_select(
+                ["day", "risk_level", "status", "count", "amount_sum", "risk_score_sum"],
+                source,
+            )
+        )
+        await db.commit()
+        return await db.scalar(select(func.count()).select_from(TransactionStatsDaily))
+
+
+# Singleton instance for convenience
+stats_rollup = StatsRollupService()
+
+
+async def _rebuild_command() -> None:
+    """Rebuild the rollup table using the configured database."""
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        rows = await stats_rollup.rebuild(db)
+    print(f"FraudShield: Rebuilt transaction_stats_daily ({rows} rows)")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        print("Usage: python -m app.services.stats_rollup rebuild")
+        sys.exit(2)
+    asyncio.run(_rebuild_command())
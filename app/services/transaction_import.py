@@ -0,0 +1,372 @@
+"""
+FraudShield Transaction Import
+
+Imports CSV or NDJSON files of any size. The upload is read in
+IMPORT_READ_BYTES pieces and parsed incrementally; rows are validated with
+TransactionCreate, and every IMPORT_CHUNK_SIZE valid rows are scored in one
+vectorized pass and written with one bulk insert before more input is read,
+so memory stays bounded by the chunk size and a slow database slows the
+reader down instead of queueing rows.
+
+CSV files need a header row with at least amount, payee, reference and
+timestamp (payee_is_new is optional; extra columns are ignored). NDJSON files
+hold one JSON object per line with the same fields.
+
+Rejected rows are written, with their line number and the reason, to an
+NDJSON error file in IMPORT_ERROR_DIR (default: data/import_errors).
+
+Background import jobs (app.services.import_jobs) resume an interrupted
+import by passing the progress of its last committed chunk to
+import_records, which skips the rows already handled.
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional, Sequence, Union
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Executable
+
+from app.config import IMPORT_CHUNK_SIZE, IMPORT_MAX_ERRORS, IMPORT_READ_BYTES
+from app.models import TransactionBatchResponse, TransactionCreate, TransactionResponse
+from app.services.anomaly_detector import AnomalyDetectorProtocol, score_transactions
+from app.services.database_service import db_service
+from app.services.event_broker import event_broker
+from app.services.explanation_queue import (
+    PRECOMPUTED_RISK_LEVELS,
+    explanation_input,
+    explanation_queue,
+)
+
+IMPORT_FORMATS = ("csv", "ndjson")
+REQUIRED_CSV_COLUMNS = ("amount", "payee", "reference", "timestamp")
+
+IMPORT_ERROR_DIR = Path(os.getenv("IMPORT_ERROR_DIR", "data/import_errors"))
+
+
+class ImportFormatError(ValueError):
+    """The file cannot be imported at all (unknown format, bad CSV header)."""
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """Pick csv or ndjson from the file name, then the content type (default: csv)."""
+    suffix = Path(filename or "").suffix.lower()
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    if suffix == ".csv":
+        return "csv"
+    if content_type and content_type.split(";")[0].strip() in (
+        "application/x-ndjson", "application/ndjson", "application/jsonl"
+    ):
+        return "ndjson"
+    return "csv"
+
+
+async def upload_chunks(upload, size: int = IMPORT_READ_BYTES) -> AsyncIterator[bytes]:
+    """Read an uploaded file (anything with an async read(size)) piece by piece."""
+    while chunk := await upload.read(size):
+        yield chunk
+
+
+async def file_chunks(path: Path, size: int = IMPORT_READ_BYTES) -> AsyncIterator[bytes]:
+    """Read a local file piece by piece without blocking the event loop."""
+    with open(path, "rb") as file:
+        while chunk := await asyncio.to_thread(file.read, size):
+            yield chunk
+
+
+async def _decoded_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    """Yield (line number, text) for each line of a UTF-8 byte stream."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    line_number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            line_number += 1
+            yield line_number, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield line_number + 1, pending.rstrip("\r")
+
+
+class RecordReader:
+    """
+    Incremental CSV / NDJSON parser over an async byte stream.
+
+    Call read_header() before records(); for CSV it reads and checks the
+    header row, raising ImportFormatError if required columns are missing.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], file_format: str):
+        if file_format not in IMPORT_FORMATS:
+            raise ImportFormatError(f"Unsupported import format: {file_format}")
+        self.format = file_format
+        self.columns: Optional[list[str]] = None
+        self._lines = _decoded_lines(chunks)
+        self._csv = self._csv_records() if file_format == "csv" else None
+
+    async def _csv_records(self) -> AsyncIterator[tuple[int, list[str]]]:
+        """Yield (first line number, fields) per CSV record; quoted fields may span lines."""
+        record, start = "", 0
+        async for line_number, line in self._lines:
+            if not record:
+                if not line.strip():
+                    continue
+                record, start = line, line_number
+            else:
+                record += "\n" + line
+            # An odd number of quotes means a quoted field continues on the next line
+            if record.count('"') % 2:
+                continue
+            yield start, next(csv.reader([record]))
+            record = ""
+        if record:
+            yield start, next(csv.reader([record]))
+
+    async def read_header(self) -> None:
+        """Read the CSV header row (no-op for NDJSON)."""
+        if self.format != "csv" or self.columns is not None:
+            return
+        async for _, fields in self._csv:
+            self.columns = [field.strip().lower() for field in fields]
+            break
+        else:
+            raise ImportFormatError("CSV file is empty")
+        missing = [column for column in REQUIRED_CSV_COLUMNS if column not in self.columns]
+        if missing:
+            raise ImportFormatError(
+                f"CSV missing required columns: {', '.join(missing)}. "
+                f"Required: {', '.join(REQUIRED_CSV_COLUMNS)}"
+            )
+
+    async def records(self) -> AsyncIterator[tuple[int, Union[dict, str]]]:
+        """Yield (line number, record dict) per row, or (line number, error) for unparsable rows."""
+        if self.format == "csv":
+            await self.read_header()
+            async for line_number, fields in self._csv:
+                if len(fields) != len(self.columns):
+                    yield line_number, f"Expected {len(self.columns)} columns, got {len(fields)}"
+                    continue
+                yield line_number, {
+                    column: value.strip() for column, value in zip(self.columns, fields)
+                }
+            return
+
+        async for line_number, line in self._lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, "Expected a JSON object"
+                continue
+            yield line_number, record
+
+
+def validate_record(record: dict) -> TransactionCreate:
+    """
+    Validate an imported row; empty CSV cells count as missing.
+
+    Raises:
+        ValidationError: If the row is not a valid transaction
+    """
+    return TransactionCreate.model_validate({
+        key: value for key, value in record.items()
+        if key in TransactionCreate.model_fields and value != ""
+    })
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """One-line summary of a row's validation errors."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+class ErrorLog:
+    """
+    NDJSON file of rejected rows, created on the first error.
+
+    To continue an interrupted import, pass the count and size() recorded
+    with its last committed chunk; entries written after that are dropped.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_errors: int = IMPORT_MAX_ERRORS,
+        count: int = 0,
+        size: Optional[int] = None,
+    ):
+        self.path = path
+        self.max_errors = max_errors
+        self.count = count
+        self._file = None
+        if size is not None and self.path.exists():
+            os.truncate(self.path, size)
+
+    def add(self, line_number: int, error: str, row: Optional[dict] = None) -> None:
+        self.count += 1
+        if self.count > self.max_errors:
+            return
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"line": line_number, "error": error, "row": row}, default=str) + "\n")
+
+    def size(self) -> int:
+        """Bytes written so far, flushed to disk."""
+        if self._file is not None:
+            self._file.flush()
+            return self._file.tell()
+        return self.path.stat().st_size if self.path.exists() else 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def new_import_id() -> str:
+    """Identifier naming an import's error file."""
+    return uuid.uuid4().hex
+
+
+def error_file_path(import_id: str) -> Path:
+    """Error file of an import.
+
+    Raises:
+        ValueError: If import_id is not an import identifier
+    """
+    return IMPORT_ERROR_DIR / f"{uuid.UUID(hex=import_id).hex}.ndjson"
+
+
+async def store_transactions(
+    db: AsyncSession,
+    detector: AnomalyDetectorProtocol,
+    transactions: list[dict],
+    extra_statements: Sequence[Executable] = (),
+) -> TransactionBatchResponse:
+    """
+    Score and store validated transactions in one commit.
+
+    High and medium-risk rows are queued for explanation precomputation and
+    one transactions.created event is published for the whole batch.
+
+    Args:
+        db: Database session
+        detector: Anomaly detector
+        transactions: TransactionCreate dumps
+        extra_statements: Executed in the same commit
+
+    Returns:
+        TransactionBatchResponse: Stored rows, in input order
+
+    Raises:
+        DatabaseWriteError: If the rows could not be stored
+    """
+    rows = await db_service.create_transactions_bulk(
+        db,
+        score_transactions(detector, transactions),
+        extra_statements=extra_statements,
+    )
+    for row in rows:
+        if row["risk_level"] in PRECOMPUTED_RISK_LEVELS:
+            explanation_queue.enqueue(
+                str(row["id"]), explanation_input(row), row["risk_score"], row["factors"]
+            )
+
+    response = TransactionBatchResponse(
+        items=[
+            TransactionResponse(
+                id=str(row["id"]),
+                amount=row["amount"],
+                payee=row["payee"],
+                timestamp=row["timestamp"],
+                reference=row["reference"],
+                risk_score=row["risk_score"],
+                risk_level=row["risk_level"],
+                created_at=row["created_at"],
+            )
+            for row in rows
+        ],
+        total=len(rows),
+    )
+    # One event per batch so large imports do not flood subscriber queues
+    await event_broker.publish("transactions.created", response.model_dump(mode="json"))
+    return response
+
+
+async def import_records(
+    reader: RecordReader,
+    db: AsyncSession,
+    detector: AnomalyDetectorProtocol,
+    errors: ErrorLog,
+    chunk_size: Optional[int] = None,
+    progress: Optional[dict] = None,
+    chunk_statements: Optional[Callable[[dict], Sequence[Executable]]] = None,
+) -> AsyncIterator[dict]:
+    """
+    Validate, score and store rows from a reader, chunk by chunk.
+
+    Yields a progress dict after each stored chunk (IMPORT_CHUNK_SIZE rows by
+    default) and once at the end: rows (read), imported, failed and line
+    (last input line consumed).
+
+    Args:
+        progress: Progress of an interrupted import to continue from; rows
+            up to and including its line are skipped
+        chunk_statements: Called with the progress a chunk will reach; the
+            statements it returns are committed together with the chunk
+
+    Raises:
+        DatabaseWriteError: If a chunk could not be stored (earlier chunks stay
+            stored), e.g. StaleWriteError when an UPDATE of chunk_statements
+            matched no row
+    """
+    chunk_size = chunk_size or IMPORT_CHUNK_SIZE
+    progress = dict(progress or {"rows": 0, "imported": 0, "failed": 0, "line": 0})
+    resume_line = progress["line"]
+    chunk: list[dict] = []
+
+    async def store(chunk: list[dict]) -> None:
+        after = {**progress, "imported": progress["imported"] + len(chunk), "failed": errors.count}
+        await store_transactions(
+            db, detector, chunk, chunk_statements(after) if chunk_statements else ()
+        )
+        progress["imported"] = after["imported"]
+
+    async for line_number, record in reader.records():
+        if line_number <= resume_line:
+            continue
+        progress["rows"] += 1
+        progress["line"] = line_number
+        if isinstance(record, str):
+            errors.add(line_number, record)
+            continue
+        try:
+            chunk.append(validate_record(record).model_dump())
+        except ValidationError as e:
+            errors.add(line_number, format_validation_error(e), record)
+            continue
+        if len(chunk) >= chunk_size:
+            await store(chunk)
+            chunk = []
+            progress["failed"] = errors.count
+            yield dict(progress)
+
+    if chunk:
+        await store(chunk)
+    progress["failed"] = errors.count
+    yield dict(progress)
@@ -0,0 +1,297 @@
+"""
+FraudShield Velocity Tracker
+
+Answers "how many transfers / how much money to this payee (or from this
+account) in the last 10 min / 1 h / 24 h" in constant time for the VELOCITY
+factor. Each key keeps one ring of VELOCITY_BUCKETS time buckets per window
+with running totals; advancing a ring only clears the buckets that expired.
+
+Windows follow transaction timestamps and are accurate to one bucket width.
+A window ends at the queried time, so a transfer with an older (out-of-order)
+timestamp is not counted against later transfers; such queries only see
+buckets still kept relative to the newest transfer. Timestamps come from
+clients, so they are capped at the server clock: a future-dated transfer
+(clock skew, a scheduled payment) counts as made now and cannot push the
+rings ahead of real time. Batches are evaluated in timestamp order, so the
+flags do not depend on the order of the input rows.
+
+Account limits only apply to transfers that carry an account id; transactions
+have none yet, and counting every payment against one shared account would
+flag ordinary system-wide volume as a burst. Idle keys are evicted
+least-recently-used first once VELOCITY_MAX_KEYS is reached. On startup the
+last 24 hours of transactions are replayed from the database.
+
+Counters live in each worker process. With several workers, each sees only
+the transfers it stored itself (plus the startup replay), so a burst spread
+across workers is under-counted.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import VELOCITY_BUCKETS, VELOCITY_LIMITS, VELOCITY_MAX_KEYS, VELOCITY_WINDOWS
+from app.db_models import Transaction
+from app.services.profile_store import ACCOUNT_SCOPE, PAYEE_SCOPE
+
+
+def _epoch(timestamp: datetime) -> float:
+    """Seconds since the epoch, treating naive timestamps as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class _Ring:
+    """Bucketed counts and amounts for one key over one window."""
+
+    __slots__ = ("width", "counts", "amounts", "head", "count", "amount")
+
+    def __init__(self, span: int, buckets: int = VELOCITY_BUCKETS):
+        self.width = span / buckets
+        self.counts = [0] * buckets
+        self.amounts = [0.0] * buckets
+        self.head: Optional[int] = None  # absolute index of the newest bucket
+        self.count = 0
+        self.amount = 0.0
+
+    def _advance(self, index: int) -> None:
+        """Move the newest bucket forward to index, expiring older buckets."""
+        if self.head is None or index <= self.head:
+            if self.head is None:
+                self.head = index
+            return
+        size = len(self.counts)
+        if index - self.head >= size:
+            self.counts = [0] * size
+            self.amounts = [0.0] * size
+            self.count = 0
+            self.amount = 0.0
+        else:
+            for i in range(self.head + 1, index + 1):
+                slot = i % size
+                self.count -= self.counts[slot]
+                self.amount -= self.amounts[slot]
+                self.counts[slot] = 0
+                self.amounts[slot] = 0.0
+            if self.count == 0:
+                # Avoid float residue once the window is empty
+                self.amount = 0.0
+        self.head = index
+
+    def add(self, seconds: float, amount: float) -> None:
+        """Record one transfer."""
+        index = int(seconds // self.width)
+        self._advance(index)
+        if index <= self.head - len(self.counts):
+            return  # older than the window
+        slot = index % len(self.counts)
+        self.counts[slot] += 1
+        self.amounts[slot] += amount
+        self.count += 1
+        self.amount += amount
+
+    def totals(self, seconds: float) -> tuple[int, float]:
+        """Transfers and amount in the window ending at the given time."""
+        if self.head is None:
+            return 0, 0.0
+        index = int(seconds // self.width)
+        if index >= self.head:
+            self._advance(index)
+            return self.count, self.amount
+        # Out-of-order query: sum only the kept buckets up to the query time
+        size = len(self.counts)
+        oldest = max(index, self.head) - size + 1
+        if index < oldest:
+            return 0, 0.0
+        slots = [i % size for i in range(oldest, index + 1)]
+        return sum(self.counts[s] for s in slots), sum(self.amounts[s] for s in slots)
+
+    def copy(self) -> "_Ring":
+        """Return an independent copy."""
+        ring = _Ring.__new__(_Ring)
+        ring.width = self.width
+        ring.counts = list(self.counts)
+        ring.amounts = list(self.amounts)
+        ring.head = self.head
+        ring.count = self.count
+        ring.amount = self.amount
+        return ring
+
+
+class _KeyCounter:
+    """One ring per configured window for a single payee or account."""
+
+    __slots__ = ("rings",)
+
+    def __init__(self, rings: Optional[dict[str, _Ring]] = None):
+        self.rings = rings if rings is not None else {
+            name: _Ring(span) for name, span in VELOCITY_WINDOWS.items()
+        }
+
+    def add(self, seconds: float, amount: float) -> None:
+        for ring in self.rings.values():
+            ring.add(seconds, amount)
+
+    def totals(self, seconds: float) -> dict[str, tuple[int, float]]:
+        return {name: ring.totals(seconds) for name, ring in self.rings.items()}
+
+    def exceeds(self, seconds: float, limits: dict[str, int]) -> bool:
+        """Whether earlier transfers in any window reach its limit."""
+        return any(ring.totals(seconds)[0] >= limits[name] for name, ring in self.rings.items())
+
+    def copy(self) -> "_KeyCounter":
+        return _KeyCounter({name: ring.copy() for name, ring in self.rings.items()})
+
+
+class VelocityTracker:
+    """
+    Sliding-window transfer counts per payee and per account.
+
+    Args:
+        max_keys: Payees and accounts tracked before idle ones are evicted
+        clock: Server time in epoch seconds, the latest timestamp accepted
+    """
+
+    def __init__(self, max_keys: int = VELOCITY_MAX_KEYS, clock: Callable[[], float] = time.time):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._counters: OrderedDict[tuple[str, str], _KeyCounter] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        """Number of tracked payees and accounts."""
+        return len(self._counters)
+
+    def _seconds(self, timestamp: datetime) -> float:
+        """Epoch seconds of a transfer, capped at the server clock."""
+        return min(_epoch(timestamp), self.clock())
+
+    def record(
+        self,
+        payee: str,
+        amount: float,
+        timestamp: Optional[datetime],
+        account: Optional[str] = None,
+    ) -> None:
+        """Record a stored transfer against its payee and, if given, its account."""
+        if timestamp is None:
+            return
+        seconds = self._seconds(timestamp)
+        keys = [(PAYEE_SCOPE, payee)]
+        if account is not None:
+            keys.append((ACCOUNT_SCOPE, account))
+        for key in keys:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = _KeyCounter()
+            else:
+                self._counters.move_to_end(key)
+            counter.add(seconds, amount)
+
+        while len(self._counters) > self.max_keys:
+            self._counters.popitem(last=False)
+
+    def window_totals(
+        self, scope: str, key: str, timestamp: datetime
+    ) -> dict[str, tuple[int, float]]:
+        """
+        Transfers and amounts in each window ending at timestamp.
+
+        Returns:
+            dict: window name -> (transfer count, total amount)
+        """
+        counter = self._counters.get((scope, key))
+        if counter is None:
+            return {name: (0, 0.0) for name in VELOCITY_WINDOWS}
+        return counter.totals(self._seconds(timestamp))
+
+    def is_burst(
+        self, payee: str, timestamp: Optional[datetime], account: Optional[str] = None
+    ) -> bool:
+        """Whether a new transfer would exceed any payee or account velocity limit."""
+        return self.burst_flags([payee], [0.0], [timestamp], account)[0]
+
+    def burst_flags(
+        self,
+        payees: list[str],
+        amounts: list[float],
+        timestamps: list[Optional[datetime]],
+        account: Optional[str] = None,
+    ) -> list[bool]:
+        """
+        Velocity flags for a sequence of transfers, as if stored one by one.
+
+        Rows are evaluated in timestamp order, each counting towards later
+        ones, so a burst inside a single batch is caught whatever the input
+        order. Flags are returned in input order. Account limits are checked
+        only when an account is given. Works on copies; the tracker itself is
+        not changed.
+        """
+        scratch: dict[tuple[str, str], _KeyCounter] = {}
+
+        def counter_for(key: tuple[str, str]) -> _KeyCounter:
+            counter = scratch.get(key)
+            if counter is None:
+                stored = self._counters.get(key)
+                counter = scratch[key] = stored.copy() if stored else _KeyCounter()
+            return counter
+
+        flags = [False] * len(payees)
+        account_counter = counter_for((ACCOUNT_SCOPE, account)) if account is not None else None
+        rows = sorted(
+            (self._seconds(timestamp), position)
+            for position, timestamp in enumerate(timestamps)
+            if timestamp is not None
+        )
+        for seconds, position in rows:
+            payee, amount = payees[position], amounts[position]
+            payee_counter = counter_for((PAYEE_SCOPE, payee))
+            flags[position] = (
+                payee_counter.exceeds(seconds, VELOCITY_LIMITS[PAYEE_SCOPE])
+                or (
+                    account_counter is not None
+                    and account_counter.exceeds(seconds, VELOCITY_LIMITS[ACCOUNT_SCOPE])
+                )
+            )
+            payee_counter.add(seconds, amount)
+            if account_counter is not None:
+                account_counter.add(seconds, amount)
+        return flags
+
+    async def load(self, db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """
+        Replay transactions from the longest window into the tracker.
+
+        Args:
+            db: Database session
+            now: End of the replay range (default: current time)
+
+        Returns:
+            int: Number of transactions replayed
+        """
+        now = now or datetime.now(timezone.utc)
+        since = now - timedelta(seconds=max(VELOCITY_WINDOWS.values()))
+        query = (
+            select(Transaction.payee, Transaction.amount, Transaction.timestamp)
+            .where(Transaction.timestamp >= since)
+            .order_by(Transaction.timestamp)
+        )
+        result = await db.stream(query.execution_options(yield_per=5000))
+        count = 0
+        async for payee, amount, timestamp in result:
+            self.record(payee, amount, timestamp)
+            count += 1
+        return count
+
+    def clear(self) -> None:
+        """Forget all tracked transfers."""
+        self._counters.clear()
+
+
+# Singleton instance for convenience
+velocity_tracker = VelocityTracker()
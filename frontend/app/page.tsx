@@ -17,28 +17,12 @@ export default function DashboardPage() {
   const [searchQuery, setSearchQuery] = useState("");
   const [riskLevel, setRiskLevel] = useState<RiskLevel | "all">("all");
 
-  const { transactions: allTransactions, isLoading, isError } = useTransactions();
-
-  // Client-side filtering
-  const transactions = allTransactions.filter((t) => {
-    const matchesSearch = 
-      t.payee.toLowerCase().includes(searchQuery.toLowerCase()) ||
-      t.reference.toLowerCase().includes(searchQuery.toLowerCase());
-    const matchesRisk = riskLevel === "all" || t.risk_level === riskLevel;
-    return matchesSearch && matchesRisk;
+  // Filtering and totals happen server-side across all matching transactions
+  const { transactions, stats, isLoading, isError } = useTransactions({
+    riskLevel,
+    payeePrefix: searchQuery.trim(),
   });
 
-  // Calculate stats from filtered transactions
-  const stats = {
-    total: transactions.length,
-    high: transactions.filter((t) => t.risk_level === "high").length,
-    medium: transactions.filter((t) => t.risk_level === "medium").length,
-    low: transactions.filter((t) => t.risk_level === "low").length,
-    atRisk: transactions
-      .filter((t) => t.risk_level === "high")
-      .reduce((sum, t) => sum + t.amount, 0),
-  };
-
   // Calculate fraud rate
   const fraudRate =
     stats.total > 0 ? Math.round((stats.high / stats.total) * 100) : 0;
@@ -92,7 +76,7 @@ export default function DashboardPage() {
                 {stats.total}
               </p>
               <p className="text-xs text-zinc-500 dark:text-zinc-500">
-                in current view
+                matching filters
               </p>
             </div>
           </div>
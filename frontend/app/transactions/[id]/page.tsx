@@ -4,6 +4,7 @@ import { useParams } from "next/navigation";
 import Link from "next/link";
 import { ArrowLeft, Shield } from "lucide-react";
 import { useTransaction } from "@/hooks/use-transaction";
+import { useExplanationStream } from "@/hooks/use-explanation-stream";
 import { formatAmount, formatFullTimestamp } from "@/lib/utils";
 import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
@@ -19,6 +20,8 @@ export default function TransactionDetailPage() {
   const params = useParams();
   const id = params.id as string;
   const { transaction, isLoading, isError } = useTransaction(id);
+  // Narrative streams in separately so the page does not wait for it
+  const stream = useExplanationStream(id);
 
   if (isLoading) {
     return <DetailSkeleton />;
@@ -93,6 +96,17 @@ export default function TransactionDetailPage() {
         </div>
       </section>
 
+      {/* Narrative */}
+      <section>
+        <h2 className="text-lg font-semibold mb-4">Summary</h2>
+        <p className="text-zinc-600 dark:text-zinc-400" aria-live="polite">
+          {stream.narrative || (stream.status === "error" ? transaction.explanation : "")}
+          {stream.status !== "done" && stream.status !== "error" && (
+            <span className="inline-block w-2 h-4 ml-1 align-middle bg-zinc-400 animate-pulse" />
+          )}
+        </p>
+      </section>
+
       {/* Recommended Action */}
       <section>
         <h2 className="text-lg font-semibold mb-4">Recommended Action</h2>
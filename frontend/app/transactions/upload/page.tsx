@@ -9,12 +9,22 @@ import { Card } from "@/components/ui/card";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+interface ImportProgress {
+  event: "progress" | "done" | "error";
+  rows: number;
+  imported: number;
+  failed: number;
+  errors_url?: string | null;
+  detail?: string;
+}
+
 export default function UploadTransactionsPage() {
   const router = useRouter();
   const [isDragging, setIsDragging] = useState(false);
   const [isUploading, setIsUploading] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [results, setResults] = useState<{ success: number; failed: number } | null>(null);
+  const [progress, setProgress] = useState<ImportProgress | null>(null);
+  const [results, setResults] = useState<ImportProgress | null>(null);
 
   const handleDragOver = (e: React.DragEvent) => {
     e.preventDefault();
@@ -42,111 +52,49 @@ export default function UploadTransactionsPage() {
 
   const handleFile = async (file: File) => {
     // Validate file type
-    if (!file.name.endsWith(".csv") && file.type !== "text/csv") {
-      setError("Please upload a CSV file");
+    if (!/\.(csv|ndjson|jsonl)$/i.test(file.name) && file.type !== "text/csv") {
+      setError("Please upload a CSV or NDJSON file");
       return;
     }
 
     setIsUploading(true);
     setError(null);
+    setProgress(null);
     setResults(null);
 
     try {
-      // Parse CSV
-      const text = await file.text();
-      const lines = text.split("\n").filter((line) => line.trim());
-
-      if (lines.length < 2) {
-        throw new Error("CSV file must contain header and at least one row");
-      }
-
-      // Parse header
-      const header = lines[0].split(",").map((h) => h.trim().toLowerCase());
-      const requiredFields = ["amount", "payee", "reference", "timestamp"];
-      const missingFields = requiredFields.filter((field) => !header.includes(field));
-
-      if (missingFields.length > 0) {
-        throw new Error(
-          `CSV missing required columns: ${missingFields.join(", ")}. Required: amount, payee, reference, timestamp`
-        );
+      // The server parses, validates and stores the file, streaming progress as NDJSON
+      const body = new FormData();
+      body.append("file", file);
+      const response = await fetch(`${API_BASE}/transactions/import`, { method: "POST", body });
+
+      if (!response.ok || !response.body) {
+        const detail = await response.json().catch(() => null);
+        throw new Error(detail?.detail || `Import failed: ${response.statusText}`);
       }
 
-      // Parse rows
-      const transactions = [];
-
-      for (let i = 1; i < lines.length; i++) {
-        const values = lines[i].split(",").map((v) => v.trim());
-        const row: Record<string, string> = {};
-
-        header.forEach((field, index) => {
-          row[field] = values[index] || "";
-        });
-
-        try {
-          // Build transaction object
-          const transaction = {
-            amount: parseFloat(row.amount),
-            payee: row.payee,
-            reference: row.reference,
-            timestamp: new Date(row.timestamp).toISOString(),
-            payee_is_new: row.payee_is_new?.toLowerCase() === "true",
-          };
-
-          // Validate
-          if (!transaction.amount || transaction.amount <= 0) {
-            throw new Error("Invalid amount");
-          }
-          if (!transaction.payee) {
-            throw new Error("Payee required");
-          }
-          if (!transaction.reference) {
-            throw new Error("Reference required");
-          }
-          if (!transaction.timestamp || transaction.timestamp === "Invalid Date") {
-            throw new Error("Invalid timestamp");
-          }
-
-          transactions.push(transaction);
-        } catch (_rowError) {
-          console.error(`Row ${i + 1} failed:`, _rowError);
+      const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+      let buffered = "";
+      let last: ImportProgress | null = null;
+      for (;;) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffered += value;
+        const lines = buffered.split("\n");
+        buffered = lines.pop() ?? "";
+        for (const line of lines.filter((l) => l.trim())) {
+          last = JSON.parse(line) as ImportProgress;
+          setProgress(last);
         }
       }
 
-      // Upload transactions
-      if (transactions.length === 0) {
-        throw new Error("No valid transactions found in CSV");
+      if (!last || last.event === "error") {
+        throw new Error(last?.detail || "Import did not complete");
       }
-
-      let uploadedCount = 0;
-      let uploadFailedCount = 0;
-
-      for (const transaction of transactions) {
-        try {
-          const response = await fetch(`${API_BASE}/transactions`, {
-            method: "POST",
-            headers: {
-              "Content-Type": "application/json",
-            },
-            body: JSON.stringify(transaction),
-          });
-
-          if (response.ok) {
-            uploadedCount++;
-          } else {
-            uploadFailedCount++;
-          }
-        } catch {
-          uploadFailedCount++;
-        }
-      }
-
-      setResults({
-        success: uploadedCount,
-        failed: uploadFailedCount,
-      });
+      setResults(last);
 
       // Redirect after success
-      if (uploadedCount > 0) {
+      if (last.imported > 0 && last.failed === 0) {
         setTimeout(() => {
           router.push("/");
         }, 2000);
@@ -175,7 +123,7 @@ export default function UploadTransactionsPage() {
           <div>
             <h1 className="text-2xl font-bold">Import Transactions</h1>
             <p className="text-zinc-500 dark:text-zinc-400 mt-1">
-              Upload a CSV file to bulk import transactions
+              Upload a CSV or NDJSON file to bulk import transactions
             </p>
           </div>
 
@@ -207,7 +155,7 @@ export default function UploadTransactionsPage() {
               <input
                 id="csv-upload"
                 type="file"
-                accept=".csv"
+                accept=".csv,.ndjson,.jsonl"
                 onChange={handleFileInput}
                 disabled={isUploading}
                 className="hidden"
@@ -215,6 +163,14 @@ export default function UploadTransactionsPage() {
             </div>
           )}
 
+          {/* Progress */}
+          {isUploading && progress && (
+            <p className="text-sm text-zinc-600 dark:text-zinc-400">
+              Processed {progress.rows.toLocaleString()} rows: {progress.imported.toLocaleString()} imported,{" "}
+              {progress.failed.toLocaleString()} rejected
+            </p>
+          )}
+
           {/* Error Alert */}
           {error && (
             <div className="bg-red-50 dark:bg-red-900/20 border border-red-200 dark:border-red-800 rounded-lg p-4">
@@ -229,14 +185,24 @@ export default function UploadTransactionsPage() {
                 Import Complete
               </h3>
               <div className="space-y-1 text-sm text-green-800 dark:text-green-200">
-                <p>✅ Successfully imported: {results.success} transactions</p>
+                <p>✅ Successfully imported: {results.imported} transactions</p>
                 {results.failed > 0 && (
-                  <p>❌ Failed: {results.failed} transactions</p>
+                  <p>
+                    ❌ Failed: {results.failed} rows
+                    {results.errors_url && (
+                      <>
+                        {" "}
+                        (<a className="underline" href={`${API_BASE}${results.errors_url}`}>download errors</a>)
+                      </>
+                    )}
+                  </p>
                 )}
               </div>
-              <p className="text-xs text-green-700 dark:text-green-300 mt-3">
-                Redirecting to dashboard...
-              </p>
+              {results.failed === 0 && (
+                <p className="text-xs text-green-700 dark:text-green-300 mt-3">
+                  Redirecting to dashboard...
+                </p>
+              )}
             </div>
           )}
 
@@ -0,0 +1,41 @@
+"use client";
+
+import { useEffect, useState } from "react";
+import { API_BASE } from "@/lib/api";
+
+export type ExplanationStreamStatus = "connecting" | "streaming" | "done" | "error";
+
+export function useExplanationStream(id: string) {
+  const [riskFactors, setRiskFactors] = useState<string[] | null>(null);
+  const [narrative, setNarrative] = useState("");
+  const [status, setStatus] = useState<ExplanationStreamStatus>("connecting");
+
+  useEffect(() => {
+    if (!id) return;
+    setRiskFactors(null);
+    setNarrative("");
+    setStatus("connecting");
+
+    const source = new EventSource(`${API_BASE}/transactions/${id}/explanation/stream`);
+    source.addEventListener("factors", (event) => {
+      setRiskFactors(JSON.parse((event as MessageEvent).data).risk_factors);
+      setStatus("streaming");
+    });
+    source.addEventListener("narrative", (event) => {
+      const { text } = JSON.parse((event as MessageEvent).data);
+      setNarrative((current) => current + text);
+    });
+    source.addEventListener("done", () => {
+      setStatus("done");
+      source.close();
+    });
+    // Server-sent "error" events and connection failures both end the stream
+    source.addEventListener("error", () => {
+      setStatus((current) => (current === "done" ? current : "error"));
+      source.close();
+    });
+    return () => source.close();
+  }, [id]);
+
+  return { riskFactors, narrative, status };
+}
@@ -1,31 +1,72 @@
 "use client";
 
+import { useEffect } from "react";
 import useSWR from "swr";
-import { fetcher } from "@/lib/api";
-import { PaginatedResponse, Transaction } from "@/lib/types";
+import { API_BASE, fetcher } from "@/lib/api";
+import { PaginatedResponse, RiskLevel, TransactionStats } from "@/lib/types";
 
-export function useTransactions() {
+export interface TransactionFilters {
+  riskLevel?: RiskLevel | "all";
+  payeePrefix?: string;
+}
+
+function filterQuery(filters: TransactionFilters): string {
+  const params = new URLSearchParams();
+  if (filters.riskLevel && filters.riskLevel !== "all") {
+    params.set("risk_level", filters.riskLevel);
+  }
+  if (filters.payeePrefix) {
+    params.set("payee_prefix", filters.payeePrefix);
+  }
+  return params.toString();
+}
+
+export function useTransactions(filters: TransactionFilters = {}) {
+  const query = filterQuery(filters);
   const { data, error, isLoading, mutate } = useSWR<PaginatedResponse>(
-    "/transactions?page=1&page_size=100",
+    `/transactions?page=1&page_size=100&include_total=false${query ? `&${query}` : ""}`,
     fetcher,
     {
-      refreshInterval: 30000, // Refresh every 30 seconds
+      refreshInterval: 300000, // Safety net; live updates arrive over SSE
       revalidateOnFocus: true,
     }
   );
 
+  // Totals are computed server-side across all matching rows
+  const { data: statsData, mutate: mutateStats } = useSWR<TransactionStats>(
+    `/transactions/stats${query ? `?${query}` : ""}`,
+    fetcher,
+    {
+      refreshInterval: 300000,
+      revalidateOnFocus: true,
+    }
+  );
+
+  // Revalidate when the server pushes a new or updated transaction
+  useEffect(() => {
+    const source = new EventSource(`${API_BASE}/transactions/stream`);
+    const refresh = () => {
+      mutate();
+      mutateStats();
+    };
+    source.addEventListener("transaction.created", refresh);
+    source.addEventListener("transactions.created", refresh);
+    source.addEventListener("transaction.updated", refresh);
+    return () => source.close();
+  }, [mutate, mutateStats]);
+
   // Sort transactions by risk level (high first)
   const sortedTransactions = [...(data?.items ?? [])].sort((a, b) => {
     const riskOrder = { high: 0, medium: 1, low: 2 };
     return riskOrder[a.risk_level] - riskOrder[b.risk_level];
   });
 
-  // Calculate stats
   const stats = {
-    total: data?.total ?? 0,
-    high: data?.items?.filter((t) => t.risk_level === "high").length ?? 0,
-    medium: data?.items?.filter((t) => t.risk_level === "medium").length ?? 0,
-    low: data?.items?.filter((t) => t.risk_level === "low").length ?? 0,
+    total: statsData?.total ?? 0,
+    high: statsData?.by_risk_level.high?.count ?? 0,
+    medium: statsData?.by_risk_level.medium?.count ?? 0,
+    low: statsData?.by_risk_level.low?.count ?? 0,
+    atRisk: statsData?.by_risk_level.high?.total_amount ?? 0,
   };
 
   return {
@@ -34,6 +75,6 @@ export function useTransactions() {
     isLoading,
     isError: !!error,
     error,
-    mutate,
+    mutate: () => Promise.all([mutate(), mutateStats()]),
   };
 }
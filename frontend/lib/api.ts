@@ -1,6 +1,6 @@
 import { PaginatedResponse, TransactionDetail } from "./types";
 
-const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+export const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
 export async function getTransactions(
   page = 1,
@@ -18,10 +18,24 @@ export interface TransactionDetail extends Transaction {
 
 export interface PaginatedResponse {
   items: Transaction[];
-  total: number;
+  total: number | null;
   page: number;
   page_size: number;
-  total_pages: number;
+  total_pages: number | null;
+  next_cursor: string | null;
+}
+
+export interface StatsBucket {
+  count: number;
+  total_amount: number;
+}
+
+export interface TransactionStats {
+  total: number;
+  total_amount: number;
+  average_risk_score: number | null;
+  by_risk_level: Record<string, StatsBucket>;
+  by_status: Record<string, StatsBucket>;
 }
 
 export type RiskLevel = "high" | "medium" | "low";
@@ -2,21 +2,45 @@
 
 import pytest
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
 
+from app.database import Base, get_db
 from app.main import app
-from app.storage import transaction_store
+from app.services.audit_writer import audit_writer
+from app.services.profile_store import profile_store
+from app.services.velocity_tracker import velocity_tracker
 
 
-@pytest.fixture(autouse=True)
-def clear_storage():
-    """Clear transaction store before each test."""
-    transaction_store.clear()
-    yield
-    transaction_store.clear()
+@pytest.fixture
+async def db_session_factory():
+    """Fresh in-memory aiosqlite database per test, standing in for Postgres."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = async_sessionmaker(
+        engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    profile_store.clear()
+    velocity_tracker.clear()
+    audit_writer.clear()
+    yield session_factory
+    app.dependency_overrides.pop(get_db, None)
+    profile_store.clear()
+    velocity_tracker.clear()
+    audit_writer.clear()
+    await engine.dispose()
 
 
 @pytest.fixture
-async def client():
+async def client(db_session_factory):
     """Async test client for FastAPI using httpx."""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
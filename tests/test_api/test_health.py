@@ -28,3 +28,19 @@ class TestHealthEndpoint:
         data = response.json()
         assert data["service"] == "FraudShield API"
         assert data["version"] == "1.0.0"
+
+    @pytest.mark.asyncio
+    async def test_health_check_components(self, client):
+        """Health endpoint should report each registered service."""
+        response = await client.get("/health")
+        data = response.json()
+        assert data["components"] == {
+            "detector": "ok", "generator": "ok", "patterns": "ok", "llm": "ok",
+        }
+        assert data["patterns"]["patterns"] > 0
+
+    @pytest.mark.asyncio
+    async def test_reload_requires_authentication(self, client):
+        """Reloading services should be refused without a token."""
+        response = await client.post("/admin/services/reload")
+        assert response.status_code in (401, 403)
@@ -0,0 +1,65 @@
+"""Tests for background import job endpoints."""
+
+import uuid
+
+import pytest
+
+from app.services.import_jobs import import_jobs
+
+
+class TestImportJobs:
+    """Test cases for POST /jobs/import and GET /jobs/{id}."""
+
+    CSV = (
+        "amount,payee,reference,timestamp\n"
+        "2000,ABC Holdings Ltd,Invoice 2847,2026-01-05T15:30:00Z\n"
+        "-5,Bad Amount Ltd,Invoice 1,2026-01-05T15:30:00Z\n"
+        "80,Corner Shop,Receipt 9,2026-01-07T11:00:00Z\n"
+    )
+
+    @pytest.fixture(autouse=True)
+    def job_dirs(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.services.import_jobs.IMPORT_JOB_DIR", tmp_path / "jobs")
+        monkeypatch.setattr("app.services.transaction_import.IMPORT_ERROR_DIR", tmp_path / "errors")
+
+    @pytest.mark.asyncio
+    async def test_submit_and_poll(self, client, db_session_factory):
+        """A queued job should report its totals once a worker has run it."""
+        response = await client.post(
+            "/jobs/import", files={"file": ("payments.csv", self.CSV, "text/csv")}
+        )
+
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+        assert job["total_bytes"] == len(self.CSV)
+        assert (job["rows_done"], job["progress"], job["eta_seconds"]) == (0, 0.0, None)
+
+        await import_jobs.run_next(db_session_factory)
+        status = (await client.get(f"/jobs/{job['id']}")).json()
+
+        assert status["status"] == "completed"
+        assert (status["rows_done"], status["rows_imported"], status["rows_failed"]) == (3, 2, 1)
+        assert status["progress"] == 1.0
+        assert status["eta_seconds"] == 0.0
+        assert status["started_at"] is not None and status["finished_at"] is not None
+        errors = await client.get(status["errors_url"])
+        assert errors.status_code == 200
+        assert '"line": 3' in errors.text
+        assert (await client.get("/transactions")).json()["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_header_rejected(self, client, tmp_path):
+        response = await client.post(
+            "/jobs/import", files={"file": ("payments.csv", "amount,payee\n1,A\n", "text/csv")}
+        )
+
+        assert response.status_code == 400
+        assert "reference" in response.json()["detail"]
+        assert not any((tmp_path / "jobs").iterdir())
+
+    @pytest.mark.asyncio
+    async def test_unknown_job(self, client):
+        response = await client.get(f"/jobs/{uuid.uuid4()}")
+
+        assert response.status_code == 404
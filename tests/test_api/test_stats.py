@@ -0,0 +1,106 @@
+"""Tests for transaction filters and the /transactions/stats endpoint."""
+
+import pytest
+
+
+@pytest.fixture
+async def seeded(client, low_risk_transaction_data, medium_risk_transaction_data, high_risk_transaction_data):
+    """Create one low, one medium and two high risk transactions."""
+    payload = {
+        "transactions": [
+            low_risk_transaction_data,
+            medium_risk_transaction_data,
+            high_risk_transaction_data,
+            {**high_risk_transaction_data, "payee": "Suspicious Holdings", "amount": 8000.00},
+        ]
+    }
+    response = await client.post("/transactions/batch", json=payload)
+    return response.json()["items"]
+
+
+class TestTransactionFilters:
+    """Test cases for GET /transactions query filters."""
+
+    @pytest.mark.asyncio
+    async def test_filter_by_risk_level(self, client, seeded):
+        """Should return only transactions with the requested risk level."""
+        response = await client.get("/transactions?risk_level=high")
+        data = response.json()
+        assert data["total"] == 2
+        assert {item["risk_level"] for item in data["items"]} == {"high"}
+
+    @pytest.mark.asyncio
+    async def test_filter_by_payee_prefix(self, client, seeded):
+        """Should match payees starting with the given prefix."""
+        response = await client.get("/transactions?payee_prefix=Suspicious")
+        assert response.json()["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_payee_prefix_escapes_wildcards(self, client, seeded):
+        """LIKE wildcards in the prefix should be matched literally."""
+        response = await client.get("/transactions?payee_prefix=%25")
+        assert response.json()["total"] == 0
+
+    @pytest.mark.asyncio
+    async def test_filter_by_amount_range(self, client, seeded):
+        """Should apply inclusive min and max amount bounds."""
+        response = await client.get("/transactions?min_amount=300&max_amount=5000")
+        assert response.json()["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_filter_by_time_range(self, client, seeded):
+        """Should apply a half-open transaction timestamp range."""
+        response = await client.get(
+            "/transactions",
+            params={"start_time": "2026-01-10T09:00:00Z", "end_time": "2026-01-10T23:00:00Z"},
+        )
+        assert response.json()["total"] == 2
+
+    @pytest.mark.asyncio
+    async def test_filter_by_status(self, client, seeded):
+        """Should filter by review status."""
+        await client.post(f"/transactions/{seeded[0]['id']}/approve")
+        response = await client.get("/transactions?status=approved")
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["id"] == seeded[0]["id"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_risk_level(self, client):
+        """Should reject unknown risk levels."""
+        response = await client.get("/transactions?risk_level=extreme")
+        assert response.status_code == 422
+
+
+class TestTransactionStats:
+    """Test cases for GET /transactions/stats."""
+
+    @pytest.mark.asyncio
+    async def test_stats_empty(self, client):
+        """Should return zeroed buckets when there are no transactions."""
+        response = await client.get("/transactions/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 0
+        assert data["average_risk_score"] is None
+        assert data["by_risk_level"]["high"] == {"count": 0, "total_amount": 0.0}
+
+    @pytest.mark.asyncio
+    async def test_stats_counts_and_sums(self, client, seeded):
+        """Should aggregate counts and amounts per risk level and status."""
+        response = await client.get("/transactions/stats")
+        data = response.json()
+        assert data["total"] == 4
+        assert data["total_amount"] == 13500.0
+        assert data["by_risk_level"]["high"] == {"count": 2, "total_amount": 13000.0}
+        assert data["by_risk_level"]["medium"]["count"] == 1
+        assert data["by_risk_level"]["low"]["count"] == 1
+        assert data["by_status"]["pending"]["count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_stats_respects_filters(self, client, seeded):
+        """Should apply the same filters as the list endpoint."""
+        response = await client.get("/transactions/stats?payee_prefix=Suspicious")
+        data = response.json()
+        assert data["total"] == 2
+        assert data["by_risk_level"]["low"]["count"] == 0
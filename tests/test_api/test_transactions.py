@@ -1,6 +1,41 @@
 """Tests for transaction endpoints."""
 
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
 import pytest
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.db_models import AuditLog, Transaction, TransactionStatsDaily
+from app.main import app
+from app.services.audit_writer import audit_writer
+from app.services.database_service import StaleWriteError, db_service
+from app.services.explanation_generator import MockExplanationGenerator
+from app.services.explanation_queue import explanation_queue
+from app.services.registry import registry
+
+
+class SlowGenerator(MockExplanationGenerator):
+    """Generator with LLM-like latency, counting calls."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def generate_explanation(self, transaction, risk_score, factors):
+        self.calls += 1
+        time.sleep(0.05)
+        return super().generate_explanation(transaction, risk_score, factors)
+
+
+async def _drop_transactions_table(session_factory):
+    """Make every transaction insert fail."""
+    async with session_factory() as db:
+        await db.run_sync(lambda session: Transaction.__table__.drop(session.connection()))
+        await db.commit()
 
 
 class TestListTransactions:
@@ -38,6 +73,51 @@ class TestListTransactions:
         assert data["total"] == 5
         assert data["total_pages"] == 3
 
+    @pytest.mark.asyncio
+    async def test_list_transactions_cursor_walks_all_pages(self, client, valid_transaction_data):
+        """Following next_cursor should visit every transaction exactly once."""
+        payload = {"transactions": [valid_transaction_data] * 5}
+        await client.post("/transactions/batch", json=payload)
+        await client.post("/transactions", json=valid_transaction_data)
+
+        seen = []
+        response = await client.get("/transactions?page_size=2")
+        data = response.json()
+        seen.extend(item["id"] for item in data["items"])
+        while data["next_cursor"]:
+            response = await client.get(
+                "/transactions", params={"page_size": 2, "cursor": data["next_cursor"]}
+            )
+            assert response.status_code == 200
+            data = response.json()
+            seen.extend(item["id"] for item in data["items"])
+
+        assert len(seen) == 6
+        assert len(set(seen)) == 6
+
+    @pytest.mark.asyncio
+    async def test_list_transactions_last_page_has_no_cursor(self, client, valid_transaction_data):
+        """The final page should not return a next_cursor."""
+        await client.post("/transactions", json=valid_transaction_data)
+        response = await client.get("/transactions?page_size=5")
+        assert response.json()["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_list_transactions_without_total(self, client, valid_transaction_data):
+        """include_total=false should skip the count."""
+        await client.post("/transactions", json=valid_transaction_data)
+        response = await client.get("/transactions?include_total=false")
+        data = response.json()
+        assert data["total"] is None
+        assert data["total_pages"] is None
+        assert len(data["items"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_list_transactions_invalid_cursor(self, client):
+        """Should return 400 for a malformed cursor."""
+        response = await client.get("/transactions?cursor=not-a-cursor")
+        assert response.status_code == 400
+
     @pytest.mark.asyncio
     async def test_list_transactions_page_bounds(self, client):
         """Should validate page parameter bounds."""
@@ -45,9 +125,51 @@ class TestListTransactions:
         assert response.status_code == 422
 
 
+@pytest.fixture
+def commits():
+    """Count ORM session commits made while the test runs."""
+    counted = []
+
+    def on_commit(session):
+        counted.append(session)
+
+    event.listen(Session, "after_commit", on_commit)
+    yield counted
+    event.remove(Session, "after_commit", on_commit)
+
+
 class TestCreateTransaction:
     """Test cases for POST /transactions endpoint."""
 
+    @pytest.mark.asyncio
+    async def test_create_single_commit_with_audit(
+        self, client, db_session_factory, commits, low_risk_transaction_data
+    ):
+        """The transaction should be written in one commit, its audit entry behind it."""
+        response = await client.post("/transactions", json=low_risk_transaction_data)
+        assert response.status_code == 201
+        assert len(commits) == 1
+        assert audit_writer.pending_count == 1
+
+        async with db_session_factory() as db:
+            assert await audit_writer.flush(db) == 1
+            audit = (await db.execute(select(AuditLog))).scalars().all()
+        assert [(str(a.transaction_id), a.action) for a in audit] == [
+            (response.json()["id"], "created")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_create_failed_commit_returns_503(
+        self, client, db_session_factory, valid_transaction_data
+    ):
+        """A transaction that was not stored should not be reported as created."""
+        await _drop_transactions_table(db_session_factory)
+
+        response = await client.post("/transactions", json=valid_transaction_data)
+
+        assert response.status_code == 503
+        assert audit_writer.pending_count == 0
+
     @pytest.mark.asyncio
     async def test_create_valid_transaction(self, client, valid_transaction_data):
         """Should create transaction and return 201."""
@@ -103,6 +225,19 @@ class TestGetTransaction:
         assert "risk_factors" in data
         assert "recommended_action" in data
 
+    @pytest.mark.asyncio
+    async def test_amount_spike_shows_payee_average(self, client, valid_transaction_data):
+        """The AMOUNT_SPIKE line should quote the payee's average, not the global one."""
+        for _ in range(5):
+            await client.post("/transactions", json={**valid_transaction_data, "amount": 100.0})
+        spike = await client.post("/transactions", json={**valid_transaction_data, "amount": 1000.0})
+
+        response = await client.get(f"/transactions/{spike.json()['id']}")
+
+        assert "Amount (£1000) is 10.0x your average (£100)" in "\n".join(
+            response.json()["risk_factors"]
+        )
+
     @pytest.mark.asyncio
     async def test_get_transaction_not_found(self, client):
         """Should return 404 for non-existent transaction ID."""
@@ -120,3 +255,451 @@ class TestGetTransaction:
         assert len(data["risk_factors"]) > 0
         assert data["confidence"] >= 50
         assert data["recommended_action"] != ""
+
+    @pytest.mark.asyncio
+    async def test_get_transaction_does_not_write(
+        self, client, db_session_factory, low_risk_transaction_data
+    ):
+        """Reading a transaction without a stored explanation should not store one."""
+        create_response = await client.post("/transactions", json=low_risk_transaction_data)
+        transaction_id = create_response.json()["id"]
+        response = await client.get(f"/transactions/{transaction_id}")
+        assert response.json()["explanation"]
+
+        async with db_session_factory() as db:
+            transaction = await db_service.get_transaction(db, transaction_id)
+        assert transaction.explanation is None
+
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_share_one_generation(self, client, high_risk_transaction_data):
+        """Simultaneous reads of one transaction should generate its explanation once."""
+        create_response = await client.post("/transactions", json=high_risk_transaction_data)
+        transaction_id = create_response.json()["id"]
+        generator = SlowGenerator()
+        app.dependency_overrides[registry.get_generator] = lambda: generator
+        try:
+            responses = await asyncio.gather(
+                *(client.get(f"/transactions/{transaction_id}") for _ in range(4))
+            )
+        finally:
+            app.dependency_overrides.pop(registry.get_generator, None)
+
+        assert generator.calls == 1
+        assert len({response.json()["explanation"] for response in responses}) == 1
+
+
+def _parse_sse(body):
+    """Split a Server-Sent Events body into (event, data) pairs."""
+    events = []
+    for message in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestReviewTransaction:
+    """Test cases for the approve and reject endpoints."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("action,status", [("approve", "approved"), ("reject", "rejected")])
+    async def test_review_single_commit_with_audit(
+        self, client, db_session_factory, commits, valid_transaction_data, action, status
+    ):
+        """The status change should be one commit, with its audit entry queued."""
+        created = await client.post("/transactions", json=valid_transaction_data)
+        transaction_id = created.json()["id"]
+        commits.clear()
+
+        response = await client.post(f"/transactions/{transaction_id}/{action}")
+
+        assert response.status_code == 200
+        assert len(commits) == 1
+        async with db_session_factory() as db:
+            await audit_writer.flush(db)
+            actions = (await db.execute(
+                select(AuditLog.action).order_by(AuditLog.created_at)
+            )).scalars().all()
+        assert actions == ["created", status]
+
+    @pytest.mark.asyncio
+    async def test_approve_conflict_returns_409(
+        self, client, valid_transaction_data, monkeypatch
+    ):
+        """An update that kept losing races should be reported as a conflict."""
+        transaction_id = (await client.post("/transactions", json=valid_transaction_data)).json()["id"]
+
+        async def always_stale(*args, **kwargs):
+            raise StaleWriteError("changed during every update attempt")
+
+        monkeypatch.setattr(db_service, "update_transaction", always_stale)
+        response = await client.post(f"/transactions/{transaction_id}/approve")
+
+        assert response.status_code == 409
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("action", ["approve", "reject"])
+    async def test_failed_update_returns_503(
+        self, client, db_session_factory, valid_transaction_data, action
+    ):
+        """A status change that was rolled back should not be reported as done."""
+        transaction_id = (await client.post("/transactions", json=valid_transaction_data)).json()["id"]
+        async with db_session_factory() as db:
+            await db.run_sync(
+                lambda session: TransactionStatsDaily.__table__.drop(session.connection())
+            )
+            await db.commit()
+        queued = audit_writer.pending_count
+
+        response = await client.post(f"/transactions/{transaction_id}/{action}")
+
+        assert response.status_code == 503
+        assert audit_writer.pending_count == queued
+        detail = await client.get(f"/transactions/{transaction_id}")
+        assert detail.json()["status"] == "pending"
+
+
+class TestAuditTrail:
+    """Test cases for the audit trail endpoints."""
+
+    @staticmethod
+    async def _reviewed(client, db_session_factory, data, actions):
+        """Create a transaction, apply review actions and flush its audit entries."""
+        transaction_id = (await client.post("/transactions", json=data)).json()["id"]
+        for action in actions:
+            await client.post(f"/transactions/{transaction_id}/{action}")
+        async with db_session_factory() as db:
+            await audit_writer.flush(db)
+        return transaction_id
+
+    @pytest.mark.asyncio
+    async def test_trail_from_audit_log(self, client, db_session_factory, valid_transaction_data):
+        """The trail should list stored entries oldest first."""
+        transaction_id = await self._reviewed(
+            client, db_session_factory, valid_transaction_data, ["approve", "reject"]
+        )
+
+        response = await client.get(f"/transactions/{transaction_id}/audit")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [entry["action"] for entry in data["audit_trail"]] == ["created", "approved", "rejected"]
+        assert data["audit_trail"][0]["details"]["payee"] == valid_transaction_data["payee"]
+        assert data["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_trail_cursor_pagination(self, client, db_session_factory, valid_transaction_data):
+        transaction_id = await self._reviewed(
+            client, db_session_factory, valid_transaction_data, ["approve", "reject"]
+        )
+
+        first = (await client.get(f"/transactions/{transaction_id}/audit?limit=2")).json()
+        second = (await client.get(
+            f"/transactions/{transaction_id}/audit", params={"limit": 2, "cursor": first["next_cursor"]}
+        )).json()
+
+        assert [entry["action"] for entry in first["audit_trail"]] == ["created", "approved"]
+        assert [entry["action"] for entry in second["audit_trail"]] == ["rejected"]
+        assert second["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_trail_not_found(self, client):
+        response = await client.get("/transactions/00000000-0000-0000-0000-000000000000/audit")
+        assert response.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_trail_invalid_cursor(self, client, valid_transaction_data):
+        transaction_id = (await client.post("/transactions", json=valid_transaction_data)).json()["id"]
+        response = await client.get(f"/transactions/{transaction_id}/audit?cursor=not-a-cursor")
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_bulk_trails_in_request_order(
+        self, client, db_session_factory, valid_transaction_data, low_risk_transaction_data
+    ):
+        """Bulk trails should come back in request order, empty for unknown IDs."""
+        approved = await self._reviewed(client, db_session_factory, valid_transaction_data, ["approve"])
+        created = await self._reviewed(client, db_session_factory, low_risk_transaction_data, [])
+        unknown = "00000000-0000-0000-0000-000000000000"
+
+        response = await client.post(
+            "/transactions/audit/bulk", json={"transaction_ids": [created, unknown, approved]}
+        )
+
+        assert response.status_code == 200
+        trails = response.json()["trails"]
+        assert [trail["transaction_id"] for trail in trails] == [created, unknown, approved]
+        assert [[entry["action"] for entry in trail["audit_trail"]] for trail in trails] == [
+            ["created"], [], ["created", "approved"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bulk_rejects_too_many_ids(self, client):
+        ids = [f"00000000-0000-0000-0000-{i:012d}" for i in range(501)]
+        response = await client.post("/transactions/audit/bulk", json={"transaction_ids": ids})
+        assert response.status_code == 422
+
+
+class TestExplanationStream:
+    """Test cases for GET /transactions/{id}/explanation/stream."""
+
+    @pytest.mark.asyncio
+    async def test_factors_first_then_streamed_narrative(self, client, high_risk_transaction_data):
+        """Factor data should come first, then the narrative in pieces, then done."""
+        transaction_id = (await client.post("/transactions", json=high_risk_transaction_data)).json()["id"]
+        response = await client.get(f"/transactions/{transaction_id}/explanation/stream")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = _parse_sse(response.text)
+        names = [name for name, _ in events]
+        assert names[0] == "factors"
+        assert names[-1] == "done"
+        assert names.count("narrative") > 1
+
+        detail = (await client.get(f"/transactions/{transaction_id}")).json()
+        assert events[0][1]["risk_factors"] == detail["risk_factors"]
+        narrative = "".join(data["text"] for name, data in events if name == "narrative")
+        assert narrative.startswith("This transaction triggered")
+        assert events[-1][1]["confidence"] > 0
+
+    @pytest.mark.asyncio
+    async def test_stored_explanation_sent_at_once(
+        self, client, db_session_factory, high_risk_transaction_data
+    ):
+        """A precomputed explanation should be sent as one narrative event."""
+        transaction_id = (await client.post("/transactions", json=high_risk_transaction_data)).json()["id"]
+        async with db_session_factory() as db:
+            await db_service.save_explanation(db, transaction_id, {
+                "explanation": "Stored narrative.", "confidence": 90,
+                "risk_factors": ["1. New Payee - stored"], "recommended_action": "Call the payee.",
+            })
+
+        response = await client.get(f"/transactions/{transaction_id}/explanation/stream")
+        events = _parse_sse(response.text)
+
+        assert [name for name, _ in events] == ["factors", "narrative", "done"]
+        assert events[0][1]["risk_factors"] == ["1. New Payee - stored"]
+        assert events[1][1] == {"text": "Stored narrative."}
+        assert events[2][1] == {"confidence": 90, "recommended_action": "Call the payee."}
+
+    @pytest.mark.asyncio
+    async def test_stream_not_found(self, client):
+        """Unknown transactions should return 404 before streaming."""
+        response = await client.get("/transactions/nonexistent-id/explanation/stream")
+        assert response.status_code == 404
+
+
+class TestExplanationPrecompute:
+    """Test cases for background explanation precomputation."""
+
+    @pytest.fixture
+    async def queue_gate(self, db_session_factory):
+        # The in-memory test database shares one connection between sessions,
+        # so workers only write once the test opens the gate
+        gate = asyncio.Event()
+
+        @asynccontextmanager
+        async def gated_session():
+            await gate.wait()
+            async with db_session_factory() as db:
+                yield db
+
+        await explanation_queue.start(gated_session)
+        yield gate
+        gate.set()
+        await explanation_queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_high_and_medium_risk_explanations_are_stored(
+        self, client, db_session_factory, queue_gate,
+        high_risk_transaction_data, medium_risk_transaction_data, low_risk_transaction_data,
+    ):
+        """Only high and medium-risk transactions should be precomputed."""
+        ids = {}
+        ids["high"] = (await client.post("/transactions", json=high_risk_transaction_data)).json()["id"]
+        batch_response = await client.post(
+            "/transactions/batch",
+            json={"transactions": [medium_risk_transaction_data, low_risk_transaction_data]},
+        )
+        ids["medium"], ids["low"] = [item["id"] for item in batch_response.json()["items"]]
+        queue_gate.set()
+        await explanation_queue.join()
+
+        async with db_session_factory() as db:
+            stored = {
+                level: (await db_service.get_transaction(db, transaction_id)).explanation
+                for level, transaction_id in ids.items()
+            }
+        assert stored["high"] and stored["medium"]
+        assert stored["low"] is None
+
+        detail = (await client.get(f"/transactions/{ids['high']}")).json()
+        assert detail["explanation"] == stored["high"]
+
+
+class TestCreateTransactionBatch:
+    """Test cases for POST /transactions/batch endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_batch_returns_per_row_results(
+        self, client, low_risk_transaction_data, high_risk_transaction_data
+    ):
+        """Should score every row and return results in request order."""
+        payload = {"transactions": [low_risk_transaction_data, high_risk_transaction_data]}
+        response = await client.post("/transactions/batch", json=payload)
+        assert response.status_code == 201
+        data = response.json()
+        assert data["total"] == 2
+        assert [item["risk_level"] for item in data["items"]] == ["low", "high"]
+        assert data["items"][0]["id"] != data["items"][1]["id"]
+
+    @pytest.mark.asyncio
+    async def test_batch_failed_commit_returns_503(
+        self, client, db_session_factory, valid_transaction_data
+    ):
+        await _drop_transactions_table(db_session_factory)
+
+        response = await client.post(
+            "/transactions/batch", json={"transactions": [valid_transaction_data] * 2}
+        )
+
+        assert response.status_code == 503
+        assert audit_writer.pending_count == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_rows_are_listed(self, client, valid_transaction_data):
+        """Batch-created transactions should appear in the list endpoint."""
+        payload = {"transactions": [valid_transaction_data] * 3}
+        await client.post("/transactions/batch", json=payload)
+        response = await client.get("/transactions")
+        assert response.json()["total"] == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_rejects_empty_list(self, client):
+        """Should reject a batch with no transactions."""
+        response = await client.post("/transactions/batch", json={"transactions": []})
+        assert response.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_batch_rejects_invalid_row(self, client, valid_transaction_data):
+        """Should reject the batch and report the index of an invalid row."""
+        payload = {"transactions": [valid_transaction_data, {**valid_transaction_data, "amount": -1}]}
+        response = await client.post("/transactions/batch", json=payload)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][:3] == ["body", "transactions", 1]
+
+
+def _ndjson(body):
+    return [json.loads(line) for line in body.splitlines()]
+
+
+class TestImportTransactions:
+    """Test cases for POST /transactions/import."""
+
+    CSV = (
+        "amount,payee,reference,timestamp,payee_is_new\n"
+        "2000,ABC Holdings Ltd,Invoice 2847,2026-01-05T15:30:00Z,true\n"
+        "-5,Bad Amount Ltd,Invoice 1,2026-01-05T15:30:00Z,false\n"
+        '350,"Smith, Jones & Co","Rent\nJanuary",2026-01-06T10:00:00Z,\n'
+        "120,Too Few Columns\n"
+        "80,Corner Shop,Receipt 9,2026-01-07T11:00:00Z,false\n"
+    )
+
+    @pytest.fixture(autouse=True)
+    def error_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.services.transaction_import.IMPORT_ERROR_DIR", tmp_path)
+        return tmp_path
+
+    @pytest.mark.asyncio
+    async def test_import_csv(self, client, monkeypatch):
+        """Valid rows should be stored in chunks, with progress after each."""
+        monkeypatch.setattr("app.services.transaction_import.IMPORT_CHUNK_SIZE", 2)
+        response = await client.post(
+            "/transactions/import", files={"file": ("payments.csv", self.CSV, "text/csv")}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        events = _ndjson(response.text)
+        assert [event["event"] for event in events] == ["progress", "progress", "done"]
+        done = events[-1]
+        assert (done["rows"], done["imported"], done["failed"]) == (5, 3, 2)
+
+        listed = (await client.get("/transactions")).json()
+        assert sorted(item["payee"] for item in listed["items"]) == [
+            "ABC Holdings Ltd", "Corner Shop", "Smith, Jones & Co"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_error_file(self, client):
+        """Rejected rows should be downloadable with their line numbers and reasons."""
+        response = await client.post(
+            "/transactions/import", files={"file": ("payments.csv", self.CSV, "text/csv")}
+        )
+        done = _ndjson(response.text)[-1]
+
+        errors = await client.get(done["errors_url"])
+
+        assert errors.status_code == 200
+        rows = _ndjson(errors.text)
+        assert [row["line"] for row in rows] == [3, 6]
+        assert rows[0]["error"].startswith("amount:")
+        assert rows[1]["error"] == "Expected 5 columns, got 2"
+
+    @pytest.mark.asyncio
+    async def test_import_ndjson(self, client):
+        body = "\n".join([
+            json.dumps({"amount": 500, "payee": "Vendor A", "reference": "PO 1",
+                        "timestamp": "2026-01-10T14:30:00Z"}),
+            "not json",
+            json.dumps({"amount": 700, "payee": "Vendor B", "reference": "PO 2",
+                        "timestamp": "2026-01-10T03:30:00Z", "payee_is_new": True}),
+        ])
+        response = await client.post(
+            "/transactions/import", files={"file": ("payments.ndjson", body, "application/x-ndjson")}
+        )
+
+        done = _ndjson(response.text)[-1]
+        assert (done["imported"], done["failed"]) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_missing_columns(self, client):
+        response = await client.post(
+            "/transactions/import",
+            files={"file": ("payments.csv", "amount,payee\n10,A\n", "text/csv")},
+        )
+        assert response.status_code == 400
+        assert "reference" in response.json()["detail"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_error_file(self, client):
+        response = await client.get("/transactions/import/not-an-id/errors")
+        assert response.status_code == 404
+
+
+class TestTransactionEvents:
+    """Test cases for events published to the live transaction feed."""
+
+    @pytest.mark.asyncio
+    async def test_create_publishes_event(self, client, valid_transaction_data):
+        """Creating a transaction should publish transaction.created."""
+        from app.services.event_broker import event_broker
+
+        async with event_broker.subscribe() as subscription:
+            response = await client.post("/transactions", json=valid_transaction_data)
+            event = await subscription.get()
+        assert event["type"] == "transaction.created"
+        assert event["data"]["id"] == response.json()["id"]
+
+    @pytest.mark.asyncio
+    async def test_approve_publishes_status_change(self, client, valid_transaction_data):
+        """Approving a transaction should publish transaction.updated."""
+        from app.services.event_broker import event_broker
+
+        transaction_id = (await client.post("/transactions", json=valid_transaction_data)).json()["id"]
+        async with event_broker.subscribe() as subscription:
+            await client.post(f"/transactions/{transaction_id}/approve")
+            event = await subscription.get()
+        assert event["type"] == "transaction.updated"
+        assert event["data"]["status"] == "approved"
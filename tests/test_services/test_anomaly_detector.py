@@ -1,9 +1,18 @@
 """Unit tests for the anomaly detector service."""
 
+import itertools
+
+import numpy as np
 import pytest
 from datetime import datetime, timezone
 
-from app.services.anomaly_detector import MockAnomalyDetector, get_anomaly_detector
+from app.services.anomaly_detector import (
+    FACTOR_BITS,
+    MockAnomalyDetector,
+    decode_factor_mask,
+    get_anomaly_detector,
+    transactions_to_columns,
+)
 from app.config import SCORING_WEIGHTS
 
 
@@ -170,6 +179,65 @@ class TestMockAnomalyDetector:
         assert "UNUSUAL_TIMING" in factors
 
 
+class TestBatchScoring:
+    """Test cases for MockAnomalyDetector.calculate_risk_scores_batch."""
+
+    @pytest.fixture
+    def detector(self):
+        """Create a fresh detector instance."""
+        return MockAnomalyDetector()
+
+    @pytest.fixture
+    def transactions(self):
+        """Every combination of factor triggers, including edge values."""
+        rows = []
+        combos = itertools.product(
+            [100, 1560, 1560.01, 5000],
+            [0, 8, 9, 17, 18, 23],
+            [True, False],
+            ["Invoice", "urgent transfer", "Not URGENT really", ""],
+        )
+        for amount, hour, payee_is_new, reference in combos:
+            rows.append({
+                "amount": amount,
+                "payee": "Vendor",
+                "timestamp": datetime(2026, 1, 10, hour, 30, tzinfo=timezone.utc),
+                "reference": reference,
+                "payee_is_new": payee_is_new,
+            })
+        return rows
+
+    def test_matches_scalar_path_exactly(self, detector, transactions):
+        """Batch scores and factors should be bit-identical to the scalar path."""
+        scores, masks = detector.calculate_risk_scores_batch(*transactions_to_columns(transactions))
+        for transaction, score, mask in zip(transactions, scores.tolist(), masks.tolist()):
+            expected_score, expected_factors = detector.calculate_risk_score(transaction)
+            assert score == expected_score
+            assert decode_factor_mask(mask) == expected_factors
+
+    def test_mask_bits_per_factor(self, detector):
+        """Each factor should set its own bit."""
+        scores, masks = detector.calculate_risk_scores_batch(
+            amounts=np.array([5000.0, 100.0]),
+            hours=np.array([3, 10]),
+            payee_is_new=np.array([True, False]),
+            references=np.array(["URGENT", "Invoice"]),
+        )
+        # VELOCITY needs a velocity tracker, which this detector does not have
+        stateless = [factor for factor in SCORING_WEIGHTS if factor != "VELOCITY"]
+        assert masks[0] == sum(FACTOR_BITS[factor] for factor in stateless)
+        assert decode_factor_mask(masks[0]) == stateless
+        assert masks[1] == 0
+        assert scores[0] == min(sum(SCORING_WEIGHTS[factor] for factor in stateless), 1.0)
+        assert scores[1] == 0.0
+
+    def test_empty_batch(self, detector):
+        """Empty input should return empty arrays."""
+        scores, masks = detector.calculate_risk_scores_batch(*transactions_to_columns([]))
+        assert scores.shape == (0,)
+        assert masks.shape == (0,)
+
+
 class TestGetAnomalyDetector:
     """Test factory function."""
 
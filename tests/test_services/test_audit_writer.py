@@ -0,0 +1,248 @@
+"""Unit tests for the write-behind audit writer."""
+
+import asyncio
+import fcntl
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.db_models import AuditLog
+from app.services.audit_writer import AuditWriter, _to_json
+
+
+async def _count(session_factory):
+    async with session_factory() as db:
+        return await db.scalar(select(func.count()).select_from(AuditLog))
+
+
+class TestAuditWriter:
+    """Test cases for AuditWriter."""
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_one_statement(self, db_session_factory):
+        """Pending entries should go out as a single multi-row INSERT."""
+        writer = AuditWriter()
+        for action in ("created", "approved", "viewed"):
+            writer.record(uuid.uuid4(), action, {"by": "test"})
+
+        statements = []
+        async with db_session_factory() as db:
+            engine = db.get_bind()
+            listener = lambda *args: statements.append(args[2])
+            event.listen(engine, "before_cursor_execute", listener)
+            try:
+                written = await writer.flush(db)
+            finally:
+                event.remove(engine, "before_cursor_execute", listener)
+
+        assert written == 3
+        assert writer.pending_count == 0
+        assert len([s for s in statements if s.startswith("INSERT")]) == 1
+        assert await _count(db_session_factory) == 3
+
+    @pytest.mark.asyncio
+    async def test_mixed_rows_share_a_batch(self, db_session_factory):
+        """Rows queued with and without optional columns should flush together."""
+        writer = AuditWriter()
+        writer.record(uuid.uuid4(), "approved", ip_address="10.0.0.1")
+        writer.record_rows([{
+            "id": uuid.uuid4(),
+            "transaction_id": uuid.uuid4(),
+            "action": "created",
+            "created_at": datetime.utcnow(),
+        }])
+
+        async with db_session_factory() as db:
+            assert await writer.flush(db) == 2
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_early(self, db_session_factory):
+        """Reaching batch_size should flush without waiting for the interval."""
+        writer = AuditWriter(batch_size=5, flush_interval=60)
+        await writer.start(db_session_factory)
+        try:
+            for _ in range(5):
+                writer.record(uuid.uuid4(), "created")
+            for _ in range(50):
+                if writer.pending_count == 0:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert await _count(db_session_factory) == 5
+        finally:
+            await writer.stop(db_session_factory)
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_remaining(self, db_session_factory):
+        writer = AuditWriter(flush_interval=60)
+        await writer.start(db_session_factory)
+        writer.record(uuid.uuid4(), "rejected")
+
+        await writer.stop(db_session_factory)
+
+        assert await _count(db_session_factory) == 1
+        assert writer.stats()["batches"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_entries(self, db_session_factory):
+        """Entries should stay queued when the insert fails."""
+        writer = AuditWriter()
+        writer.record(uuid.uuid4(), "created")
+
+        async with db_session_factory() as db:
+            await db.run_sync(lambda session: AuditLog.__table__.drop(session.connection()))
+            await db.commit()
+            assert await writer.flush(db) == 0
+
+        assert writer.pending_count == 1
+        assert writer.stats()["failed_flushes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_backlog_is_capped(self, db_session_factory):
+        """Past max_pending the oldest entries should be dropped, also after failed flushes."""
+        writer = AuditWriter(max_pending=3)
+        ids = [writer.record(uuid.uuid4(), "created")["id"] for _ in range(5)]
+
+        assert [row["id"] for row in writer._pending] == ids[2:]
+        assert writer.stats()["dropped"] == 2
+
+        async with db_session_factory() as db:
+            await db.run_sync(lambda session: AuditLog.__table__.drop(session.connection()))
+            await db.commit()
+            assert await writer.flush(db) == 0
+        writer.record(uuid.uuid4(), "approved")
+
+        assert writer.pending_count == 3
+        assert writer.stats()["dropped"] == 3
+
+
+class TestAuditSpool:
+    """Test cases for the durable spool mode."""
+
+    @pytest.mark.asyncio
+    async def test_spool_replayed_after_crash(self, db_session_factory, tmp_path):
+        """Entries spooled but never flushed should be written on the next start."""
+        spool = tmp_path / "audit.jsonl"
+        crashed = AuditWriter(spool_path=spool)
+        ids = [crashed.record(uuid.uuid4(), "created")["id"] for _ in range(3)]
+        crashed._spool.close()  # process dies without flushing
+
+        writer = AuditWriter(flush_interval=60, spool_path=spool)
+        await writer.start(db_session_factory)
+        await writer.stop(db_session_factory)
+
+        async with db_session_factory() as db:
+            stored = (await db.execute(select(AuditLog.id))).scalars().all()
+        assert sorted(stored) == sorted(ids)
+        assert writer.stats()["replayed"] == 3
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_replay_skips_committed_entries(self, db_session_factory, tmp_path):
+        """A crash between commit and spool cleanup should not duplicate entries."""
+        spool = tmp_path / "audit.jsonl"
+        crashed = AuditWriter(spool_path=spool)
+        crashed.record(uuid.uuid4(), "approved")
+        own_spool = crashed.process_spool_path()
+        spooled = own_spool.read_text()
+        async with db_session_factory() as db:
+            await crashed.flush(db)
+        own_spool.write_text(spooled)  # cleanup never happened
+
+        writer = AuditWriter(spool_path=spool)
+        await writer.start(db_session_factory)
+        await writer.stop(db_session_factory)
+
+        assert await _count(db_session_factory) == 1
+
+    @pytest.mark.asyncio
+    async def test_torn_line_skipped(self, db_session_factory, tmp_path):
+        spool = tmp_path / "audit.jsonl"
+        crashed = AuditWriter(spool_path=spool)
+        crashed.record(uuid.uuid4(), "created")
+        crashed._spool.write('{"id": "trunc')
+        crashed._spool.close()
+
+        writer = AuditWriter(spool_path=spool)
+        await writer.start(db_session_factory)
+        await writer.stop(db_session_factory)
+
+        assert await _count(db_session_factory) == 1
+
+    @pytest.mark.asyncio
+    async def test_spool_keeps_unflushed_entries(self, db_session_factory, tmp_path):
+        """After a flush the spool should hold only entries still pending."""
+        spool = tmp_path / "audit.jsonl"
+        writer = AuditWriter(spool_path=spool)
+        writer.record(uuid.uuid4(), "created")
+        async with db_session_factory() as db:
+            await writer.flush(db)
+        assert not writer.process_spool_path().exists()
+
+        writer.record(uuid.uuid4(), "approved")
+
+        assert len(writer.process_spool_path().read_text().splitlines()) == 1
+        assert not spool.exists()
+
+    @pytest.mark.asyncio
+    async def test_backlog_spills_to_spool(self, db_session_factory, tmp_path):
+        """With a spool, entries past max_pending should stay on disk, not be dropped."""
+        writer = AuditWriter(spool_path=tmp_path / "audit.jsonl", max_pending=2)
+        ids = [writer.record(uuid.uuid4(), "created")["id"] for _ in range(5)]
+
+        assert (len(writer._pending), writer.pending_count) == (2, 5)
+        assert writer.stats()["dropped"] == 0
+        assert len(writer.process_spool_path().read_text().splitlines()) == 5
+
+        async with db_session_factory() as db:
+            assert await writer.flush(db) == 2
+            # The oldest spilled entries are read back as the backlog drains
+            assert [row["id"] for row in writer._pending] == ids[:2]
+            assert len(writer.process_spool_path().read_text().splitlines()) == 3
+            while writer.pending_count:
+                await writer.flush(db)
+            stored = (await db.execute(select(AuditLog.id))).scalars().all()
+
+        assert sorted(stored) == sorted(ids)
+        assert not writer.process_spool_path().exists()
+
+    @pytest.mark.asyncio
+    async def test_live_spools_are_left_alone(self, db_session_factory, tmp_path):
+        """Spools locked by a running worker should not be replayed or removed."""
+        spool = tmp_path / "audit.jsonl"
+        other = tmp_path / "audit.99999.jsonl"
+        row = AuditWriter().record(uuid.uuid4(), "created")
+        other.write_text(_to_json(row) + "\n")
+
+        with open(other) as held:
+            fcntl.flock(held.fileno(), fcntl.LOCK_EX)
+            writer = AuditWriter(spool_path=spool)
+            await writer.start(db_session_factory)
+            await writer.stop(db_session_factory)
+
+            assert other.exists()
+            assert await _count(db_session_factory) == 0
+
+        # Once that worker is gone its spool is taken over
+        writer = AuditWriter(spool_path=spool)
+        await writer.start(db_session_factory)
+        await writer.stop(db_session_factory)
+
+        assert not other.exists()
+        assert await _count(db_session_factory) == 1
+
+    @pytest.mark.asyncio
+    async def test_own_spool_not_replayed_by_same_process(self, db_session_factory, tmp_path):
+        """Entries recorded before start should be written once, not replayed."""
+        spool = tmp_path / "audit.jsonl"
+        writer = AuditWriter(flush_interval=60, spool_path=spool)
+        writer.record(uuid.uuid4(), "created")
+
+        await writer.start(db_session_factory)
+        await writer.stop(db_session_factory)
+
+        assert writer.stats()["replayed"] == 0
+        assert await _count(db_session_factory) == 1
+        assert list(tmp_path.iterdir()) == []
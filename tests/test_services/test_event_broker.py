@@ -0,0 +1,150 @@
+"""Unit tests for the event broker."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.event_broker import (
+    InProcessEventBroker,
+    RedisEventBroker,
+    Subscription,
+    get_event_broker,
+)
+
+
+class FakePubSub:
+    """Pub/sub connection that fails, or yields the given messages and then blocks."""
+
+    def __init__(self, messages=None, fail=False, fail_subscribe=False):
+        self.messages = messages or []
+        self.fail = fail
+        self.fail_subscribe = fail_subscribe
+        self.closed = False
+
+    async def subscribe(self, channel):
+        if self.fail_subscribe:
+            raise ConnectionError("Connection refused")
+
+    async def listen(self):
+        if self.fail:
+            raise ConnectionError("connection reset")
+        for message in self.messages:
+            yield message
+        await asyncio.Event().wait()
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeRedis:
+    """Redis client whose publish always fails; pubsub() hands out prepared connections."""
+
+    def __init__(self, pubsubs):
+        self.pubsubs = list(pubsubs)
+
+    def pubsub(self):
+        return self.pubsubs.pop(0)
+
+    async def publish(self, channel, message):
+        raise ConnectionError("Connection refused")
+
+    async def aclose(self):
+        pass
+
+
+class TestInProcessEventBroker:
+    """Test cases for InProcessEventBroker."""
+
+    @pytest.fixture
+    def broker(self):
+        """Create a fresh broker instance."""
+        return InProcessEventBroker()
+
+    @pytest.mark.asyncio
+    async def test_subscriber_receives_event(self, broker):
+        """Published events should reach every subscriber."""
+        async with broker.subscribe() as first, broker.subscribe() as second:
+            await broker.publish("transaction.created", {"id": "abc"})
+            assert await first.get() == {"type": "transaction.created", "data": {"id": "abc"}}
+            assert await second.get() == {"type": "transaction.created", "data": {"id": "abc"}}
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_on_exit(self, broker):
+        """Leaving the context should remove the subscriber."""
+        async with broker.subscribe():
+            assert broker.subscriber_count == 1
+        assert broker.subscriber_count == 0
+
+    @pytest.mark.asyncio
+    async def test_publish_without_subscribers(self, broker):
+        """Publishing with nobody listening should be a no-op."""
+        await broker.publish("transaction.created", {"id": "abc"})
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest(self):
+        """A full queue should drop the oldest event, not block the publisher."""
+        subscription = Subscription(max_size=2)
+        for i in range(3):
+            subscription.put({"type": "t", "data": {"n": i}})
+        assert subscription.dropped == 1
+        assert (await subscription.get())["data"]["n"] == 1
+        assert (await subscription.get())["data"]["n"] == 2
+
+
+class TestRedisEventBroker:
+    """Test cases for RedisEventBroker failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_is_not_raised(self):
+        """A Redis outage should not fail the caller; local subscribers still get the event."""
+        broker = RedisEventBroker("redis://unused")
+        broker._redis = FakeRedis([])
+
+        async with broker.subscribe() as subscription:
+            await broker.publish("transaction.created", {"id": "abc"})
+            assert (await subscription.get())["data"] == {"id": "abc"}
+
+    @pytest.mark.asyncio
+    async def test_listener_reconnects(self, monkeypatch):
+        """The listener should resubscribe after the connection drops."""
+        monkeypatch.setattr("app.services.event_broker.RECONNECT_BASE_SECONDS", 0)
+        event = {"type": "transaction.created", "data": {"id": "abc"}}
+        dropped = FakePubSub(fail=True)
+        broker = RedisEventBroker("redis://unused")
+        broker._redis = FakeRedis([FakePubSub([{"type": "message", "data": json.dumps(event)}])])
+
+        async with broker.subscribe() as subscription:
+            listener = asyncio.create_task(broker._listen(dropped))
+            try:
+                assert await asyncio.wait_for(subscription.get(), 1) == event
+            finally:
+                listener.cancel()
+        assert dropped.closed
+
+    @pytest.mark.asyncio
+    async def test_start_while_redis_is_down(self, monkeypatch):
+        """A failed first subscribe should be retried by the listener, not give up relaying."""
+        monkeypatch.setattr("app.services.event_broker.RECONNECT_BASE_SECONDS", 0)
+        event = {"type": "transaction.created", "data": {"id": "abc"}}
+        down = FakePubSub(fail_subscribe=True)
+        redis = FakeRedis([down, FakePubSub([{"type": "message", "data": json.dumps(event)}])])
+        broker = RedisEventBroker("redis://unused")
+        broker._connect = lambda: redis
+
+        async with broker.subscribe() as subscription:
+            await broker.start()
+            try:
+                assert await asyncio.wait_for(subscription.get(), 1) == event
+            finally:
+                await broker.stop()
+        assert down.closed
+
+
+class TestGetEventBroker:
+    """Test factory function."""
+
+    def test_defaults_to_in_process(self, monkeypatch):
+        """Factory should return the in-process broker by default."""
+        monkeypatch.delenv("EVENT_BROKER", raising=False)
+        assert type(get_event_broker()) is InProcessEventBroker
@@ -121,6 +121,63 @@ class TestMockExplanationGenerator:
         assert "3 fraud indicator(s)" in result["explanation"]
 
 
+    def test_amount_spike_uses_detector_baseline(self, generator, sample_transaction):
+        """AMOUNT_SPIKE should print the average the detector compared against."""
+        personal = generator.generate_explanation(
+            transaction={**sample_transaction, "amount_baseline": 250.0},
+            risk_score=0.30,
+            factors=["AMOUNT_SPIKE"],
+        )
+        default = generator.generate_explanation(
+            transaction=sample_transaction, risk_score=0.30, factors=["AMOUNT_SPIKE"]
+        )
+        assert personal["risk_factors"] == [
+            "1. Amount Spike - Amount (£2000) is 8.0x your average (£250)"
+        ]
+        assert default["risk_factors"] == [
+            "1. Amount Spike - Amount (£2000) is 3.8x your average (£520)"
+        ]
+
+class TestExplanationCache:
+    """Test cases for explanation memoization."""
+
+    @pytest.fixture
+    def generator(self):
+        return MockExplanationGenerator()
+
+    def test_same_signature_hits_cache(self, generator):
+        """Transactions differing only in unused fields should share an entry."""
+        factors = ["NEW_PAYEE", "SUSPICIOUS_REFERENCE"]
+        first = generator.generate_explanation({"amount": 100, "payee": "A"}, 0.40, factors)
+        second = generator.generate_explanation({"amount": 250, "payee": "B"}, 0.40, factors)
+
+        assert first == second
+        assert generator.cache_stats()["hits"] == 1
+        assert generator.cache_stats()["misses"] == 1
+
+    def test_printed_fields_are_part_of_key(self, generator):
+        """Amounts and times shown in factor text should not be shared."""
+        early = {"amount": 100, "timestamp": datetime(2026, 1, 10, 3, 5, tzinfo=timezone.utc)}
+        late = {"amount": 100, "timestamp": datetime(2026, 1, 10, 3, 45, tzinfo=timezone.utc)}
+
+        first = generator.generate_explanation(early, 0.25, ["UNUSUAL_TIMING"])
+        second = generator.generate_explanation(late, 0.25, ["UNUSUAL_TIMING"])
+
+        assert "03:05" in first["risk_factors"][0]
+        assert "03:45" in second["risk_factors"][0]
+        assert generator.cache_stats()["hits"] == 0
+
+    def test_results_are_independent_copies(self, generator):
+        """Mutating a returned result should not affect later calls."""
+        first = generator.generate_explanation({"amount": 100}, 0.25, ["NEW_PAYEE"])
+        first["risk_factors"].append("tampered")
+        first["explanation"] = "tampered"
+
+        second = generator.generate_explanation({"amount": 100}, 0.25, ["NEW_PAYEE"])
+        assert second["risk_factors"] == ["1. New Payee - First-ever transfer to this payee - no transaction history"]
+        assert second["explanation"] != "tampered"
+
+
 class TestGetExplanationGenerator:
     """Test factory function."""
 
@@ -0,0 +1,151 @@
+"""Unit tests for the background explanation queue."""
+
+import pytest
+from datetime import datetime, timezone
+
+import app.services.explanation_queue as explanation_queue_module
+from app.services.database_service import db_service
+from app.services.explanation_generator import MockExplanationGenerator
+from app.services.explanation_queue import ExplanationQueue
+
+TRANSACTION = {
+    "amount": 5000.0,
+    "payee": "Suspicious Entity",
+    "timestamp": datetime(2026, 1, 10, 3, 0, tzinfo=timezone.utc),
+    "reference": "Wire Transfer",
+    "payee_is_new": True,
+}
+FACTORS = ["NEW_PAYEE", "UNUSUAL_TIMING", "AMOUNT_SPIKE"]
+
+
+class FlakyGenerator(MockExplanationGenerator):
+    """Generator that fails a set number of times before succeeding."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.calls = 0
+
+    def generate_explanation(self, transaction, risk_score, factors):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("model unavailable")
+        return super().generate_explanation(transaction, risk_score, factors)
+
+
+async def _create(db):
+    transaction = await db_service.create_transaction(
+        db, **TRANSACTION, risk_score=0.85, risk_level="high", factors=FACTORS,
+    )
+    return str(transaction.id)
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(explanation_queue_module, "EXPLANATION_RETRY_BASE_SECONDS", 0)
+
+
+class TestExplanationQueue:
+    """Test cases for ExplanationQueue."""
+
+    @pytest.mark.asyncio
+    async def test_stores_explanation(self, db_session_factory):
+        """A queued job should store the generated explanation."""
+        queue = ExplanationQueue(generator_provider=MockExplanationGenerator, workers=2)
+        await queue.start(db_session_factory)
+        async with db_session_factory() as db:
+            transaction_id = await _create(db)
+
+        assert queue.enqueue(transaction_id, TRANSACTION, 0.85, FACTORS)
+        await queue.join()
+        await queue.stop()
+
+        async with db_session_factory() as db:
+            stored = await db_service.get_transaction(db, transaction_id)
+        expected = MockExplanationGenerator().generate_explanation(TRANSACTION, 0.85, FACTORS)
+        assert stored.explanation == expected["explanation"]
+        assert stored.confidence == expected["confidence"]
+        assert stored.risk_factors_detailed == expected["risk_factors"]
+        assert queue.stats()["processed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_then_gives_up(self, db_session_factory):
+        """Failed jobs should be retried up to max_retries times."""
+        recovering = FlakyGenerator(failures=2)
+        queue = ExplanationQueue(generator_provider=lambda: recovering, workers=1, max_retries=3)
+        await queue.start(db_session_factory)
+        async with db_session_factory() as db:
+            first = await _create(db)
+        queue.enqueue(first, TRANSACTION, 0.85, FACTORS)
+        await queue.join()
+
+        failing = FlakyGenerator(failures=10)
+        queue.generator_provider = lambda: failing
+        async with db_session_factory() as db:
+            second = await _create(db)
+        queue.enqueue(second, TRANSACTION, 0.85, FACTORS)
+        await queue.join()
+        await queue.stop()
+
+        assert failing.calls == 4
+        stats = queue.stats()
+        assert (stats["processed"], stats["failed"], stats["retried"]) == (1, 1, 5)
+        async with db_session_factory() as db:
+            assert (await db_service.get_transaction(db, first)).explanation
+            assert (await db_service.get_transaction(db, second)).explanation is None
+
+    @pytest.mark.asyncio
+    async def test_does_not_overwrite_existing_explanation(self, db_session_factory):
+        """An explanation already stored should be kept."""
+        async with db_session_factory() as db:
+            transaction_id = await _create(db)
+            await db_service.save_explanation(db, transaction_id, {"explanation": "Reviewed"})
+            stored = await db_service.save_explanation(db, transaction_id, {"explanation": "Other"})
+            transaction = await db_service.get_transaction(db, transaction_id)
+
+        assert stored is False
+        assert transaction.explanation == "Reviewed"
+
+    @pytest.mark.asyncio
+    async def test_drops_jobs_when_full_or_stopped(self, db_session_factory):
+        """Enqueue should never block: it drops jobs when full or not running."""
+        queue = ExplanationQueue(generator_provider=MockExplanationGenerator, workers=1, max_size=1)
+        assert not queue.enqueue("id", TRANSACTION, 0.85, FACTORS)
+
+        await queue.start(db_session_factory)
+        accepted = [queue.enqueue(f"id-{i}", TRANSACTION, 0.85, FACTORS) for i in range(3)]
+        await queue.stop()
+
+        assert accepted == [True, False, False]
+        assert queue.stats()["dropped"] == 2
+
+    @pytest.mark.asyncio
+    async def test_pending_counts_unfinished_jobs(self, db_session_factory):
+        """Pending should count queued and running jobs until they finish."""
+        queue = ExplanationQueue(generator_provider=MockExplanationGenerator, workers=1, max_size=10)
+        await queue.start(db_session_factory)
+        async with db_session_factory() as db:
+            transaction_id = await _create(db)
+        queue.enqueue(transaction_id, TRANSACTION, 0.85, FACTORS)
+        queue.enqueue("missing", TRANSACTION, 0.85, FACTORS)
+        assert queue.pending == 2
+
+        await queue.join()
+        assert queue.pending == 0
+        await queue.stop()
+
+    def test_process_pool_restarts_on_generator_swap(self):
+        """A hot-swapped generator should get a fresh process pool."""
+        generator = MockExplanationGenerator()
+        queue = ExplanationQueue(generator_provider=lambda: generator, use_processes=True)
+        queue._executor = explanation_queue_module.ProcessPoolExecutor(max_workers=1)
+        try:
+            first = queue._process_pool()
+            assert queue._process_pool() is first
+
+            generator = MockExplanationGenerator()
+            second = queue._process_pool()
+            assert second is not first
+            assert queue._process_pool() is second
+        finally:
+            queue._executor.shutdown(wait=False)
@@ -0,0 +1,197 @@
+"""Unit tests for background import jobs."""
+
+import io
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app.db_models import ImportJob, Transaction
+from app.services.import_jobs import ImportJobRunner
+from app.services.registry import registry
+
+ROWS = 7
+CSV = "amount,payee,reference,timestamp\n" + "".join(
+    f"{100 + row},Vendor {row},PO {row},2026-01-10T14:30:00Z\n" for row in range(ROWS)
+)
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-import."""
+
+
+class CrashingDetector:
+    """Delegates to the real detector, dying on the given scoring call."""
+
+    def __init__(self, crash_on_call: int):
+        self.crash_on_call = crash_on_call
+        self.calls = 0
+
+    def calculate_risk_scores_batch(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls == self.crash_on_call:
+            raise Crash()
+        return registry.get_detector().calculate_risk_scores_batch(*args, **kwargs)
+
+
+class _Upload:
+    """Minimal async upload over bytes."""
+
+    def __init__(self, data: str):
+        self._data = io.BytesIO(data.encode())
+
+    async def read(self, size: int) -> bytes:
+        return self._data.read(size)
+
+
+@pytest.fixture(autouse=True)
+def job_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.services.import_jobs.IMPORT_JOB_DIR", tmp_path / "jobs")
+    monkeypatch.setattr("app.services.transaction_import.IMPORT_ERROR_DIR", tmp_path / "errors")
+    monkeypatch.setattr("app.services.transaction_import.IMPORT_CHUNK_SIZE", 2)
+
+
+async def _submit(session_factory, runner: ImportJobRunner, data: str = CSV) -> ImportJob:
+    async with session_factory() as db:
+        return await runner.submit(db, _Upload(data), "csv", "payments.csv")
+
+
+async def _abandon(session_factory) -> None:
+    """Age running jobs' heartbeats past the stale threshold."""
+    async with session_factory() as db:
+        await db.execute(
+            update(ImportJob)
+            .where(ImportJob.status == "running")
+            .values(updated_at=datetime.utcnow() - timedelta(hours=1))
+        )
+        await db.commit()
+
+
+async def _transaction_count(session_factory) -> int:
+    async with session_factory() as db:
+        return await db.scalar(select(func.count()).select_from(Transaction))
+
+
+class TestImportJobRunner:
+    """Test cases for ImportJobRunner."""
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_crash(self, db_session_factory):
+        """A job abandoned mid-import should continue after its last committed chunk."""
+        crashed = ImportJobRunner(detector_provider=lambda: CrashingDetector(crash_on_call=3))
+        job = await _submit(db_session_factory, crashed)
+
+        with pytest.raises(Crash):
+            await crashed.run_next(db_session_factory)
+
+        async with db_session_factory() as db:
+            abandoned = await db.get(ImportJob, job.id, populate_existing=True)
+        assert abandoned.status == "running"
+        assert (abandoned.rows_imported, abandoned.last_line) == (4, 5)
+        assert await _transaction_count(db_session_factory) == 4
+
+        await _abandon(db_session_factory)
+        runner = ImportJobRunner()
+        finished = await runner.run_next(db_session_factory)
+
+        assert finished.status == "completed"
+        assert (finished.rows_done, finished.rows_imported, finished.rows_failed) == (ROWS, ROWS, 0)
+        assert finished.bytes_done == finished.total_bytes
+        assert runner.stats()["resumed"] == 1
+        assert await _transaction_count(db_session_factory) == ROWS
+
+    @pytest.mark.asyncio
+    async def test_running_job_not_reclaimed_before_stale(self, db_session_factory):
+        crashed = ImportJobRunner(detector_provider=lambda: CrashingDetector(crash_on_call=1))
+        await _submit(db_session_factory, crashed)
+        with pytest.raises(Crash):
+            await crashed.run_next(db_session_factory)
+
+        assert await ImportJobRunner().run_next(db_session_factory) is None
+
+    @pytest.mark.asyncio
+    async def test_error_file_not_duplicated_on_resume(self, db_session_factory, tmp_path):
+        """Rejections logged after the last committed chunk should be logged once."""
+        data = (
+            "amount,payee,reference,timestamp\n"
+            "1,A,r,2026-01-10T14:30:00Z\n"
+            "2,B,r,2026-01-10T14:30:00Z\n"
+            "-1,Bad,r,2026-01-10T14:30:00Z\n"
+            "3,C,r,2026-01-10T14:30:00Z\n"
+            "4,D,r,2026-01-10T14:30:00Z\n"
+        )
+        crashed = ImportJobRunner(detector_provider=lambda: CrashingDetector(crash_on_call=2))
+        job = await _submit(db_session_factory, crashed, data)
+        with pytest.raises(Crash):
+            await crashed.run_next(db_session_factory)
+
+        await _abandon(db_session_factory)
+        finished = await ImportJobRunner().run_next(db_session_factory)
+
+        assert (finished.rows_imported, finished.rows_failed) == (4, 1)
+        errors = (tmp_path / "errors" / f"{job.id.hex}.ndjson").read_text().splitlines()
+        assert len(errors) == 1
+
+    @pytest.mark.asyncio
+    async def test_only_one_runner_claims_a_job(self, db_session_factory):
+        first, second = ImportJobRunner(), ImportJobRunner()
+        await _submit(db_session_factory, first)
+
+        async with db_session_factory() as db:
+            claimed = await first.claim(db)
+            assert claimed is not None and claimed.worker == first.worker_id
+            assert await second.claim(db) is None
+
+    @pytest.mark.asyncio
+    async def test_stops_when_job_is_reclaimed(self, db_session_factory):
+        """A worker that lost its job should roll back its chunk and leave the job alone."""
+        runner = ImportJobRunner()
+        await _submit(db_session_factory, runner)
+        async with db_session_factory() as db:
+            job = await runner.claim(db)
+            await db.execute(update(ImportJob).where(ImportJob.id == job.id).values(worker="other"))
+            await db.commit()
+
+        current = await runner.run(db_session_factory, job)
+
+        assert (current.status, current.worker) == ("running", "other")
+        assert (current.rows_done, current.rows_imported) == (0, 0)
+        assert await _transaction_count(db_session_factory) == 0
+        assert runner.stats()["lost"] == 1
+        assert runner.stats()["failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_not_completed_when_reclaimed_before_finish(self, db_session_factory):
+        """A job reclaimed after its last chunk should count as lost, not completed."""
+        runner = ImportJobRunner()
+        await _submit(db_session_factory, runner)
+        async with db_session_factory() as db:
+            job = await runner.claim(db)
+        finish = runner._finish
+
+        async def reclaim_then_finish(db, job, values):
+            await db.execute(update(ImportJob).where(ImportJob.id == job.id).values(worker="other"))
+            await db.commit()
+            return await finish(db, job, values)
+
+        runner._finish = reclaim_then_finish
+        current = await runner.run(db_session_factory, job)
+
+        assert (current.status, current.worker) == ("running", "other")
+        assert runner.stats()["completed"] == 0
+        assert runner.stats()["lost"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_job_reports_error(self, db_session_factory):
+        runner = ImportJobRunner()
+        job = await _submit(db_session_factory, runner)
+        async with db_session_factory() as db:
+            stored = await db.get(ImportJob, job.id)
+            stored.path = "/nonexistent/payments.csv"
+            await db.commit()
+
+        finished = await runner.run_next(db_session_factory)
+
+        assert finished.status == "failed"
+        assert "No such file" in finished.error
+        assert runner.stats()["failed"] == 1
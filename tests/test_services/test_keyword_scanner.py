@@ -0,0 +1,47 @@
+"""Unit tests for the Aho-Corasick keyword scanner."""
+
+from app.services import anomaly_detector
+from app.services.anomaly_detector import MockAnomalyDetector
+from app.services.keyword_scanner import KeywordScanner, get_keyword_scanner
+
+
+class TestKeywordScanner:
+    """Test cases for KeywordScanner."""
+
+    def test_finds_overlapping_keywords(self):
+        """Keywords that overlap or nest should all be reported."""
+        scanner = KeywordScanner(["he", "she", "his", "hers"])
+        assert scanner.scan("ushers") == {"he", "she", "hers"}
+        assert scanner.scan("this") == {"his"}
+        assert scanner.scan("nothing") == frozenset()
+
+    def test_case_insensitive_substrings(self):
+        """Matching should ignore case and hit inside longer words."""
+        scanner = KeywordScanner(["URGENT", "bank details"])
+        assert scanner.scan("Urgently update Bank Details") == {"urgent", "bank details"}
+
+    def test_large_lexicon_matches_naive_scan(self):
+        """A lexicon of thousands of terms should agree with substring checks."""
+        keywords = [f"kw{i}x" for i in range(3000)] + ["wire", "fee"]
+        scanner = KeywordScanner(keywords)
+        text = "Wire the kw12x and kw2999x processing fee / kw7"
+        assert scanner.scan(text) == {kw for kw in keywords if kw in text.lower()}
+
+    def test_default_scanner_covers_patterns_and_urgency(self):
+        """The shared scanner should include pattern keywords and the urgency lexicon."""
+        scanner = get_keyword_scanner()
+        assert {"urgent", "invoice", "confidential"} <= scanner.keywords
+
+
+class TestUrgencyLexicon:
+    """Test cases for SUSPICIOUS_REFERENCE with a configured lexicon."""
+
+    def test_custom_urgency_keywords(self, monkeypatch):
+        """Extra urgency keywords should trigger SUSPICIOUS_REFERENCE."""
+        monkeypatch.setattr(anomaly_detector, "URGENCY_KEYWORDS", ("urgent", "asap"))
+        detector = MockAnomalyDetector(keyword_scanner=KeywordScanner(["urgent", "asap", "invoice"]))
+
+        _, asap = detector.calculate_risk_score({"amount": 10, "reference": "Pay ASAP"})
+        _, invoice = detector.calculate_risk_score({"amount": 10, "reference": "Invoice 12"})
+        assert "SUSPICIOUS_REFERENCE" in asap
+        assert "SUSPICIOUS_REFERENCE" not in invoice
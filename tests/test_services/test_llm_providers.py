@@ -0,0 +1,571 @@
+"""Unit tests for LLM provider wrappers."""
+
+import asyncio
+import json
+import re
+
+import httpx
+import pytest
+
+from app.providers import _get_llm_provider
+from app.providers.llm.base import ExplanationRequest, ExplanationResponse, LLMProvider, is_fallback
+from app.providers.llm.caching import CachingLLMProvider
+from app.providers.llm.disk_cache import DiskCacheLLMProvider, request_digest
+from app.providers.llm.mock_provider import MockLLMProvider
+from app.providers.llm.pipelined import PipelinedLLMProvider, TokenBucket
+from app.providers.resilience import ResilientLLMProvider
+
+
+class CountingProvider(MockLLMProvider):
+    """Mock provider counting generate_explanation calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def generate_explanation(self, request):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return await super().generate_explanation(request)
+
+
+class FakeUpstream(MockLLMProvider):
+    """Stand-in for a remote LLM with injected latency and batch support."""
+
+    supports_batch = True
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak = 0
+        self.batch_sizes = []
+
+    async def _respond(self, requests):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        responses = [await super(FakeUpstream, self).generate_explanation(r) for r in requests]
+        for response in responses:
+            response.explanation = f"upstream: {response.explanation}"
+        return responses
+
+    async def generate_explanation(self, request):
+        self.batch_sizes.append(1)
+        return (await self._respond([request]))[0]
+
+    async def generate_explanations_batch(self, requests):
+        self.batch_sizes.append(len(requests))
+        return await self._respond(requests)
+
+
+class LocalLLMServer:
+    """HTTP server on localhost answering batches of explanation requests after a delay."""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.batch_sizes = []
+        self._handlers = set()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._accept, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        for handler in self._handlers:
+            handler.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _accept(self, reader, writer):
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(re.search(rb"content-length: *(\d+)", head, re.I).group(1))
+            requests = json.loads(await reader.readexactly(length))
+            self.batch_sizes.append(len(requests))
+            await asyncio.sleep(self.latency)
+            mock = MockLLMProvider()
+            responses = [
+                (await mock.generate_explanation(ExplanationRequest(**r))).model_dump()
+                for r in requests
+            ]
+            body = json.dumps(responses).encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(handler)
+
+
+class HttpUpstream(LLMProvider):
+    """Provider posting request batches to a LocalLLMServer."""
+
+    supports_batch = True
+
+    def __init__(self, url):
+        self.client = httpx.AsyncClient(base_url=url)
+
+    async def generate_explanation(self, request):
+        return (await self.generate_explanations_batch([request]))[0]
+
+    async def generate_explanations_batch(self, requests):
+        response = await self.client.post("/explain", json=[r.model_dump() for r in requests])
+        response.raise_for_status()
+        return [ExplanationResponse(**item) for item in response.json()]
+
+    async def parse_email(self, from_address, subject, body):
+        raise NotImplementedError
+
+    def health_check(self):
+        return True
+
+
+class BatchBackend(LLMProvider):
+    """External backend stand-in (not a MockLLMProvider) with batching and token streaming."""
+
+    supports_batch = True
+    model = "fake-model"
+
+    def __init__(self):
+        self.mock = MockLLMProvider()
+        self.batch_sizes = []
+        self.streams = 0
+
+    async def generate_explanation(self, request):
+        return (await self.generate_explanations_batch([request]))[0]
+
+    async def generate_explanations_batch(self, requests):
+        self.batch_sizes.append(len(requests))
+        await asyncio.sleep(0.01)
+        return [await self.mock.generate_explanation(request) for request in requests]
+
+    async def stream_explanation(self, request):
+        self.streams += 1
+        async for chunk in self.mock.stream_explanation(request):
+            yield chunk
+
+    async def parse_email(self, from_address, subject, body):
+        return await self.mock.parse_email(from_address, subject, body)
+
+    def health_check(self):
+        return True
+
+
+@pytest.fixture
+def wired_stack(tmp_path, monkeypatch):
+    """_get_llm_provider with every wrapper enabled around a BatchBackend."""
+    backend = BatchBackend()
+    monkeypatch.setattr("app.providers._create_llm_provider", lambda: backend)
+    monkeypatch.setenv("LLM_DISK_CACHE_PATH", str(tmp_path / "llm.db"))
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "4")
+    monkeypatch.setenv("LLM_BATCH_WINDOW_MS", "10")
+    monkeypatch.setenv("LLM_CACHE_SIZE", "100")
+    provider = _get_llm_provider()
+    yield provider, backend
+    provider.provider.provider.close()
+
+
+def _request(amount=5000.0, hour=3, payee="Vendor", factors=("NEW_PAYEE", "AMOUNT_SPIKE")):
+    return ExplanationRequest(
+        transaction_amount=amount,
+        transaction_payee=payee,
+        transaction_timestamp=f"2026-01-10T{hour:02d}:15:00Z",
+        transaction_reference="Invoice",
+        risk_score=0.55,
+        risk_factors=list(factors),
+    )
+
+
+class TestCachingLLMProvider:
+    """Test cases for CachingLLMProvider."""
+
+    @pytest.mark.asyncio
+    async def test_same_signature_calls_provider_once(self):
+        """Requests with the same signature should reuse one explanation."""
+        inner = CountingProvider()
+        provider = CachingLLMProvider(inner)
+
+        first = await provider.generate_explanation(_request(payee="A"))
+        second = await provider.generate_explanation(_request(amount=5050.0, payee="B"))
+
+        assert inner.calls == 1
+        assert first == second
+        assert first is not second
+        assert provider.cache_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_coalesced(self):
+        """Concurrent requests with one signature should share a provider call."""
+        inner = CountingProvider()
+        provider = CachingLLMProvider(inner)
+
+        results = await asyncio.gather(*(provider.generate_explanation(_request()) for _ in range(4)))
+
+        assert inner.calls == 1
+        assert all(result == results[0] for result in results)
+        assert len({id(result) for result in results}) == 4
+        assert provider.cache_stats()["coalesced"] == 3
+
+    @pytest.mark.asyncio
+    async def test_different_signature_misses(self):
+        """Changing factors, hour or amount band should generate again."""
+        inner = CountingProvider()
+        provider = CachingLLMProvider(inner)
+
+        await provider.generate_explanation(_request())
+        await provider.generate_explanation(_request(hour=14))
+        await provider.generate_explanation(_request(amount=500.0))
+        await provider.generate_explanation(_request(factors=("NEW_PAYEE",)))
+
+        assert inner.calls == 4
+
+    @pytest.mark.asyncio
+    async def test_custom_key_and_passthrough(self):
+        """A custom key function and uncached methods should be honoured."""
+        inner = CountingProvider()
+        provider = CachingLLMProvider(inner, key_fn=lambda request: request.transaction_payee)
+
+        await provider.generate_explanation(_request(payee="A"))
+        await provider.generate_explanation(_request(payee="A", hour=14))
+        result = await provider.parse_email("a@b.c", "Payment", "body")
+
+        assert inner.calls == 1
+        assert result.parsed is False
+        assert provider.health_check()
+        assert provider.name == "CachingLLMProvider(CountingProvider)"
+
+
+    @pytest.mark.asyncio
+    async def test_batch_sends_only_misses(self):
+        """Cached signatures should be answered locally, the rest in one upstream batch."""
+        upstream = FakeUpstream()
+        provider = CachingLLMProvider(upstream)
+        await provider.generate_explanation(_request(factors=("NEW_PAYEE",)))
+
+        results = await provider.generate_explanations_batch([
+            _request(factors=("NEW_PAYEE",)),
+            _request(factors=("AMOUNT_SPIKE",)),
+            _request(factors=("AMOUNT_SPIKE",)),
+        ])
+
+        assert provider.supports_batch
+        assert upstream.batch_sizes == [1, 1]
+        assert [len(r.risk_factors_detailed) for r in results] == [1, 1, 1]
+        assert results[1] is not results[2]
+
+
+class TestStreamExplanation:
+    """Test cases for LLMProvider.stream_explanation."""
+
+    @pytest.mark.asyncio
+    async def test_mock_streams_words_then_response(self):
+        """The mock provider should stream the narrative and end with the full response."""
+        chunks = [chunk async for chunk in MockLLMProvider().stream_explanation(_request())]
+        expected = await MockLLMProvider().generate_explanation(_request())
+
+        assert len(chunks) > 2
+        assert "".join(chunk.text for chunk in chunks) == expected.explanation
+        assert chunks[-1].response == expected
+        assert all(chunk.response is None for chunk in chunks[:-1])
+
+    @pytest.mark.asyncio
+    async def test_default_yields_one_final_chunk(self):
+        """Providers without streaming should yield the whole explanation at once."""
+
+        class PlainProvider(LLMProvider):
+            async def generate_explanation(self, request):
+                return await MockLLMProvider().generate_explanation(request)
+
+            async def parse_email(self, from_address, subject, body):
+                raise NotImplementedError
+
+            def health_check(self):
+                return True
+
+        chunks = [chunk async for chunk in PlainProvider().stream_explanation(_request())]
+
+        assert len(chunks) == 1
+        assert chunks[0].text == chunks[0].response.explanation
+
+    @pytest.mark.asyncio
+    async def test_caches_stream_misses_and_send_hits_whole(self, tmp_path):
+        """Cache wrappers should pass a miss's tokens through, then answer it in one chunk."""
+        disk = DiskCacheLLMProvider(MockLLMProvider(), tmp_path / "llm.db")
+        for provider in (CachingLLMProvider(MockLLMProvider()), disk):
+            streamed = [chunk async for chunk in provider.stream_explanation(_request())]
+            cached = [chunk async for chunk in provider.stream_explanation(_request())]
+
+            assert len(streamed) > 2
+            assert len(cached) == 1
+            assert cached[0].text == "".join(chunk.text for chunk in streamed)
+            assert cached[0].response.model_dump() == streamed[-1].response.model_dump()
+        disk.close()
+
+    @pytest.mark.asyncio
+    async def test_pipeline_streams_under_limits(self):
+        """The pipeline should pass tokens through, holding a slot while streaming."""
+        provider = PipelinedLLMProvider(MockLLMProvider(), max_concurrency=1)
+        stream = provider.stream_explanation(_request())
+        first = await anext(stream)
+
+        assert first.text and provider.pipeline_stats()["in_flight"] == 1
+        chunks = [first] + [chunk async for chunk in stream]
+        assert len(chunks) > 2
+        assert provider.pipeline_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pipeline_stream_falls_back_when_first_chunk_is_late(self):
+        """A stream with no chunk before the deadline should come from the fallback."""
+
+        class SlowStream(MockLLMProvider):
+            async def stream_explanation(self, request):
+                await asyncio.sleep(0.5)
+                yield await self.generate_explanation(request)
+
+        provider = PipelinedLLMProvider(SlowStream(), timeout=0.02)
+        chunks = [chunk async for chunk in provider.stream_explanation(_request())]
+
+        assert len(chunks) > 2
+        assert is_fallback(chunks[-1].response)
+        assert provider.pipeline_stats()["timeouts"] == 1
+        assert provider.pipeline_stats()["in_flight"] == 0
+
+
+class TestPipelinedLLMProvider:
+    """Test cases for PipelinedLLMProvider."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_limited(self):
+        """No more than max_concurrency upstream calls should run at once."""
+        upstream = FakeUpstream()
+        upstream.supports_batch = False
+        provider = PipelinedLLMProvider(upstream, max_concurrency=2)
+
+        results = await asyncio.gather(*(provider.generate_explanation(_request()) for _ in range(6)))
+
+        assert upstream.peak == 2
+        assert all(result.explanation.startswith("upstream:") for result in results)
+        assert provider.pipeline_stats()["upstream_calls"] == 6
+
+    @pytest.mark.asyncio
+    async def test_requests_in_window_are_batched(self):
+        """Requests arriving within the window should share upstream calls."""
+        upstream = FakeUpstream()
+        provider = PipelinedLLMProvider(upstream, batch_window=0.01, max_batch_size=4)
+
+        requests = [_request(factors=("NEW_PAYEE",) * (i % 3 + 1)) for i in range(6)]
+        results = await asyncio.gather(*(provider.generate_explanation(r) for r in requests))
+
+        assert upstream.batch_sizes == [4, 2]
+        assert [len(r.risk_factors_detailed) for r in results] == [i % 3 + 1 for i in range(6)]
+
+    @pytest.mark.asyncio
+    async def test_slow_upstream_falls_back_to_mock(self):
+        """Calls past the deadline should be answered by the fallback provider."""
+        upstream = FakeUpstream(latency=0.5)
+        provider = PipelinedLLMProvider(upstream, timeout=0.02, batch_window=0.005)
+
+        result = await provider.generate_explanation(_request())
+
+        expected = await MockLLMProvider().generate_explanation(_request())
+        assert result.model_dump() == expected.model_dump()
+        assert provider.pipeline_stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_upstream_errors_are_raised(self):
+        """Errors other than the deadline should reach the caller."""
+
+        class BrokenUpstream(FakeUpstream):
+            async def generate_explanations_batch(self, requests):
+                raise RuntimeError("bad gateway")
+
+        provider = PipelinedLLMProvider(BrokenUpstream(), batch_window=0.005)
+
+        with pytest.raises(RuntimeError, match="bad gateway"):
+            await provider.generate_explanation(_request())
+
+    @pytest.mark.asyncio
+    async def test_token_bucket_spaces_calls(self):
+        """Calls beyond the burst should wait for tokens."""
+        bucket = TokenBucket(rate=100, capacity=2)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(4):
+            await bucket.acquire()
+
+        assert loop.time() - start >= 0.015
+
+
+class TestDiskCacheLLMProvider:
+    """Test cases for DiskCacheLLMProvider."""
+
+    @pytest.mark.asyncio
+    async def test_batch_sends_only_misses(self, tmp_path):
+        """Stored requests should be answered from disk, the rest in one upstream batch."""
+        upstream = FakeUpstream()
+        provider = DiskCacheLLMProvider(upstream, tmp_path / "llm.db")
+        await provider.generate_explanation(_request(payee="A"))
+
+        requests = [_request(payee="A"), _request(payee="B"), _request(payee="C"), _request(payee="B")]
+        results = await provider.generate_explanations_batch(requests)
+        replayed = await provider.generate_explanations_batch(requests)
+
+        assert provider.supports_batch
+        assert upstream.batch_sizes == [1, 2]
+        assert [r.model_dump() for r in replayed] == [r.model_dump() for r in results]
+        provider.close()
+
+    @pytest.mark.asyncio
+    async def test_survives_restart(self, tmp_path):
+        """A new instance on the same file should reuse stored responses."""
+        path = tmp_path / "llm.db"
+        first = DiskCacheLLMProvider(CountingProvider(), path)
+        stored = await first.generate_explanation(_request())
+        first.close()
+
+        inner = CountingProvider()
+        second = DiskCacheLLMProvider(inner, path)
+        replayed = await second.generate_explanation(_request())
+
+        assert inner.calls == 0
+        assert replayed == stored
+        assert second.cache_stats()["hits"] == 1
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_key_covers_full_request_and_model(self, tmp_path):
+        """Any request field, the provider or the model should change the key."""
+        inner = CountingProvider()
+        provider = DiskCacheLLMProvider(inner, tmp_path / "llm.db")
+
+        await provider.generate_explanation(_request(payee="A"))
+        await provider.generate_explanation(_request(payee="B"))
+        await provider.generate_explanation(_request(payee="A"))
+
+        assert inner.calls == 2
+        assert request_digest(_request(), "P", "m1") != request_digest(_request(), "P", "m2")
+        assert request_digest(_request(), "P") != request_digest(_request(), "Q")
+        provider.close()
+
+    @pytest.mark.asyncio
+    async def test_read_errors_are_misses(self, tmp_path):
+        """A failing cache file should fall through to the wrapped provider."""
+        inner = CountingProvider()
+        provider = DiskCacheLLMProvider(inner, tmp_path / "llm.db")
+        provider.store.close()
+
+        response = await provider.generate_explanation(_request())
+
+        assert inner.calls == 1
+        assert response.explanation
+        assert provider.misses == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_regenerated(self, tmp_path):
+        """Entries past the TTL should be treated as misses."""
+        inner = CountingProvider()
+        provider = DiskCacheLLMProvider(inner, tmp_path / "llm.db", ttl_seconds=0.01)
+
+        await provider.generate_explanation(_request())
+        await asyncio.sleep(0.02)
+        await provider.generate_explanation(_request())
+
+        assert inner.calls == 2
+        provider.close()
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_past_max_bytes(self, tmp_path):
+        """Stored bytes should stay under max_bytes, dropping the oldest reads first."""
+        inner = CountingProvider()
+        size = len((await MockLLMProvider().generate_explanation(_request())).model_dump_json())
+        provider = DiskCacheLLMProvider(inner, tmp_path / "llm.db", max_bytes=size * 2 + 10)
+
+        await provider.generate_explanation(_request(payee="A"))
+        await provider.generate_explanation(_request(payee="B"))
+        await provider.generate_explanation(_request(payee="A"))  # A is now most recent
+        await provider.generate_explanation(_request(payee="C"))  # evicts B
+        assert provider.cache_stats()["bytes"] <= size * 2 + 10
+
+        calls = inner.calls
+        await provider.generate_explanation(_request(payee="A"))
+        assert inner.calls == calls
+        await provider.generate_explanation(_request(payee="B"))
+        assert inner.calls == calls + 1
+        provider.close()
+
+
+class TestPipelinedLLMProviderOverHttp:
+    """PipelinedLLMProvider in front of a real local HTTP server."""
+
+    @pytest.mark.asyncio
+    async def test_requests_are_batched_over_http(self):
+        """Requests within the window should arrive at the server as one batch."""
+        async with LocalLLMServer(latency=0.02) as server:
+            upstream = HttpUpstream(server.url)
+            provider = PipelinedLLMProvider(upstream, batch_window=0.01, max_batch_size=4)
+            requests = [_request(factors=("NEW_PAYEE",) * (i % 3 + 1)) for i in range(6)]
+            results = await asyncio.gather(*(provider.generate_explanation(r) for r in requests))
+            await upstream.client.aclose()
+
+        assert sorted(server.batch_sizes) == [2, 4]
+        assert [len(r.risk_factors_detailed) for r in results] == [i % 3 + 1 for i in range(6)]
+        assert not any(is_fallback(r) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_slow_server_falls_back_to_mock(self):
+        """A server slower than the deadline should be answered by the fallback."""
+        async with LocalLLMServer(latency=0.5) as server:
+            upstream = HttpUpstream(server.url)
+            provider = PipelinedLLMProvider(upstream, timeout=0.05, batch_window=0.005)
+            result = await provider.generate_explanation(_request())
+            await upstream.client.aclose()
+
+        assert is_fallback(result)
+        expected = await MockLLMProvider().generate_explanation(_request())
+        assert result.model_dump() == expected.model_dump()
+        assert provider.pipeline_stats()["timeouts"] == 1
+
+
+class TestWiredLLMStack:
+    """The provider stack as built by _get_llm_provider."""
+
+    @pytest.mark.asyncio
+    async def test_pipeline_batches_through_wrappers(self, wired_stack):
+        """Batching should reach the backend through the disk cache and resilience layers."""
+        provider, backend = wired_stack
+        pipeline = provider.provider
+
+        requests = [_request(amount=1000.0 * (i + 1)) for i in range(6)]
+        results = await asyncio.gather(*(provider.generate_explanation(r) for r in requests))
+
+        assert pipeline.batching
+        assert backend.batch_sizes == [6]
+        assert not any(is_fallback(r) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_streams_through_wrappers(self, wired_stack):
+        """Tokens should reach the caller through every wrapper, and the result be cached."""
+        provider, backend = wired_stack
+        disk = provider.provider.provider
+
+        streamed = [chunk async for chunk in provider.stream_explanation(_request())]
+        cached = [chunk async for chunk in provider.stream_explanation(_request())]
+
+        assert isinstance(disk.provider, ResilientLLMProvider)
+        assert disk.model == "fake-model"
+        assert backend.streams == 1
+        assert len(streamed) > 2
+        assert not is_fallback(streamed[-1].response)
+        assert len(cached) == 1
+        assert disk.store.stats()["entries"] == 1
@@ -0,0 +1,175 @@
+"""Unit tests for the local JSON pattern matcher and pattern matcher wrappers."""
+
+import asyncio
+import itertools
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from app.providers.patterns.coalescing import CoalescingPatternMatcher
+from app.providers.patterns.local_json import LocalJSONProvider, PatternIndex
+
+FACTORS = ["NEW_PAYEE", "UNUSUAL_TIMING", "AMOUNT_SPIKE", "SUSPICIOUS_REFERENCE", "VELOCITY"]
+REFERENCES = ["", "Invoice payment", "URGENT wire - confidential", "processing fee deposit"]
+
+
+def _naive_matches(patterns, risk_factors, reference):
+    """Straightforward per-pattern scan the index must agree with."""
+    results = []
+    for pattern in patterns:
+        trigger_factors = set(pattern.get("trigger_factors", []))
+        overlap = set(risk_factors) & trigger_factors
+        if not overlap:
+            continue
+        score = len(overlap) / max(len(trigger_factors), 1)
+        hits = sum(1 for kw in pattern.get("keywords", []) if kw.lower() in reference.lower())
+        if hits:
+            score = min(1.0, score + 0.1 * hits)
+        results.append((pattern["id"], round(score, 2)))
+    results.sort(key=lambda item: item[1], reverse=True)
+    return results
+
+
+class TestLocalJSONProvider:
+    """Test cases for LocalJSONProvider."""
+
+    @pytest.fixture
+    def provider(self):
+        provider = LocalJSONProvider()
+        provider._load_patterns()
+        return provider
+
+    @pytest.mark.asyncio
+    async def test_matches_naive_scan(self, provider):
+        """Indexed matching should return the same patterns, scores and order."""
+        for size in range(len(FACTORS) + 1):
+            for factors in itertools.combinations(FACTORS, size):
+                for reference in REFERENCES:
+                    matches = await provider.find_matching_patterns(
+                        list(factors), {"reference": reference}
+                    )
+                    assert [(m.pattern_id, m.match_score) for m in matches] == _naive_matches(
+                        provider._patterns, factors, reference
+                    )
+
+    @pytest.mark.asyncio
+    async def test_returns_shared_immutable_matches(self, provider):
+        """Repeated matches should reuse frozen PatternMatch instances."""
+        first = await provider.find_matching_patterns(["NEW_PAYEE"], {"reference": "Invoice"})
+        second = await provider.find_matching_patterns(["NEW_PAYEE"], {"reference": "Invoice"})
+
+        assert first and all(a is b for a, b in zip(first, second))
+        with pytest.raises(ValidationError):
+            first[0].match_score = 0.0
+
+    def test_index_visits_only_candidates(self):
+        """Patterns sharing no factor should not be candidates."""
+        index = PatternIndex([
+            {"id": "a", "name": "A", "description": "", "trigger_factors": ["NEW_PAYEE"]},
+            {"id": "b", "name": "B", "description": "", "trigger_factors": ["VELOCITY"]},
+        ])
+
+        assert index.patterns_by_factor == {"NEW_PAYEE": 0b01, "VELOCITY": 0b10}
+        assert [m.pattern_id for m in index.match(["VELOCITY"], "")] == ["b"]
+        assert index.match(["UNKNOWN"], "") == []
+
+
+def _write_patterns(path, *ids):
+    path.write_text(json.dumps([
+        {"id": pattern_id, "name": pattern_id.title(), "description": "",
+         "trigger_factors": ["NEW_PAYEE"], "keywords": []}
+        for pattern_id in ids
+    ]))
+
+
+class TestPatternHotReload:
+    """Test cases for reloading fraud patterns without a restart."""
+
+    @pytest.mark.asyncio
+    async def test_reload_swaps_index(self, tmp_path):
+        """A changed file should be compiled into a new index."""
+        patterns_file = tmp_path / "patterns.json"
+        _write_patterns(patterns_file, "first")
+        provider = LocalJSONProvider(str(patterns_file), reload_interval=0)
+
+        assert await provider.reload_if_changed()
+        old_index = provider._index
+        assert not await provider.reload_if_changed()
+
+        _write_patterns(patterns_file, "first", "second")
+        assert await provider.reload_if_changed()
+
+        matches = await provider.find_matching_patterns(["NEW_PAYEE"], {"reference": ""})
+        assert [m.pattern_id for m in matches] == ["first", "second"]
+        # A match that started before the swap still sees the old snapshot
+        assert [m.pattern_id for m in old_index.match(["NEW_PAYEE"], "")] == ["first"]
+        assert provider.reload_stats()["reloads"] == 2
+
+    @pytest.mark.asyncio
+    async def test_broken_file_keeps_current_index(self, tmp_path):
+        """Invalid JSON should be reported and leave the last good index active."""
+        patterns_file = tmp_path / "patterns.json"
+        _write_patterns(patterns_file, "first")
+        provider = LocalJSONProvider(str(patterns_file), reload_interval=0)
+        await provider.reload_if_changed()
+
+        patterns_file.write_text("[{not json")
+        assert not await provider.reload_if_changed()
+
+        stats = provider.reload_stats()
+        assert stats["patterns"] == 1
+        assert stats["failed_reloads"] == 1
+        assert stats["last_error"]
+
+    @pytest.mark.asyncio
+    async def test_watcher_picks_up_changes(self, tmp_path):
+        """The background watcher should reload after the file changes."""
+        patterns_file = tmp_path / "patterns.json"
+        _write_patterns(patterns_file, "first")
+        provider = LocalJSONProvider(str(patterns_file), reload_interval=0.01)
+        await provider.warm_up()
+        try:
+            _write_patterns(patterns_file, "first", "second")
+            for _ in range(100):
+                if provider.reload_stats()["patterns"] == 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert provider.reload_stats()["patterns"] == 2
+        finally:
+            await provider.close()
+
+
+class SlowMatcher(LocalJSONProvider):
+    """Local matcher with remote-like latency, counting lookups."""
+
+    def __init__(self):
+        super().__init__(reload_interval=0)
+        self.calls = 0
+
+    async def find_matching_patterns(self, risk_factors, transaction_context):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return await super().find_matching_patterns(risk_factors, transaction_context)
+
+
+class TestCoalescingPatternMatcher:
+    """Test cases for CoalescingPatternMatcher."""
+
+    @pytest.mark.asyncio
+    async def test_identical_lookups_share_one_call(self):
+        """Concurrent identical lookups should reach the matcher once."""
+        inner = SlowMatcher()
+        matcher = CoalescingPatternMatcher(inner)
+        context = {"reference": "URGENT wire", "amount": 5000.0}
+
+        results = await asyncio.gather(
+            *(matcher.find_matching_patterns(["NEW_PAYEE"], dict(context)) for _ in range(3)),
+            matcher.find_matching_patterns(["AMOUNT_SPIKE"], dict(context)),
+        )
+
+        assert inner.calls == 2
+        assert results[0] == results[1] == results[2]
+        assert results[0] is not results[1]
+        assert matcher.name == "CoalescingPatternMatcher(SlowMatcher)"
+
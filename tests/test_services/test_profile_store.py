@@ -0,0 +1,199 @@
+"""Unit tests for the behavioural profile store."""
+
+import pytest
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.services.anomaly_detector import (
+    MockAnomalyDetector,
+    decode_factor_mask,
+    score_transactions,
+    transactions_to_columns,
+)
+from app.services.database_service import db_service
+from app.services.profile_store import (
+    ACCOUNT_SCOPE,
+    DEFAULT_ACCOUNT,
+    PAYEE_SCOPE,
+    ProfileStats,
+    ProfileStore,
+)
+
+
+def _at(hour, day=10):
+    return datetime(2026, 1, day, hour, 0, tzinfo=timezone.utc)
+
+
+class TestProfileStats:
+    """Test cases for ProfileStats."""
+
+    def test_welford_matches_numpy(self):
+        """Streaming mean and variance should match a direct computation."""
+        amounts = [120.0, 80.5, 99.99, 1500.0, 42.0, 310.25]
+        stats = ProfileStats()
+        for i, amount in enumerate(amounts):
+            stats.observe(amount, _at(9 + i))
+
+        assert stats.count == len(amounts)
+        assert stats.mean == pytest.approx(np.mean(amounts))
+        assert stats.variance == pytest.approx(np.var(amounts))
+        assert stats.first_seen == _at(9)
+        assert stats.last_seen == _at(14)
+        assert stats.hour_share(9) == pytest.approx(1 / 6)
+
+    def test_merge_equals_single_stream(self):
+        """Merging two partial profiles should equal observing everything once."""
+        whole, left, right = ProfileStats(), ProfileStats(), ProfileStats()
+        for i, amount in enumerate([10.0, 20.0, 30.0, 400.0, 55.5]):
+            whole.observe(amount, _at(i))
+            (left if i < 2 else right).observe(amount, _at(i))
+
+        left.merge(right)
+        assert left.count == whole.count
+        assert left.mean == pytest.approx(whole.mean)
+        assert left.m2 == pytest.approx(whole.m2)
+        assert left.hour_histogram == whole.hour_histogram
+        assert (left.first_seen, left.last_seen) == (whole.first_seen, whole.last_seen)
+
+
+class TestProfileStore:
+    """Test cases for ProfileStore persistence."""
+
+    @pytest.mark.asyncio
+    async def test_flush_merges_workers(self, db_session_factory):
+        """Two stores flushing to one table should not overwrite each other."""
+        first, second = ProfileStore(), ProfileStore()
+        first.observe("Vendor", 100.0, _at(10))
+        first.observe("Vendor", 200.0, _at(11))
+        second.observe("Vendor", 600.0, _at(12))
+
+        async with db_session_factory() as db:
+            assert await first.flush(db) == 2
+            assert await second.flush(db) == 2
+            assert second.pending_count == 0
+
+            reloaded = ProfileStore()
+            await reloaded.load(db)
+
+        profile = reloaded.get(PAYEE_SCOPE, "Vendor")
+        assert profile.count == 3
+        assert profile.mean == pytest.approx(300.0)
+        assert profile.variance == pytest.approx(np.var([100.0, 200.0, 600.0]))
+        assert reloaded.get(ACCOUNT_SCOPE, DEFAULT_ACCOUNT).count == 3
+        # The second worker picked up the first worker's history on flush
+        assert second.get(PAYEE_SCOPE, "Vendor").count == 3
+
+    @pytest.mark.asyncio
+    async def test_load_rebuilds_from_transactions(self, db_session_factory):
+        """An empty profile table should be rebuilt from stored transactions."""
+        async with db_session_factory() as db:
+            await db_service.create_transactions_bulk(db, [
+                {
+                    "amount": amount, "payee": "Vendor", "timestamp": _at(10),
+                    "reference": "Invoice", "risk_score": 0.0, "risk_level": "low", "factors": [],
+                }
+                for amount in (100.0, 300.0)
+            ])
+            store = ProfileStore()
+            assert await store.load(db) == 2
+
+        assert store.get(PAYEE_SCOPE, "Vendor").mean == pytest.approx(200.0)
+        assert store.is_new_payee("Vendor") is False
+        assert store.is_new_payee("Someone Else") is True
+
+    def test_new_payee_unknown_until_loaded(self):
+        """Without a database load the store cannot say a payee is new."""
+        store = ProfileStore()
+        assert store.is_new_payee("Vendor") is None
+
+    def test_eviction_disables_new_payee(self):
+        """Once a profile is evicted, a missing payee is no longer proof of novelty."""
+        store = ProfileStore(max_profiles=2)
+        store._loaded = True
+        store.observe("A", 10.0, _at(10))
+        store._pending.clear()
+        store.observe("B", 10.0, _at(10))
+
+        assert store.get(PAYEE_SCOPE, "A") is None
+        assert store.is_new_payee("C") is None
+
+
+class TestPersonalisedScoring:
+    """Test cases for MockAnomalyDetector with a profile store."""
+
+    @pytest.fixture
+    def store(self):
+        store = ProfileStore()
+        for _ in range(5):
+            store.observe("Payroll Ltd", 10000.0, _at(10))
+            store.observe("Corner Shop", 20.0, _at(10))
+            store.observe("Night Bakery", 80.0, _at(3))
+        store._loaded = True
+        return store
+
+    def test_spike_uses_payee_baseline(self, store):
+        """Amounts should be judged against the payee's own history."""
+        detector = MockAnomalyDetector(profile_store=store)
+        _, payroll = detector.calculate_risk_score(
+            {"amount": 10500.0, "payee": "Payroll Ltd", "timestamp": _at(10), "reference": ""}
+        )
+        _, shop = detector.calculate_risk_score(
+            {"amount": 500.0, "payee": "Corner Shop", "timestamp": _at(10), "reference": ""}
+        )
+        assert "AMOUNT_SPIKE" not in payroll
+        assert "AMOUNT_SPIKE" in shop
+
+    def test_scored_rows_carry_spike_baseline(self, store):
+        """Rows flagged AMOUNT_SPIKE should carry the mean they were compared against."""
+        detector = MockAnomalyDetector(profile_store=store)
+        shop, payroll = score_transactions(detector, [
+            {"amount": 500.0, "payee": "Corner Shop", "timestamp": _at(10), "reference": ""},
+            {"amount": 10500.0, "payee": "Payroll Ltd", "timestamp": _at(10), "reference": ""},
+        ])
+
+        assert detector.spike_baseline("Corner Shop") == pytest.approx(20.0)
+        assert shop["amount_baseline"] == pytest.approx(20.0)
+        assert payroll["amount_baseline"] is None
+
+    def test_unknown_payee_is_new(self, store):
+        """A payee without history should count as new despite the client flag."""
+        detector = MockAnomalyDetector(profile_store=store)
+        _, factors = detector.calculate_risk_score({
+            "amount": 10.0, "payee": "Stranger", "timestamp": _at(10),
+            "reference": "", "payee_is_new": False,
+        })
+        assert "NEW_PAYEE" in factors
+
+    def test_usual_hour_is_not_unusual_timing(self, store):
+        """Off-hours payments should not be flagged when the payee is usually paid then."""
+        detector = MockAnomalyDetector(profile_store=store)
+        assert detector.is_unusual_hour("Night Bakery", 3) is False
+        assert detector.is_unusual_hour("Night Bakery", 22) is True
+        assert detector.is_unusual_hour("Corner Shop", 3) is True
+        assert detector.is_unusual_hour("Stranger", 3) is True
+        assert detector.is_unusual_hour("Corner Shop", 12) is False
+
+    def test_no_history_uses_global_average(self):
+        """Without enough history the global threshold should apply."""
+        detector = MockAnomalyDetector(profile_store=ProfileStore())
+        assert detector.spike_threshold("Anyone") == MockAnomalyDetector().spike_threshold("Anyone")
+
+    def test_batch_matches_scalar(self, store):
+        """Batch scoring with payees should match the scalar path exactly."""
+        detector = MockAnomalyDetector(profile_store=store)
+        transactions = [
+            {"amount": amount, "payee": payee, "timestamp": _at(hour),
+             "reference": "urgent", "payee_is_new": False}
+            for amount in (19.0, 100.0, 2000.0, 40000.0)
+            for payee in ("Payroll Ltd", "Corner Shop", "Night Bakery", "Stranger")
+            for hour in (3, 12)
+        ]
+        scores, masks = detector.calculate_risk_scores_batch(
+            *transactions_to_columns(transactions),
+            payees=[t["payee"] for t in transactions],
+        )
+        for transaction, score, mask in zip(transactions, scores.tolist(), masks.tolist()):
+            expected_score, expected_factors = detector.calculate_risk_score(transaction)
+            assert score == expected_score
+            assert decode_factor_mask(mask) == expected_factors
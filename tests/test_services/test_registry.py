@@ -0,0 +1,103 @@
+"""Unit tests for the service registry."""
+
+import pytest
+
+from app.providers.llm.caching import CachingLLMProvider
+from app.providers.llm.mock_provider import MockLLMProvider
+from app.providers.resilience import ResilientLLMProvider
+from app.services.anomaly_detector import MockAnomalyDetector
+from app.services.explanation_generator import MockExplanationGenerator
+from app.services.registry import ServiceRegistry
+
+
+class WarmDetector(MockAnomalyDetector):
+    """Detector recording warm-up and reporting a configurable health state."""
+
+    def __init__(self, fail_warm_up=False, state="ok"):
+        super().__init__()
+        self.fail_warm_up = fail_warm_up
+        self.state = state
+        self.warmed = False
+
+    async def warm_up(self):
+        if self.fail_warm_up:
+            raise RuntimeError("model not found")
+        self.warmed = True
+
+    def health_check(self):
+        return self.state
+
+
+class TestServiceRegistry:
+    """Test cases for ServiceRegistry."""
+
+    def test_builds_lazily_once(self):
+        """Services should be built on first use and then reused."""
+        built = []
+        registry = ServiceRegistry(
+            detector_factory=lambda: built.append("detector") or MockAnomalyDetector(),
+        )
+        first = registry.get_detector()
+
+        assert registry.get_detector() is first
+        assert isinstance(registry.get_generator(), MockExplanationGenerator)
+        assert built == ["detector"]
+
+    @pytest.mark.asyncio
+    async def test_start_warms_up(self):
+        """Components built at startup should be warmed up."""
+        registry = ServiceRegistry(detector_factory=WarmDetector)
+        await registry.start()
+
+        assert registry.is_started
+        assert registry.get_detector().warmed
+
+    @pytest.mark.asyncio
+    async def test_swap_replaces_one_component(self):
+        """Swapping the detector should keep the current generator."""
+        registry = ServiceRegistry()
+        await registry.start()
+        generator = registry.get_generator()
+        replacement = WarmDetector()
+
+        await registry.swap(detector=replacement)
+
+        assert registry.get_detector() is replacement
+        assert replacement.warmed
+        assert registry.get_generator() is generator
+
+    @pytest.mark.asyncio
+    async def test_failed_warm_up_keeps_current(self):
+        """A component that fails to warm up should never go live."""
+        registry = ServiceRegistry()
+        await registry.start()
+        current = registry.get_detector()
+
+        with pytest.raises(RuntimeError):
+            await registry.swap(detector=WarmDetector(fail_warm_up=True))
+
+        assert registry.get_detector() is current
+
+    @pytest.mark.asyncio
+    async def test_health_reports_components(self):
+        """Health should include each component's own check."""
+        registry = ServiceRegistry(detector_factory=lambda: WarmDetector(state="index stale"))
+
+        assert await registry.health() == {
+            "detector": "index stale",
+            "generator": "ok",
+            "patterns": "ok",
+            "llm": "ok",
+        }
+
+    def test_breaker_stats_through_wrappers(self):
+        """Breaker state should be found beneath other provider wrappers."""
+        registry = ServiceRegistry(
+            llm_factory=lambda: CachingLLMProvider(ResilientLLMProvider(MockLLMProvider()))
+        )
+        registry.get_llm_provider()
+
+        breakers = registry.breaker_stats()
+
+        assert list(breakers) == ["llm"]
+        assert breakers["llm"]["state"] == "closed"
@@ -0,0 +1,380 @@
+"""Unit tests for the circuit breaker and resilient provider wrappers."""
+
+import asyncio
+
+import pytest
+
+from app.providers.llm.base import ExplanationChunk, ExplanationRequest, is_fallback
+from app.providers.llm.caching import CachingLLMProvider
+from app.providers.llm.mock_provider import MockLLMProvider
+from app.providers.patterns.base import PatternMatch, PatternMatcher
+from app.providers.resilience import (
+    CircuitBreaker,
+    LatencyTracker,
+    ResilientLLMProvider,
+    ResilientPatternMatcher,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FlakyProvider(MockLLMProvider):
+    """Remote LLM stand-in that fails, hangs or answers on demand."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.latencies = []
+
+    async def generate_explanation(self, request):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("upstream unavailable")
+        if self.latencies:
+            await asyncio.sleep(self.latencies.pop(0))
+        response = await super().generate_explanation(request)
+        response.explanation = f"upstream: {response.explanation}"
+        return response
+
+    @property
+    def name(self):
+        return "FlakyProvider"
+
+
+class FailingMatcher(PatternMatcher):
+    """Pattern backend that always errors."""
+
+    async def find_matching_patterns(self, risk_factors, transaction_context):
+        raise TimeoutError("search service timed out")
+
+    def health_check(self):
+        return True
+
+    @property
+    def name(self):
+        return "FailingMatcher"
+
+
+def _request(amount=4200.0):
+    return ExplanationRequest(
+        transaction_amount=amount,
+        transaction_payee="Unknown Ltd",
+        transaction_timestamp="2026-01-10T03:15:00Z",
+        transaction_reference="Invoice",
+        risk_score=0.7,
+        risk_factors=["NEW_PAYEE", "UNUSUAL_TIMING"],
+    )
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_at_failure_rate(self):
+        """Should open once the windowed failure rate reaches the threshold."""
+        breaker = CircuitBreaker(window=10, failure_threshold=0.5, min_calls=4)
+
+        for _ in range(3):
+            breaker.record_success()
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == "closed"
+
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+    def test_needs_min_calls(self):
+        """A single failure should not open the circuit."""
+        breaker = CircuitBreaker(min_calls=5)
+
+        breaker.record_failure()
+
+        assert breaker.state == "closed"
+        assert breaker.allow()
+
+    def test_half_open_probe_success_closes(self):
+        """After the reset timeout one probe is allowed; success closes the circuit."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        clock.now = 31
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_success()
+
+        assert breaker.state == "closed"
+        assert breaker.failure_rate() == 0.0
+
+    def test_half_open_probe_failure_reopens(self):
+        """A failed probe should open the circuit for another reset timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 31
+        assert breaker.allow()
+
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert breaker.stats()["times_opened"] == 2
+        clock.now = 60
+        assert breaker.state == "open"
+
+    def test_released_probe_can_be_retried(self):
+        """A probe ending without an outcome should let the next call probe."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.now = 31
+        assert breaker.allow()
+
+        breaker.release()
+
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+
+class TestLatencyTracker:
+    """Test cases for LatencyTracker."""
+
+    def test_percentile_needs_samples(self):
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record(0.1)
+
+        assert tracker.percentile(0.95) is None
+
+    def test_percentile(self):
+        tracker = LatencyTracker(min_samples=1)
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+
+        assert tracker.percentile(0.95) == pytest.approx(0.096)
+
+
+class TestResilientLLMProvider:
+    """Test cases for ResilientLLMProvider."""
+
+    @pytest.mark.asyncio
+    async def test_passes_through_when_healthy(self):
+        upstream = FlakyProvider()
+        provider = ResilientLLMProvider(upstream)
+
+        response = await provider.generate_explanation(_request())
+
+        assert response.explanation.startswith("upstream: ")
+        assert not is_fallback(response)
+        assert provider.breaker_stats()["fallbacks"] == 0
+
+    @pytest.mark.asyncio
+    async def test_error_falls_back_to_mock(self):
+        """A failing upstream should be answered by the mock provider, flagged as fallback."""
+        upstream = FlakyProvider()
+        upstream.fail = True
+        provider = ResilientLLMProvider(upstream)
+
+        response = await provider.generate_explanation(_request())
+
+        assert not response.explanation.startswith("upstream: ")
+        assert is_fallback(response)
+        assert provider.breaker_stats()["fallbacks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_falls_back(self):
+        upstream = FlakyProvider()
+        upstream.latencies = [1.0]
+        provider = ResilientLLMProvider(upstream, timeout=0.05)
+
+        response = await provider.generate_explanation(_request())
+
+        assert is_fallback(response)
+        assert provider.breaker.failure_rate() == 1.0
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_upstream(self):
+        """While open, calls should not reach the upstream at all."""
+        upstream = FlakyProvider()
+        upstream.fail = True
+        provider = ResilientLLMProvider(upstream, breaker=CircuitBreaker(min_calls=2))
+
+        for _ in range(5):
+            await provider.generate_explanation(_request())
+
+        assert upstream.calls == 2
+        assert provider.breaker.state == "open"
+        assert provider.health_check() == "degraded: circuit open, serving fallback"
+
+    @pytest.mark.asyncio
+    async def test_recovers_after_probe(self):
+        clock = FakeClock()
+        upstream = FlakyProvider()
+        upstream.fail = True
+        provider = ResilientLLMProvider(
+            upstream, breaker=CircuitBreaker(min_calls=1, reset_timeout=10, clock=clock)
+        )
+        await provider.generate_explanation(_request())
+        assert provider.breaker.state == "open"
+
+        upstream.fail = False
+        clock.now = 11
+        response = await provider.generate_explanation(_request())
+
+        assert not is_fallback(response)
+        assert provider.breaker.state == "closed"
+        assert provider.health_check() == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_half_open(self):
+        """Cancelling the half-open probe should not leave the circuit stuck on the fallback."""
+        clock = FakeClock()
+        upstream = FlakyProvider()
+        upstream.fail = True
+        provider = ResilientLLMProvider(
+            upstream, breaker=CircuitBreaker(min_calls=1, reset_timeout=10, clock=clock)
+        )
+        await provider.generate_explanation(_request())
+        upstream.fail = False
+        upstream.latencies = [5.0]
+        clock.now = 11
+
+        probe = asyncio.create_task(provider.generate_explanation(_request()))
+        await asyncio.sleep(0.01)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        response = await provider.generate_explanation(_request())
+
+        assert not is_fallback(response)
+        assert upstream.calls == 3
+        assert provider.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_stream_passes_tokens_through(self):
+        upstream = FlakyProvider()
+        provider = ResilientLLMProvider(upstream)
+
+        chunks = [chunk async for chunk in provider.stream_explanation(_request())]
+
+        assert len(chunks) > 2
+        assert chunks[0].text == "upstream: "
+        assert not is_fallback(chunks[-1].response)
+        assert provider.breaker.failure_rate() == 0.0
+
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_before_first_chunk(self):
+        """A stream failing before anything was sent should come from the fallback."""
+        upstream = FlakyProvider()
+        upstream.fail = True
+        provider = ResilientLLMProvider(upstream)
+
+        chunks = [chunk async for chunk in provider.stream_explanation(_request())]
+
+        assert len(chunks) > 2
+        assert is_fallback(chunks[-1].response)
+        assert provider.breaker.failure_rate() == 1.0
+
+    @pytest.mark.asyncio
+    async def test_stream_failing_midway_is_raised(self):
+        """Once chunks were sent, a failure should reach the caller, not switch providers."""
+
+        class BreakingStream(FlakyProvider):
+            async def stream_explanation(self, request):
+                yield ExplanationChunk(text="Partial ")
+                raise ConnectionError("stream reset")
+
+        provider = ResilientLLMProvider(BreakingStream())
+        received = []
+        with pytest.raises(ConnectionError):
+            async for chunk in provider.stream_explanation(_request()):
+                received.append(chunk.text)
+
+        assert received == ["Partial "]
+        assert provider.breaker.failure_rate() == 1.0
+        assert provider.breaker_stats()["fallbacks"] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_goes_through_breaker(self):
+        """Batches should be forwarded, and answered by the fallback when they fail."""
+        upstream = FlakyProvider()
+        upstream.supports_batch = True
+        provider = ResilientLLMProvider(upstream)
+
+        assert provider.supports_batch
+        assert not any(map(is_fallback, await provider.generate_explanations_batch([_request()] * 2)))
+
+        upstream.fail = True
+        responses = await provider.generate_explanations_batch([_request()] * 2)
+
+        assert len(responses) == 2 and all(map(is_fallback, responses))
+        assert provider.breaker_stats()["fallbacks"] == 1
+
+    def test_forwards_model_of_wrapped_provider(self):
+        """The wrapper should expose the wrapped model so cache keys keep it."""
+        upstream = FlakyProvider()
+        upstream.model = "gpt-4o-mini"
+
+        assert ResilientLLMProvider(upstream).model == "gpt-4o-mini"
+        assert ResilientLLMProvider(MockLLMProvider()).model == ""
+
+    @pytest.mark.asyncio
+    async def test_hedge_beats_slow_first_call(self):
+        """A hedged second request should answer when the first stalls past p95."""
+        upstream = FlakyProvider()
+        provider = ResilientLLMProvider(upstream, timeout=1.0, hedge=True)
+        provider.latency = LatencyTracker(min_samples=1)
+        provider.latency.record(0.01)
+        upstream.latencies = [0.5, 0.0]
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await provider.generate_explanation(_request())
+
+        assert loop.time() - started < 0.3
+        assert not is_fallback(response)
+        assert upstream.calls == 2
+        assert provider.breaker_stats()["hedged"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fallback_not_cached(self):
+        """Degraded answers should not be kept by the response cache."""
+        upstream = FlakyProvider()
+        upstream.fail = True
+        cached = CachingLLMProvider(ResilientLLMProvider(upstream))
+
+        first = await cached.generate_explanation(_request())
+        upstream.fail = False
+        second = await cached.generate_explanation(_request())
+
+        assert is_fallback(first)
+        assert second.explanation.startswith("upstream: ")
+
+
+class TestResilientPatternMatcher:
+    """Test cases for ResilientPatternMatcher."""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_patterns(self):
+        matcher = ResilientPatternMatcher(FailingMatcher())
+
+        matches = await matcher.find_matching_patterns(
+            ["NEW_PAYEE", "UNUSUAL_TIMING"], {"reference": "URGENT wire"}
+        )
+
+        assert matches
+        assert all(isinstance(match, PatternMatch) for match in matches)
+        assert matcher.breaker_stats()["fallbacks"] == 1
+        assert matcher.name == "ResilientPatternMatcher(FailingMatcher)"
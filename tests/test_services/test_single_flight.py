@@ -0,0 +1,79 @@
+"""Unit tests for request coalescing."""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_result(self):
+        """Callers with the same key should await a single call."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            *(flight.do("a", lambda: work("a")) for _ in range(5)),
+            flight.do("b", lambda: work("b")),
+        )
+
+        assert results == ["a"] * 5 + ["b"]
+        assert calls == ["a", "b"]
+        assert flight.stats() == {"calls": 6, "coalesced": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_runs_again_after_completion(self):
+        """Nothing should be cached once the shared call has finished."""
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            return len(calls)
+
+        assert await flight.do("a", work) == 1
+        await asyncio.sleep(0)
+        assert await flight.do("a", work) == 2
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_caller(self):
+        """A failure should be raised to all callers sharing the call."""
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("provider down")
+
+        results = await asyncio.gather(
+            flight.do("a", fail), flight.do("a", fail), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert flight.coalesced == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Waiters should still get the result if the first caller goes away."""
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.do("a", work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(flight.do("a", work))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+        assert first.cancelled()
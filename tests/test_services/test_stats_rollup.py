@@ -0,0 +1,157 @@
+"""Unit tests for the daily stats rollup service."""
+
+import pytest
+from datetime import datetime, timezone
+
+from sqlalchemy import event, select
+
+from app.db_models import TransactionStatsDaily
+from app.models import TransactionFilters
+from app.services.database_service import DatabaseService, db_service
+from app.services.stats_rollup import rollup_day, stats_rollup
+
+
+def _transaction(amount, risk_level, day=10, hour=10):
+    return {
+        "amount": amount,
+        "payee": "Vendor",
+        "timestamp": datetime(2026, 1, day, hour, 0, tzinfo=timezone.utc),
+        "reference": "Test",
+        "payee_is_new": False,
+        "risk_score": {"high": 0.8, "medium": 0.5, "low": 0.1}[risk_level],
+        "risk_level": risk_level,
+        "factors": [],
+    }
+
+
+async def _rollup_rows(db):
+    result = await db.execute(select(TransactionStatsDaily))
+    return sorted(
+        (row.day, row.risk_level, row.status, row.count, round(row.amount_sum, 2))
+        for row in result.scalars().all()
+    )
+
+
+class TestStatsRollup:
+    """Test cases for StatsRollupService."""
+
+    @pytest.mark.asyncio
+    async def test_inserts_update_rollup(self, db_session_factory):
+        """Single and bulk inserts should both add to the day's rollup row."""
+        async with db_session_factory() as db:
+            await db_service.create_transaction(db, **_transaction(100, "low"))
+            await db_service.create_transactions_bulk(
+                db, [_transaction(200, "low"), _transaction(5000, "high", day=11)]
+            )
+            rows = await _rollup_rows(db)
+
+        assert rows == [
+            (datetime(2026, 1, 10).date(), "low", "pending", 2, 300.0),
+            (datetime(2026, 1, 11).date(), "high", "pending", 1, 5000.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_status_change_moves_bucket(self, db_session_factory):
+        """Approving a transaction should move it from pending to approved."""
+        async with db_session_factory() as db:
+            transaction = await db_service.create_transaction(db, **_transaction(100, "low"))
+            await db_service.update_transaction(db, str(transaction.id), {"status": "approved"})
+            rows = await _rollup_rows(db)
+
+        day = datetime(2026, 1, 10).date()
+        assert (day, "low", "approved", 1, 100.0) in rows
+        assert (day, "low", "pending", 0, 0.0) in rows
+
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_keep_rollup_consistent(
+        self, db_session_factory, monkeypatch
+    ):
+        """An approve racing a reject should move the row out of pending exactly once."""
+        async with db_session_factory() as db:
+            transaction = await db_service.create_transaction(db, **_transaction(100, "low"))
+        transaction_id = str(transaction.id)
+
+        original_get = DatabaseService.get_transaction
+        interleaved = []
+
+        async def get_then_let_other_update_commit(db, transaction_id):
+            loaded = await original_get(db, transaction_id)
+            if not interleaved:
+                # The approve has read "pending"; a reject commits before it writes
+                interleaved.append(True)
+                async with db_session_factory() as other:
+                    await db_service.update_transaction(other, transaction_id, {"status": "rejected"})
+            return loaded
+
+        monkeypatch.setattr(
+            DatabaseService, "get_transaction", staticmethod(get_then_let_other_update_commit)
+        )
+        async with db_session_factory() as db:
+            updated = await db_service.update_transaction(db, transaction_id, {"status": "approved"})
+            rows = await _rollup_rows(db)
+
+        day = datetime(2026, 1, 10).date()
+        assert updated.status == "approved"
+        assert (day, "low", "pending", 0, 0.0) in rows
+        assert (day, "low", "rejected", 0, 0.0) in rows
+        assert (day, "low", "approved", 1, 100.0) in rows
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_incremental(self, db_session_factory):
+        """A rebuild should reproduce the incrementally maintained totals."""
+        async with db_session_factory() as db:
+            await db_service.create_transactions_bulk(
+                db,
+                [_transaction(100, "low"), _transaction(900, "medium"), _transaction(5000, "high", day=12)],
+            )
+            incremental = await db_service.get_transaction_stats(db)
+            await stats_rollup.rebuild(db)
+            rebuilt = await db_service.get_transaction_stats(db)
+
+        assert rebuilt == incremental
+        assert rebuilt["total"] == 3
+
+    @pytest.mark.asyncio
+    async def test_whole_day_filters_use_rollup(self, db_session_factory):
+        """Day-aligned ranges are answered from the rollup, others are not."""
+        async with db_session_factory() as db:
+            await db_service.create_transactions_bulk(db, [_transaction(100, "low", day=10)])
+            day_range = TransactionFilters(
+                start_time=datetime(2026, 1, 10, tzinfo=timezone.utc),
+                end_time=datetime(2026, 1, 11, tzinfo=timezone.utc),
+            )
+            partial_range = TransactionFilters(start_time=datetime(2026, 1, 10, 12, tzinfo=timezone.utc))
+
+            assert await stats_rollup.get_groups(db, day_range) == [("low", "pending", 1, 100.0, 0.1)]
+            assert await stats_rollup.get_groups(db, partial_range) is None
+            assert await stats_rollup.get_groups(db, TransactionFilters(payee_prefix="V")) is None
+
+    @pytest.mark.asyncio
+    async def test_upsert_rows_in_key_order(self, db_session_factory):
+        """Rows should be upserted in (day, risk_level, status) order to avoid deadlocks."""
+        deltas = [
+            (datetime(2026, 1, 12, 10, tzinfo=timezone.utc), "low", "pending", 1, 10.0, 0.1),
+            (datetime(2026, 1, 10, 10, tzinfo=timezone.utc), "medium", "pending", 1, 20.0, 0.5),
+            (datetime(2026, 1, 10, 10, tzinfo=timezone.utc), "high", "rejected", 1, 30.0, 0.8),
+        ]
+        parameters = []
+        async with db_session_factory() as db:
+            engine = db.get_bind()
+            listener = lambda *args: parameters.append(args[3])
+            event.listen(engine, "before_cursor_execute", listener)
+            try:
+                await stats_rollup.apply_deltas(db, deltas)
+            finally:
+                event.remove(engine, "before_cursor_execute", listener)
+
+        # Six columns per row: day, risk_level, status, count, amount_sum, risk_score_sum
+        keys = [tuple(parameters[0][i:i + 3]) for i in range(0, len(parameters[0]), 6)]
+        assert keys == sorted(keys)
+        assert [key[1] for key in keys] == ["high", "medium", "low"]
+
+    def test_rollup_day_uses_utc(self):
+        """Aware timestamps should be bucketed by their UTC date."""
+        from datetime import timedelta
+
+        late_evening_minus_5 = datetime(2026, 1, 10, 22, 0, tzinfo=timezone(timedelta(hours=-5)))
+        assert rollup_day(late_evening_minus_5) == datetime(2026, 1, 11).date()
@@ -0,0 +1,86 @@
+"""Unit tests for the streaming transaction import parser."""
+
+import pytest
+
+from app.services.transaction_import import (
+    ImportFormatError,
+    RecordReader,
+    detect_format,
+    validate_record,
+)
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _records(data: bytes, file_format: str, size: int = 3):
+    reader = RecordReader(_chunks(data, size), file_format)
+    return [item async for item in reader.records()]
+
+
+class TestRecordReader:
+    """Test cases for RecordReader."""
+
+    @pytest.mark.asyncio
+    async def test_csv_split_across_chunks(self):
+        """Lines and multi-byte characters split between reads should parse intact."""
+        data = (
+            "﻿Amount,Payee,Reference,Timestamp\r\n"
+            "12.50,Café Zürich,Lunch,2026-01-05T12:00:00Z\r\n"
+            "\r\n"
+            "99,Bäckerei,Bread,2026-01-05T08:00:00Z"
+        ).encode()
+
+        records = await _records(data, "csv", size=5)
+
+        assert records == [
+            (2, {"amount": "12.50", "payee": "Café Zürich", "reference": "Lunch",
+                 "timestamp": "2026-01-05T12:00:00Z"}),
+            (4, {"amount": "99", "payee": "Bäckerei", "reference": "Bread",
+                 "timestamp": "2026-01-05T08:00:00Z"}),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_csv_quoted_newline(self):
+        data = b'amount,payee,reference,timestamp\n1,"A\nB","x ""y""",2026-01-05T08:00:00Z\n2,C,z,2026-01-05T08:00:00Z\n'
+
+        records = await _records(data, "csv")
+
+        assert [(line, record["payee"]) for line, record in records] == [(2, "A\nB"), (4, "C")]
+        assert records[0][1]["reference"] == 'x "y"'
+
+    @pytest.mark.asyncio
+    async def test_csv_missing_columns(self):
+        reader = RecordReader(_chunks(b"amount,payee\n1,A\n", 4), "csv")
+        with pytest.raises(ImportFormatError):
+            await reader.read_header()
+
+    @pytest.mark.asyncio
+    async def test_ndjson_errors_are_reported(self):
+        data = b'{"amount": 1}\n[1, 2]\n{broken\n'
+
+        records = await _records(data, "ndjson")
+
+        assert records[0] == (1, {"amount": 1})
+        assert records[1] == (2, "Expected a JSON object")
+        assert records[2][0] == 3 and records[2][1].startswith("Invalid JSON")
+
+
+class TestImportHelpers:
+    """Test cases for format detection and row validation."""
+
+    def test_detect_format(self):
+        assert detect_format("payments.jsonl", None) == "ndjson"
+        assert detect_format("payments.csv", "application/x-ndjson") == "csv"
+        assert detect_format("upload", "application/x-ndjson; charset=utf-8") == "ndjson"
+        assert detect_format(None, None) == "csv"
+
+    def test_empty_cells_use_defaults(self):
+        transaction = validate_record({
+            "amount": "10", "payee": "A", "reference": "r",
+            "timestamp": "2026-01-05T08:00:00Z", "payee_is_new": "", "notes": "ignored",
+        })
+        assert transaction.amount == 10.0
+        assert transaction.payee_is_new is False
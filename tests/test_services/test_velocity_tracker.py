@@ -0,0 +1,173 @@
+"""Unit tests for the sliding-window velocity tracker."""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from app.config import VELOCITY_LIMITS
+from app.services.anomaly_detector import (
+    MockAnomalyDetector,
+    decode_factor_mask,
+    transactions_to_columns,
+)
+from app.services.database_service import db_service
+from app.services.profile_store import ACCOUNT_SCOPE, PAYEE_SCOPE
+from app.services.velocity_tracker import VelocityTracker
+
+START = datetime(2026, 1, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def _at(minutes):
+    return START + timedelta(minutes=minutes)
+
+
+class TestVelocityTracker:
+    """Test cases for VelocityTracker."""
+
+    def test_window_totals(self):
+        """Counts and amounts should be reported per window."""
+        tracker = VelocityTracker()
+        tracker.record("Vendor", 100.0, _at(0))
+        tracker.record("Vendor", 50.0, _at(30))
+        tracker.record("Vendor", 25.0, _at(55))
+
+        totals = tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(56))
+        assert totals["10m"] == (1, 25.0)
+        assert totals["1h"] == (3, 175.0)
+        assert totals["24h"] == (3, 175.0)
+
+    def test_out_of_order_query_ignores_later_transfers(self):
+        """A window should end at the queried time, not at the newest transfer."""
+        tracker = VelocityTracker()
+        tracker.record("Vendor", 100.0, _at(0))
+        tracker.record("Vendor", 50.0, _at(30))
+        tracker.record("Vendor", 10.0, _at(50))
+        tracker.record("Vendor", 25.0, _at(55))
+
+        totals = tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(51))
+        assert totals["10m"] == (1, 10.0)
+        assert totals["1h"] == (3, 160.0)
+        assert tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(-120))["1h"] == (0, 0.0)
+        assert tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(56))["1h"] == (4, 185.0)
+
+    def test_account_only_tracked_when_given(self):
+        """Transfers without an account id should not share one account counter."""
+        tracker = VelocityTracker()
+        limit = VELOCITY_LIMITS[ACCOUNT_SCOPE]["10m"]
+        for i in range(limit):
+            tracker.record(f"Payee {i}", 10.0, _at(0))
+
+        assert tracker.size == limit
+        assert not tracker.is_burst("Another Payee", _at(1))
+
+        for i in range(limit):
+            tracker.record(f"Payee {i}", 10.0, _at(0), account="ACC-1")
+        assert tracker.window_totals(ACCOUNT_SCOPE, "ACC-1", _at(1))["10m"] == (limit, limit * 10.0)
+        assert tracker.is_burst("Another Payee", _at(1), account="ACC-1")
+
+    def test_old_transfers_expire(self):
+        """Transfers should drop out once their window has passed."""
+        tracker = VelocityTracker()
+        tracker.record("Vendor", 100.0, _at(0))
+
+        totals = tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(60 * 25))
+        assert totals == {"10m": (0, 0.0), "1h": (0, 0.0), "24h": (0, 0.0)}
+
+    def test_burst_flagged_at_limit(self):
+        """A transfer should be a burst once earlier transfers reach the limit."""
+        tracker = VelocityTracker()
+        limit = VELOCITY_LIMITS[PAYEE_SCOPE]["10m"]
+        for i in range(limit):
+            assert not tracker.is_burst("Vendor", _at(i))
+            tracker.record("Vendor", 10.0, _at(i))
+
+        assert tracker.is_burst("Vendor", _at(limit))
+        assert not tracker.is_burst("Other Vendor", _at(limit))
+
+    def test_burst_flags_count_earlier_rows(self):
+        """Rows in one batch should count towards later rows without mutating state."""
+        tracker = VelocityTracker()
+        count = VELOCITY_LIMITS[PAYEE_SCOPE]["10m"] + 1
+        flags = tracker.burst_flags(["Vendor"] * count, [10.0] * count, [_at(0)] * count)
+
+        assert flags == [False] * (count - 1) + [True]
+        assert tracker.size == 0
+
+    def test_burst_flags_ignore_input_order(self):
+        """A batch should get the same flags newest-first as oldest-first."""
+        tracker = VelocityTracker()
+        times = [_at(minute) for minute in range(0, 60, 2)]
+        oldest_first = tracker.burst_flags(["Vendor"] * len(times), [10.0] * len(times), times)
+        newest_first = tracker.burst_flags(
+            ["Vendor"] * len(times), [10.0] * len(times), times[::-1]
+        )
+
+        assert any(oldest_first)
+        assert newest_first == oldest_first[::-1]
+
+    def test_future_timestamps_capped_at_server_clock(self):
+        """A future-dated transfer should not stop later real-time transfers from counting."""
+        now = {"time": START.timestamp()}
+        tracker = VelocityTracker(clock=lambda: now["time"])
+        tracker.record("Vendor", 100.0, START + timedelta(hours=20))
+
+        now["time"] = _at(60).timestamp()
+        tracker.record("Vendor", 10.0, _at(60))
+        tracker.record("Vendor", 10.0, _at(61))
+
+        assert tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(62))["10m"] == (2, 20.0)
+        assert tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(62))["24h"] == (3, 120.0)
+
+    def test_lru_eviction(self):
+        """Least recently used keys should be evicted past max_keys."""
+        tracker = VelocityTracker(max_keys=3)
+        for payee in ("A", "B", "C", "D"):
+            tracker.record(payee, 10.0, _at(0))
+
+        assert tracker.size == 3
+        assert tracker.window_totals(PAYEE_SCOPE, "A", _at(0))["10m"] == (0, 0.0)
+        assert tracker.window_totals(PAYEE_SCOPE, "D", _at(0))["10m"] == (1, 10.0)
+
+    @pytest.mark.asyncio
+    async def test_load_replays_recent_transactions(self, db_session_factory):
+        """Startup rehydration should replay only the last 24 hours."""
+        async with db_session_factory() as db:
+            await db_service.create_transactions_bulk(db, [
+                {
+                    "amount": 10.0, "payee": "Vendor", "timestamp": timestamp,
+                    "reference": "Invoice", "risk_score": 0.0, "risk_level": "low", "factors": [],
+                }
+                for timestamp in (_at(0), _at(5), _at(-60 * 48))
+            ])
+            tracker = VelocityTracker()
+            assert await tracker.load(db, now=_at(9)) == 2
+
+        assert tracker.window_totals(PAYEE_SCOPE, "Vendor", _at(9))["10m"] == (2, 20.0)
+
+
+class TestVelocityScoring:
+    """Test cases for the VELOCITY factor in MockAnomalyDetector."""
+
+    def test_batch_matches_sequential_scalar(self):
+        """Batch flags should match scoring and recording rows one at a time."""
+        transactions = [
+            {"amount": 10.0, "payee": payee, "timestamp": _at(minute),
+             "reference": "Invoice", "payee_is_new": False}
+            for minute in range(6)
+            for payee in ("Vendor", "Other Vendor")
+        ]
+        batch_detector = MockAnomalyDetector(velocity_tracker=VelocityTracker())
+        scores, masks = batch_detector.calculate_risk_scores_batch(
+            *transactions_to_columns(transactions),
+            payees=[t["payee"] for t in transactions],
+            timestamps=[t["timestamp"] for t in transactions],
+        )
+
+        tracker = VelocityTracker()
+        scalar_detector = MockAnomalyDetector(velocity_tracker=tracker)
+        for transaction, score, mask in zip(transactions, scores.tolist(), masks.tolist()):
+            expected_score, expected_factors = scalar_detector.calculate_risk_score(transaction)
+            tracker.record(transaction["payee"], transaction["amount"], transaction["timestamp"])
+            assert score == expected_score
+            assert decode_factor_mask(mask) == expected_factors
+
+        assert "VELOCITY" in decode_factor_mask(masks[-1])